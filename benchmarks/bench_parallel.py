@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+
+# Benchmark of FuzzyScale.FuzzyParallel() scaling with number of worker processes.
+# Run it from the root of repository: python benchmarks/bench_parallel.py [--size 50000000] [--workers 1 2 4 8]
+
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fuzzyroutines.FuzzyRoutines import UniversalFuzzyScale
+
+
+def Main():
+    parser = argparse.ArgumentParser(description='Throughput of FuzzyScale.FuzzyParallel() for different numbers of workers.')
+    parser.add_argument('--size', type=int, default=20000000, help='number of fuzzyfied values')
+    parser.add_argument('--workers', type=int, nargs='+', default=None, help='numbers of workers, default: 1, 2, 4, ... cpu_count')
+    parser.add_argument('--chunk', type=int, default=1048576, help='number of values in one task')
+    args = parser.parse_args()
+
+    cpuCount = os.cpu_count() or 1
+    workersList = args.workers or sorted(set([2 ** power for power in range(cpuCount.bit_length()) if 2 ** power <= cpuCount] + [cpuCount]))
+
+    scale = UniversalFuzzyScale()
+    values = np.random.default_rng(0).uniform(0., 1., args.size)
+
+    print('Values: {}, chunk: {}, CPU count: {}'.format(args.size, args.chunk, cpuCount))
+    print('{:>8} {:>10} {:>16} {:>8}'.format('workers', 'seconds', 'values/second', 'speedup'))
+
+    baseline = None
+    for workers in workersList:
+        started = time.perf_counter()
+        scale.FuzzyParallel(values, workers=workers, chunkSize=args.chunk)
+        elapsed = time.perf_counter() - started
+
+        baseline = baseline or elapsed
+        print('{:>8} {:>10.3f} {:>16,.0f} {:>8.2f}'.format(workers, elapsed, args.size / elapsed, baseline / elapsed))
+
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+
+# Benchmark suite of hot paths of FuzzyRoutines: membership functions, defuzzyfication, fuzzyfication and operators.
+# Run it from the root of repository:
+#     python benchmarks/bench_suite.py [--quick] [--filter Fuzzy] [--output results.json]
+#     python benchmarks/bench_suite.py --output new.json --compare baseline.json [--threshold 0.2]
+# In compare mode exit code is 1 if seconds per call of any benchmark grew more than threshold relative to baseline.
+
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fuzzyroutines.FuzzyRoutines import *
+
+try:
+    import numpy as np
+
+except ImportError:
+    np = None
+
+
+def BigScale(levelsCount):
+    """
+    Returns fine-grained scale with levelsCount narrow triangle levels on [0, 1].
+    """
+    scale = FuzzyScale()
+    width = 1 / levelsCount
+    scale.levels = [{'name': 'L{}'.format(index),
+                     'fSet': FuzzySet(MFunction('triangle', **{'a': index * width - width, 'b': index * width + 2 * width, 'c': index * width + width / 2}),
+                                      supportSet=(index * width - width, index * width + 2 * width))} for index in range(levelsCount)]
+
+    return scale
+
+
+def Benchmarks(size):
+    """
+    Returns list of benchmarks (name, numpy is needed, setup). setup() returns function for measuring and number of
+    values processed by one call of it. size is a number of elements in batches.
+    """
+    values = [random.random() for _ in range(1000)]
+
+    def MjuScalar():
+        mju = MFunction('bell', **{'a': 0.34, 'b': 0.4, 'c': 0.6}).mju
+        return lambda: [mju(x) for x in values], len(values)
+
+    def MjuArray():
+        mFunction, x = MFunction('bell', **{'a': 0.34, 'b': 0.4, 'c': 0.6}), np.random.default_rng(0).uniform(0., 1., size)
+        out = np.empty_like(x)
+        return lambda: mFunction.MjuArray(x, out=out), size
+
+    def DefuzIntegral():
+        fSet = FuzzySet(MFunction('hyperbolic', **{'a': 8, 'b': 20, 'c': 0}), supportSet=(0., 0.23))
+        return fSet._Defuz, 1  # not cached defuzzyfication with numeric integration
+
+    def DefuzExact():
+        fSet = FuzzySet(MFunction('bell', **{'a': 0.34, 'b': 0.4, 'c': 0.6}), supportSet=(0.34, 0.66))
+        return fSet._Defuz, 1
+
+    def ScaleConstruction():
+        return UniversalFuzzyScale, 1
+
+    def FuzzyScalar():
+        scale = UniversalFuzzyScale()
+        return lambda: [scale.Fuzzy(x) for x in values], len(values)
+
+    def FuzzyBig():
+        scale = BigScale(1000)
+        return lambda: [scale.Fuzzy(x) for x in values], len(values)
+
+    def FuzzyBatch():
+        scale, x = UniversalFuzzyScale(), np.random.default_rng(0).uniform(0., 1., size)
+        out = np.empty(x.shape, dtype=np.intp)
+        return lambda: scale.FuzzyBatch(x, out=out), size
+
+    def FuzzyBatchBig():
+        scale, x = BigScale(1000), np.random.default_rng(0).uniform(0., 1., size)
+        out = np.empty(x.shape, dtype=np.intp)
+        return lambda: scale.FuzzyBatch(x, out=out), size
+
+    def ProfileBatch():
+        scale, x = UniversalFuzzyScale(), np.random.default_rng(0).uniform(0., 1., size)
+        out = scale.ProfileBatch(x, k=2)
+        return lambda: scale.ProfileBatch(x, k=2, out=out), size
+
+    def FuzzyNOTParabolicScalar():
+        return lambda: [FuzzyNOTParabolic(x, alpha=0.25) for x in values[:100]], 100
+
+    def TNormComposeScalar():
+        numbers = values[:50]
+        return lambda: TNormCompose(*numbers, normType='algebraic'), len(numbers)
+
+    def TNormArrayBatch():
+        generator = np.random.default_rng(0)
+        a, b = generator.uniform(0., 1., size), generator.uniform(0., 1., size)
+        out = np.empty_like(a)
+        return lambda: TNormArray(a, b, normType='algebraic', out=out), size
+
+    def TNormReduceBatch():
+        x = np.random.default_rng(0).uniform(0., 1., (50, size // 50))
+        return lambda: TNormReduce(x, axis=0), size
+
+    def RuleBaseInfer():
+        scale = UniversalFuzzyScale()
+        names = [level.name for level in scale.levels]
+        rules = ['IF cpu IS {} AND latency IS {} THEN risk IS {}'.format(cpu, latency, names[(cpuIndex + latencyIndex) // 2])
+                 for cpuIndex, cpu in enumerate(names) for latencyIndex, latency in enumerate(names)]
+        rules += ['IF cpu IS {} OR latency IS {} THEN risk IS {}'.format(cpu, latency, names[max(cpuIndex, latencyIndex)])
+                  for cpuIndex, cpu in enumerate(names) for latencyIndex, latency in enumerate(names)]  # 50 rules
+        ruleBase = RuleBase({'cpu': scale, 'latency': scale}, 'risk', scale, rules=rules)
+        generator = np.random.default_rng(0)
+        inputs = {'cpu': generator.uniform(0., 1., size // 10), 'latency': generator.uniform(0., 1., size // 10)}
+        return lambda: ruleBase.Infer(inputs), size // 10
+
+    return [('MFunction.mju', False, MjuScalar),
+            ('MFunction.MjuArray', True, MjuArray),
+            ('FuzzySet._Defuz integral', False, DefuzIntegral),
+            ('FuzzySet._Defuz exact', False, DefuzExact),
+            ('UniversalFuzzyScale()', False, ScaleConstruction),
+            ('FuzzyScale.Fuzzy', False, FuzzyScalar),
+            ('FuzzyScale.Fuzzy 1000 levels', False, FuzzyBig),
+            ('FuzzyScale.FuzzyBatch', True, FuzzyBatch),
+            ('FuzzyScale.FuzzyBatch 1000 levels', True, FuzzyBatchBig),
+            ('FuzzyScale.ProfileBatch', True, ProfileBatch),
+            ('FuzzyNOTParabolic', False, FuzzyNOTParabolicScalar),
+            ('TNormCompose', False, TNormComposeScalar),
+            ('TNormArray', True, TNormArrayBatch),
+            ('TNormReduce', True, TNormReduceBatch),
+            ('RuleBase.Infer 50 rules', True, RuleBaseInfer)]
+
+
+def Measure(function, repeat, minTime):
+    """
+    Calls function in loops of such number of calls that one loop takes at least minTime seconds, as timeit does.
+    Returns list of seconds per call for repeat loops.
+    """
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            function()
+        elapsed = time.perf_counter() - started
+
+        if elapsed >= minTime:
+            break
+
+        loops *= 10 if elapsed < minTime / 10 else 2
+
+    results = [elapsed / loops]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            function()
+        results.append((time.perf_counter() - started) / loops)
+
+    return results
+
+
+def Run(args):
+    """
+    Runs benchmarks and returns dictionary of results for JSON report.
+    """
+    random.seed(0)
+    results = {}
+
+    print('{:<36} {:>14} {:>14} {:>16}'.format('benchmark', 'best, s/call', 'median, s/call', 'values/second'))
+
+    for name, needsNumpy, setup in Benchmarks(args.size):
+        if args.filter and args.filter not in name:
+            continue
+
+        if needsNumpy and np is None:
+            print('{:<36} skipped: NumPy is not installed'.format(name))
+            continue
+
+        function, items = setup()
+        seconds = sorted(Measure(function, args.repeat, args.min_time))
+        best, median = seconds[0], seconds[len(seconds) // 2]
+
+        results[name] = {'seconds': best, 'median': median, 'items': items, 'itemsPerSecond': items / best}
+        print('{:<36} {:>14.3e} {:>14.3e} {:>16,.0f}'.format(name, best, median, items / best))
+
+    return {'python': platform.python_version(),
+            'numpy': np.__version__ if np is not None else None,
+            'platform': platform.platform(),
+            'size': args.size,
+            'benchmarks': results}
+
+
+def Compare(report, baseline, threshold):
+    """
+    Prints changes of seconds per call relative to baseline report and returns names of regressed benchmarks.
+    """
+    regressions = []
+
+    print('\n{:<36} {:>14} {:>14} {:>9}'.format('benchmark', 'baseline, s', 'current, s', 'change'))
+
+    for name, result in report['benchmarks'].items():
+        if name not in baseline['benchmarks']:
+            print('{:<36} {:>14} {:>14.3e} {:>9}'.format(name, '-', result['seconds'], 'new'))
+            continue
+
+        before = baseline['benchmarks'][name]['seconds']
+        change = result['seconds'] / before - 1
+        regressed = change > threshold
+
+        if regressed:
+            regressions.append(name)
+
+        print('{:<36} {:>14.3e} {:>14.3e} {:>+8.1%}{}'.format(name, before, result['seconds'], change, ' REGRESSION' if regressed else ''))
+
+    return regressions
+
+
+def Main():
+    parser = argparse.ArgumentParser(description='Benchmarks of hot paths of FuzzyRoutines with JSON report and compare mode.')
+    parser.add_argument('--size', type=int, default=1000000, help='number of elements in batches')
+    parser.add_argument('--quick', action='store_true', help='small batches and short measurements for smoke runs')
+    parser.add_argument('--repeat', type=int, default=5, help='number of measured loops of every benchmark')
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimal duration of one loop in seconds')
+    parser.add_argument('--filter', default=None, help='run only benchmarks which names contain this string')
+    parser.add_argument('--output', default=None, help='path to JSON file for results')
+    parser.add_argument('--compare', default=None, help='path to JSON file with baseline results')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed relative growth of seconds per call, 0.2 is 20%%')
+    args = parser.parse_args()
+
+    if args.quick:
+        args.size, args.repeat, args.min_time = min(args.size, 10000), 3, 0.01
+
+    SetDefuzCache(None)  # defuzzyfication is measured without persistent cache
+
+    report = Run(args)
+
+    if args.output:
+        with open(args.output, 'w') as outputFile:
+            json.dump(report, outputFile, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as baselineFile:
+            baseline = json.load(baselineFile)
+
+        regressions = Compare(report, baseline, args.threshold)
+
+        if regressions:
+            print('\n{} benchmark(s) regressed more than {:.0%}: {}'.format(len(regressions), args.threshold, ', '.join(regressions)))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    Main()
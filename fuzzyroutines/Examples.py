@@ -49,6 +49,13 @@ for i in range(0, 10, 1):
     res = funct.mju(xPar)  # calculate one value of MF with given parameters
     print('x = {:.1f}, {} = {:1.4f}'.format(xPar, funct, res))
 
+# --- Calculating function's values for a whole array of real numbers at once (NumPy is required):
+
+if np is not None:
+    xArray = np.linspace(0, 1, 11)
+    resArray = funct.MjuArray(xArray)  # calculate all values of MF with one vectorized call
+    print('MjuArray({}) = {}'.format(funct, resArray.round(4)))
+
 # --- Work with fuzzy set:
 
 fuzzySet = FuzzySet(funct, (0., 1.))  # creating fuzzy set A = <mju_funct, support_set>
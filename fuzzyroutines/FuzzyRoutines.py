@@ -6,713 +6,3636 @@
 # e-mail: tim55667757@gmail.com
 
 
+import os
 import math
 import copy
-import traceback
+import numbers
+import heapq
+import bisect
+import csv
+import re
+import sqlite3
+import hashlib
+import threading
+import itertools
+from collections.abc import Mapping, Sequence
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import logging
+import time
+
+try:
+    import numpy as np  # optional dependency, used only by vectorized routines
+
+except ImportError:
+    np = None
+
+
+def _RequireNumpy(routineName):
+    """
+    Raise exception if NumPy is not installed but vectorized routine was called.
+    """
+    if np is None:
+        raise Exception('{} requires NumPy! Install it with: pip install fuzzyroutines[numpy]'.format(routineName))
 
 
-def DiapasonParser(diapason):
+_logger = logging.getLogger('fuzzyroutines')  # all errors of incorrect values are logged here
+
+_validation = {'policy': 'mask',  # see SetValidationPolicy()
+               'errors': 0,  # number of reported incorrect values
+               'logInterval': 1.,  # seconds of log rate window
+               'logMessages': 10,  # maximum number of log messages in window
+               'windowStart': 0.,
+               'windowMessages': 0,
+               'suppressed': 0}  # number of messages not logged because of rate limit
+_validationLock = threading.Lock()
+
+
+def SetValidationPolicy(policy, logMessages=None, logInterval=None):
     """
-    Parse input with diapason string and return sorted list of full and unique indexes in that diapason.
-    Examples:
-        String "1,5" converted to: [1, 5]
-        String "1-5" converted to: [1, 2, 3, 4, 5]
-        String "8-10, 1-5, 6" converted to: [1, 2, 3, 4, 5, 6, 8, 9, 10]
-        String "11, 11, 12, 12, 1-5, 3-7" converted to: [1, 2, 3, 4, 5, 6, 7, 11, 12]
+    Sets policy for incorrect values given to fuzzy operators, membership functions and fuzzy sets:
+        'strict' - exception is raised,
+        'mask' - routines return None (NaN in arrays), errors are logged to 'fuzzyroutines' logger (default),
+        'count' - like 'mask', but errors are only counted without logging.
+    All incorrect values are counted, see ValidationErrors(). At most logMessages errors are logged
+    in logInterval seconds, number of suppressed messages is added to the next logged one.
+    Returns previous policy.
     """
-    fullDiapason = []
+    if policy not in ('strict', 'mask', 'count'):
+        raise Exception("Validation policy must be 'strict', 'mask' or 'count'!")
 
-    try:
-        for element in diapason.split(','):
-            fullDiapason += [x for x in range(int(element.split('-')[0]), int(element.split('-')[-1]) + 1)]
+    with _validationLock:
+        previous = _validation['policy']
+        _validation['policy'] = policy
 
-    except Exception:
-        print('"{}" is not correct diapason string!'.format(diapason))
-        return []
+        if logMessages is not None:
+            _validation['logMessages'] = logMessages
 
-    return sorted(list(set(fullDiapason)))
+        if logInterval is not None:
+            _validation['logInterval'] = logInterval
 
+        _validation['windowStart'] = 0.  # new limits are applied from the next message
+        _validation['windowMessages'] = 0
 
-def IsNumber(value):
+    return previous
+
+
+def GetValidationPolicy():
+    return _validation['policy']
+
+
+def ValidationErrors(reset=False):
     """
-    Return True if value is float or integer number.
+    Returns number of incorrect values reported since start or last reset.
     """
-    return bool(not isinstance(value, bool) and (isinstance(value, int) or isinstance(value, float)))
+    with _validationLock:
+        errors = _validation['errors']
 
+        if reset:
+            _validation['errors'] = 0
 
-def IsCorrectFuzzyNumberValue(value):
+    return errors
+
+
+def _ReportInvalid(message, *args, exceptionInfo=False, count=1, canRaise=True):
     """
-    All operations in fuzzy logic are executed with numbers in interval [0, 1].
+    Reports incorrect value according to validation policy. message is formatted by args only if it is needed.
+    In 'strict' policy exception is raised if canRaise, inside of except block it is chained with the original one.
     """
-    if IsNumber(value):
-        return (0. <= value) and (value <= 1.)
+    with _validationLock:
+        _validation['errors'] += count
+        policy = _validation['policy']
+        suppressed = None
 
-    else:
-        print('{} not a real number in [0, 1], type = {}'.format(str(value), type(value)))
-        return False
+        if policy == 'mask':
+            now = time.monotonic()
 
+            if now - _validation['windowStart'] >= _validation['logInterval']:
+                _validation['windowStart'] = now
+                _validation['windowMessages'] = 0
 
-def FuzzyNOT(fuzzyNumber, alpha=0.5):
+            if _validation['windowMessages'] < _validation['logMessages']:
+                _validation['windowMessages'] += 1
+                suppressed = _validation['suppressed']
+                _validation['suppressed'] = 0
+
+            else:
+                _validation['suppressed'] += 1
+
+    if policy == 'strict' and canRaise:
+        raise Exception(message.format(*args))
+
+    if suppressed is not None:
+        _logger.warning(message.format(*args) + (' ({} similar messages were suppressed)'.format(suppressed) if suppressed else ''),
+                        exc_info=exceptionInfo)
+
+
+def _PiecewiseArray(x, out, branches, default=0.):
     """
-    Fuzzy logic NOT operator. y = 1 - Fuzzy if alpha = 0.5
+    Vectorized analog of if-elif-else chain: branches is a list of (condition, function) pairs.
+    Every element of x is calculated by the first branch whose condition is True, otherwise it equals default value.
+    Functions are called only with masked elements, so their errors in other branches are not possible.
     """
-    result = None  # return None if errors
-
-    if IsCorrectFuzzyNumberValue(fuzzyNumber) and IsCorrectFuzzyNumberValue(alpha) and alpha > 0:
-        if (0 <= fuzzyNumber) and (fuzzyNumber <= alpha):
-            result = fuzzyNumber * (alpha - 1) / alpha + 1
+    out[...] = default
+    taken = np.zeros(x.shape, dtype=bool)
 
-        else:
-            result = (fuzzyNumber - 1) * alpha / (alpha - 1)
+    for condition, function in branches:
+        mask = condition & ~taken
+        out[mask] = function(x[mask])
+        taken |= mask
 
-    return result
+    return out
 
 
-def FuzzyNOTParabolic(fuzzyNumber, alpha=0.5, epsilon=0.001):
+def _Softplus(u):
     """
-    Parabolic fuzzy NOT operator. 2a - x - y = (2a - 1)(y - x)^2.
+    Numerically stable ln(1 + e^u).
     """
-    result = None  # return None if errors
+    return max(u, 0.) + math.log1p(math.exp(-abs(u)))
 
-    if IsCorrectFuzzyNumberValue(fuzzyNumber) and IsCorrectFuzzyNumberValue(alpha) and IsCorrectFuzzyNumberValue(epsilon) and alpha > 0:
-        if fuzzyNumber == 0:
-            result = 1
 
-        elif fuzzyNumber == 1:
-            result = 0
+def _NegExpDilogarithm(u):
+    """
+    Dilogarithm Li2(-e^u) for real u. Li2(z) = sum(z^k / k^2) is used for integrating sigmoidal function.
+    For u > 0 inversion formula is used: Li2(z) + Li2(1/z) = -pi^2 / 6 - ln(-z)^2 / 2,
+    for u <= 0 Landen's identity: Li2(z) = -Li2(z / (z - 1)) - ln(1 - z)^2 / 2, where series converges fast.
+    """
+    if u > 0:
+        return -math.pi ** 2 / 6 - u ** 2 / 2 - _NegExpDilogarithm(-u)
 
-        else:
-            y = 0
-            while (y <= 1) and abs((2 * alpha - fuzzyNumber - y) - (2 * alpha - 1) * (y - fuzzyNumber) ** 2) >= epsilon / 2:
-                y += epsilon
-            result = y
+    z = -math.exp(u)
+    w = z / (z - 1)  # w in (0, 0.5]
 
-    return result
+    series, power, k = 0., w, 1
+    while power > 1e-17 * k ** 2:
+        series += power / k ** 2
+        power *= w
+        k += 1
 
+    return -series - math.log1p(-z) ** 2 / 2
 
-def FuzzyAND(aNumber, bNumber):
+
+def _StreamChunks(source, chunkSize):
     """
-    Fuzzy AND operator is minimum of two numbers.
+    Splits iterable of real numbers or file-like object with one number per line into NumPy arrays of chunkSize
+    numbers at most. Only one chunk is stored in memory at once.
     """
-    if IsNumber(aNumber) and IsNumber(bNumber):
-        return min(aNumber, bNumber)
+    _RequireNumpy('Streaming fuzzyfication')
 
-    else:
-        return None  # return None if errors
+    if not (isinstance(chunkSize, int) and chunkSize > 0):
+        raise Exception('Chunk size must be a positive integer number!')
 
+    if isinstance(source, (str, bytes)):
+        raise Exception('Source must be an iterable of numbers or file-like object, not a string!')
 
-def FuzzyOR(aNumber, bNumber):
+    iterator = iter(ReadNumbers(source) if hasattr(source, 'read') else source)
+
+    while True:
+        chunk = np.fromiter(itertools.islice(iterator, chunkSize), dtype=float)
+
+        if not chunk.size:
+            break
+
+        yield chunk
+
+
+def ReadNumbers(lines):
     """
-    Fuzzy OR operator is maximum of two numbers.
+    Generator of real numbers from iterable of strings or from text file-like object, one number per line.
+    Empty lines are skipped.
     """
-    if IsNumber(aNumber) and IsNumber(bNumber):
-        return max(aNumber, bNumber)
+    for line in lines:
+        line = line.strip()
 
-    else:
-        return None  # return None if errors
+        if line:
+            yield float(line)
 
 
-def TNorm(aFuzzyNumber, bFuzzyNumber, normType='logic'):
+def ReadCsvColumn(lines, column=0, delimiter=',', skipHeader=False):
     """
-    T-Norm conjunctive operators.
-    normType is an operator's name:
-        'logic' - result of fuzzy logic AND (min operator),
-        'algebraic' - result of algebraic multiplication operation,
-        'boundary' - result of boundary multiplication operation,
-        'drastic' - result of drastic multiplication operation.
+    Generator of real numbers from one column of CSV data: iterable of strings or text file-like object.
+    column is an index of column or its name in header, first line is used as header in that case.
+    skipHeader is a flag for skipping first line if column is an index. Rows with empty cell in column are skipped.
     """
-    result = None  # return None if errors
+    rows = csv.reader(lines, delimiter=delimiter)
 
-    if IsCorrectFuzzyNumberValue(aFuzzyNumber) and IsCorrectFuzzyNumberValue(bFuzzyNumber):
-        if normType == 'logic':
-            result = FuzzyAND(aFuzzyNumber, bFuzzyNumber)
+    if isinstance(column, str):
+        header = next(rows, [])
 
-        if normType == 'algebraic':
-            result = aFuzzyNumber * bFuzzyNumber
+        if column not in header:
+            raise Exception('Column "{}" not found in CSV header: {}'.format(column, header))
 
-        if normType == 'boundary':
-            result = FuzzyOR(aFuzzyNumber + bFuzzyNumber - 1, 0)
+        column = header.index(column)
 
-        if normType == 'drastic':
-            if aFuzzyNumber == 1:
-                result = bFuzzyNumber
+    elif skipHeader:
+        next(rows, None)
 
-            elif bFuzzyNumber == 1:
-                result = aFuzzyNumber
+    for row in rows:
+        if len(row) > column and row[column].strip():
+            yield float(row[column])
 
-            else:
-                result = 0
 
-    return result
+_parallelWorker = {}  # state of FuzzyScale.FuzzyParallel() worker process: scale and shared arrays
 
 
-def TNormCompose(*fuzzyNumbers, normType='logic'):
+def _AttachSharedMemory(name):
     """
-    T-Norm compose of n numbers.
-    normType is an operator's name:
-        'logic' - result of fuzzy logic AND (min operator),
-        'algebraic' - result of algebraic multiplication operation,
-        'boundary' - result of boundary multiplication operation,
-        'drastic' - result of drastic multiplication operation.
+    Attaches existing shared memory block in worker process. Block is owned and unlinked by parent process,
+    workers share resource tracker with it, so block is registered there only once.
     """
-    result = None  # return None if errors
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+ does not register block at all
 
-    if len(fuzzyNumbers) >= 1:
-        if IsNumber(fuzzyNumbers[0]):
-            result = fuzzyNumbers[0]
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
 
-        for f in fuzzyNumbers[1:]:
-            result = TNorm(result, f, normType)
 
-    return result
+def _ParallelInit(scale, inputName, outputName, size, outputType):
+    """
+    Initializer of FuzzyScale.FuzzyParallel() worker process: scale is received once per worker,
+    input and output arrays are mapped to shared memory blocks without copying.
+    """
+    inputBlock = _AttachSharedMemory(inputName)
+    outputBlock = _AttachSharedMemory(outputName)
 
+    _parallelWorker['scale'] = scale
+    _parallelWorker['blocks'] = (inputBlock, outputBlock)  # blocks must live as long as arrays
+    _parallelWorker['input'] = np.ndarray((size,), dtype=float, buffer=inputBlock.buf)
+    _parallelWorker['output'] = np.ndarray((size,), dtype=outputType, buffer=outputBlock.buf)
 
-def SCoNorm(aFuzzyNumber, bFuzzyNumber, normType='logic'):
+
+def _ParallelFuzzyTask(bounds):
     """
-    S-coNorm disjunctive operators.
-    normType is an operator's name:
-        'logic' - result of fuzzy logic OR (max operator),
-        'algebraic' - result of algebraic addition operation,
-        'boundary' - result of boundary addition operation,
-        'drastic' - result of drastic addition operation.
+    Task of FuzzyScale.FuzzyParallel() worker: fuzzyfies values[start:stop] and writes level indexes in place.
     """
-    result = None  # return None if errors
+    start, stop = bounds
+    _parallelWorker['scale'].FuzzyBatch(_parallelWorker['input'][start:stop], out=_parallelWorker['output'][start:stop])
 
-    if IsCorrectFuzzyNumberValue(aFuzzyNumber) and IsCorrectFuzzyNumberValue(bFuzzyNumber):
-        if normType == 'logic':
-            result = FuzzyOR(aFuzzyNumber, bFuzzyNumber)
 
-        if normType == 'algebraic':
-            result = aFuzzyNumber + bFuzzyNumber - aFuzzyNumber * bFuzzyNumber
+class RangeSet(Sequence):
+    """
+    Sorted set of unique integers, stored as merged intervals [first, last]. It is returned by ParseDiapason().
+    Memory and time depend on number of intervals k, not on their widths: membership test and indexing
+    take O(log k), len() is O(1), iteration and slicing are lazy, slice with step returns lazy view of elements
+    at positions of slice. Union and intersection are calculated
+    on intervals, other operand may be RangeSet or diapason string.
+    Example: RangeSet([(8, 10), (1, 5), (6, 6)]) contains 1, 2, ..., 10 except 7, intervals = ((1, 6), (8, 10)).
+    """
+    __slots__ = ('_firsts', '_lasts', '_offsets', '_length')
 
-        if normType == 'boundary':
-            result = FuzzyAND(aFuzzyNumber + bFuzzyNumber, 1)
+    def __init__(self, intervals=()):
+        """
+        intervals is an iterable of pairs (first, last) of integers, they may be unsorted and overlapped.
+        Pairs with first > last are empty and skipped.
+        """
+        firsts, lasts = [], []
 
-        if normType == 'drastic':
-            if aFuzzyNumber == 0:
-                result = bFuzzyNumber
+        for first, last in sorted((int(first), int(last)) for first, last in intervals):
+            if first > last:
+                continue
 
-            elif bFuzzyNumber == 0:
-                result = aFuzzyNumber
+            if lasts and first <= lasts[-1] + 1:  # overlapped or adjacent intervals are merged
+                lasts[-1] = max(lasts[-1], last)
 
             else:
-                result = 1
+                firsts.append(first)
+                lasts.append(last)
 
-    return result
+        self._SetIntervals(firsts, lasts)
 
+    def _SetIntervals(self, firsts, lasts):
+        offsets = [0] * len(firsts)  # number of elements before every interval
+        length = 0
 
-def SCoNormCompose(*fuzzyNumbers, normType='logic'):
-    """
-    S-coNorm compose of n numbers.
-    normType is an operator's name:
-        'logic' - result of fuzzy logic AND (min operator),
-        'algebraic' - result of algebraic multiplication operation,
-        'boundary' - result of boundary multiplication operation,
-        'drastic' - result of drastic multiplication operation.
-    """
-    result = None  # return None if errors
+        for position, (first, last) in enumerate(zip(firsts, lasts)):
+            offsets[position] = length
+            length += last - first + 1
 
-    if len(fuzzyNumbers) >= 1:
-        if IsNumber(fuzzyNumbers[0]):
-            result = fuzzyNumbers[0]
+        self._firsts = tuple(firsts)
+        self._lasts = tuple(lasts)
+        self._offsets = tuple(offsets)
+        self._length = length
 
-        for f in fuzzyNumbers[1:]:
-            result = SCoNorm(result, f, normType)
+    @classmethod
+    def _FromMerged(cls, firsts, lasts):
+        rangeSet = cls.__new__(cls)
+        rangeSet._SetIntervals(firsts, lasts)
 
-    return result
+        return rangeSet
 
+    def __reduce__(self):
+        return RangeSet, (self.intervals,)
 
-class MFunction():
-    """
-    Routines for work with some default membership functions.
-    """
+    @property
+    def intervals(self):
+        return tuple(zip(self._firsts, self._lasts))  # sorted, not overlapped and not adjacent intervals
 
-    def __init__(self, userFunc, **membershipFunctionParams):
-        self.accuracy = 1000  # Line of numbers divided by points, affect on accuracy, using in integral calculating
-        self._functions = {'hyperbolic': self.Hyperbolic,
-                           'bell': self.Bell,
-                           'parabolic': self.Parabolic,
-                           'triangle': self.Triangle,
-                           'trapezium': self.Trapezium,
-                           'exponential': self.Exponential,
-                           'sigmoidal': self.Sigmoidal,
-                           'desirability': self.Desirability}  # Factory registrator for all membership functions
-        self.mju = self._functions[userFunc]  # Calculate result of define membership function
+    def __len__(self):
+        return self._length
 
-        if membershipFunctionParams or self.mju.__name__ == 'Desirability':
-            self._parameters = membershipFunctionParams  # parameters for using in membership function
+    def __bool__(self):
+        return self._length > 0
 
-        else:
-            raise Exception("You must specify all membership function's parameters!")
+    def __contains__(self, value):
+        if not isinstance(value, numbers.Integral) or isinstance(value, bool):
+            return False
 
-    @property
-    def name(self):
-        return self.mju.__name__  # membership function method name
+        position = bisect.bisect_right(self._firsts, value) - 1
 
-    def __str__(self):
-        # return view of function: Function_name(**parameters). Example: Bell(x, {"a": 0.6, "b": 0.66, "c": 0.77}
-        funcView = '{}({})'.format(self.name, 'y' if self.name == 'Desirability' else 'x, {}'.format(
-            '{' + ', '.join('"{}": {}'.format(*val) for val in [(k, self._parameters[k])
-                                                                for k in sorted(self._parameters)]) + '}'))
-        return funcView
+        return position >= 0 and value <= self._lasts[position]
 
-    @property
-    def parameters(self):
-        return self._parameters  # all membership function parameters
+    def __iter__(self):
+        for first, last in zip(self._firsts, self._lasts):
+            yield from range(first, last + 1)
 
-    @parameters.setter
-    def parameters(self, value):
-        if value or self.mju.__name__ == 'Desirability':
-            self._parameters = value
+    def __reversed__(self):
+        for first, last in zip(reversed(self._firsts), reversed(self._lasts)):
+            yield from range(last, first - 1, -1)
 
-        else:
-            raise Exception("You must specify all membership function's parameters!")
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
 
-    def Hyperbolic(self, x):
-        """
-        This is hyperbolic membership function with real inputs x and parameters a, b, c.
-        """
-        a, b, c, result = 0, 0, 0, 0
+            if step != 1:
+                return _SteppedRangeSet(self, range(start, stop, step))
 
-        try:
-            a = self._parameters['a']
-            b = self._parameters['b']
-            c = self._parameters['c']
+            if start >= stop:
+                return RangeSet()
 
-            if x <= c:
-                result = 1
+            return self._Slice(start, stop)
 
-            else:
-                result = 1 / (1 + (a * (x - c)) ** b)
+        if index < 0:
+            index += self._length
 
-        except Exception:
-            print(traceback.format_exc())
-            print('Hyperbolic membership function use real inputs x and parameters a, b, c.')
-            print('Your inputs: mju_hyperbolic({}, {}, {}, {})'.format(x, a, b, c))
-            return 0
+        if not 0 <= index < self._length:
+            raise IndexError('RangeSet index out of range')
 
-        return result
+        position = bisect.bisect_right(self._offsets, index) - 1
 
-    def Bell(self, x):
+        return self._firsts[position] + index - self._offsets[position]
+
+    def _Slice(self, start, stop):
         """
-        This is bell membership function with real inputs x and parameters a, b, c.
+        Returns RangeSet with elements from start to stop - 1 positions, only intervals inside of slice are copied.
         """
-        a, b, c, result = 0, 0, 0, 0
+        firstPosition = bisect.bisect_right(self._offsets, start) - 1
+        lastPosition = bisect.bisect_right(self._offsets, stop - 1) - 1
 
-        try:
-            a = self._parameters['a']
-            b = self._parameters['b']
-            c = self._parameters['c']
+        firsts = list(self._firsts[firstPosition:lastPosition + 1])
+        lasts = list(self._lasts[firstPosition:lastPosition + 1])
+        firsts[0] += start - self._offsets[firstPosition]
+        lasts[-1] = self._firsts[lastPosition] + stop - 1 - self._offsets[lastPosition]
 
-            if x < b:
-                result = self.Parabolic(x)
+        return RangeSet._FromMerged(firsts, lasts)
 
-            elif (b <= x) and (x <= c):
-                result = 1
+    def index(self, value, start=0, stop=None):
+        if value in self:
+            position = bisect.bisect_right(self._firsts, value) - 1
+            index = self._offsets[position] + value - self._firsts[position]
 
-            else:
-                aOld = self._parameters['a']
-                bOld = self._parameters['b']
+            if start <= index and (stop is None or index < stop):
+                return index
 
-                self._parameters['a'] = c
-                self._parameters['b'] = c + b - a
+        raise ValueError('{} is not in RangeSet'.format(value))
 
-                result = 1 - self.Parabolic(x)
+    def count(self, value):
+        return int(value in self)
 
-                self._parameters['a'] = aOld
-                self._parameters['b'] = bOld
+    @staticmethod
+    def _Operand(other):
+        if isinstance(other, RangeSet):
+            return other
 
-        except Exception:
-            print(traceback.format_exc())
-            print('Bell membership function use real inputs x and parameters a, b, c.')
-            print('Your inputs: mju_bell({}, {}, {}, {})'.format(x, a, b, c))
-            return 0
+        if isinstance(other, str):
+            return ParseDiapason(other)
 
-        return result
+        raise TypeError('RangeSet or diapason string is expected, but {} is given!'.format(type(other)))
 
-    def Parabolic(self, x):
+    def Union(self, other):
         """
-        This is parabolic membership function with real inputs x and parameters a, b.
+        Returns RangeSet with elements of this set or other RangeSet or diapason string.
         """
-        a, b, result = 0, 0, 0
+        return RangeSet(self.intervals + self._Operand(other).intervals)
 
-        try:
-            a = self._parameters['a']
-            b = self._parameters['b']
+    def Intersection(self, other):
+        """
+        Returns RangeSet with elements which are both in this set and in other RangeSet or diapason string.
+        Intervals of both sets are walked once: O(k1 + k2).
+        """
+        other = self._Operand(other)
+        firsts, lasts = [], []
+        left = right = 0
 
-            if x <= a:
-                result = 0
+        while left < len(self._firsts) and right < len(other._firsts):
+            first = max(self._firsts[left], other._firsts[right])
+            last = min(self._lasts[left], other._lasts[right])
 
-            elif (a < x) and (x <= (a + b) / 2):
-                result = (2 * (x - a) ** 2) / (b - a) ** 2
+            if first <= last:
+                firsts.append(first)
+                lasts.append(last)
 
-            elif ((a + b) / 2 < x) and (x < b):
-                result = 1 - (2 * (x - b) ** 2) / (b - a) ** 2
+            if self._lasts[left] < other._lasts[right]:
+                left += 1
 
             else:
-                result = 1
+                right += 1
 
-        except Exception:
-            print(traceback.format_exc())
-            print('Parabolic membership function use real inputs x and parameters a, b.')
-            print('Your inputs: mju_parabolic({}, {}, {})'.format(x, a, b))
-            return 0
+        return RangeSet._FromMerged(firsts, lasts)
 
-        return result
+    def __or__(self, other):
+        return self.Union(other) if isinstance(other, (RangeSet, str)) else NotImplemented
 
-    def Triangle(self, x):
-        """
-        This is triangle membership function with real inputs x and parameters a, b, c.
-        """
-        a, b, c, result = 0, 0, 0, 0
+    def __and__(self, other):
+        return self.Intersection(other) if isinstance(other, (RangeSet, str)) else NotImplemented
 
-        try:
-            a = self._parameters['a']
-            b = self._parameters['b']
-            c = self._parameters['c']
+    __ror__ = __or__
+    __rand__ = __and__
 
-            if x <= a:
-                result = 0
+    def __eq__(self, other):
+        if isinstance(other, RangeSet):
+            return self._firsts == other._firsts and self._lasts == other._lasts
 
-            elif (a < x) and (x <= c):
-                result = (x - a) / (c - a)
+        return NotImplemented
 
-            elif (c < x) and (x < b):
-                result = (b - x) / (b - c)
+    def __hash__(self):
+        return hash((self._firsts, self._lasts))
 
-            else:
-                result = 0
+    def __repr__(self):
+        return 'RangeSet("{}")'.format(str(self))
 
-        except Exception:
-            print(traceback.format_exc())
-            print('Triangle membership function use real inputs x and parameters a, b, c.')
-            print('Your inputs: mju_triangle({}, {}, {}, {})'.format(x, a, b, c))
-            return 0
+    def __str__(self):
+        return ', '.join(str(first) if first == last else '{}-{}'.format(first, last) for first, last in self.intervals)
 
-        return result
 
-    def Trapezium(self, x):
-        """
-        This is trapezium membership function with real inputs x and parameters a, b, c, d.
-        """
-        a, b, c, d, result = 0, 0, 0, 0, 0
+class _SteppedRangeSet(Sequence):
+    """
+    Lazy view of elements of RangeSet at positions of range, it is returned by slicing of RangeSet with step.
+    Only RangeSet and range of positions are stored, indexing and membership test take O(log k).
+    """
+    __slots__ = ('_rangeSet', '_positions')
 
-        try:
-            a = self._parameters['a']
-            b = self._parameters['b']
-            c = self._parameters['c']
-            d = self._parameters['d']
+    def __init__(self, rangeSet, positions):
+        self._rangeSet = rangeSet
+        self._positions = positions
 
-            if x < a:
-                result = 0
+    def __len__(self):
+        return len(self._positions)
 
-            elif (a < x) and (x < c):
-                result = (x - a) / (c - a)
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return _SteppedRangeSet(self._rangeSet, self._positions[index])
 
-            elif (c <= x) and (x <= d):
-                result = 1
+        return self._rangeSet[self._positions[index]]
 
-            elif (d < x) and (x <= b):
-                result = (b - x) / (b - d)
+    def __iter__(self):
+        for position in self._positions:
+            yield self._rangeSet[position]
 
-            else:
-                result = 0
+    def __contains__(self, value):
+        return value in self._rangeSet and self._rangeSet.index(value) in self._positions
 
-        except Exception:
-            print(traceback.format_exc())
-            print('Trapezium membership function use real inputs x and parameters a, b, c, d.')
-            print('Your inputs: mju_trapezium({}, {}, {}, {}, {})'.format(x, a, b, c, d))
-            return 0
+    def index(self, value, start=0, stop=None):
+        if value in self:
+            index = self._positions.index(self._rangeSet.index(value))
 
-        return result
+            if start <= index and (stop is None or index < stop):
+                return index
 
-    def Exponential(self, x):
-        """
-        This is exponential membership function with real inputs x and parameters a, b.
-        """
-        a, b, result = 0, 0, 0
+        raise ValueError('{} is not in sequence'.format(value))
 
-        try:
+    def count(self, value):
+        return int(value in self)
+
+    def __repr__(self):
+        return '{!r}[{}:{}:{}]'.format(self._rangeSet, self._positions.start, self._positions.stop, self._positions.step)
+
+
+def ParseDiapason(diapason):
+    """
+    Parse diapason string and return RangeSet with sorted unique indexes in that diapason.
+    Only bounds of ranges are parsed, so long ranges like "1-1000000000" cost nothing.
+    Examples:
+        String "8-10, 1-5, 6" converted to: RangeSet("1-6, 8-10")
+        String "11, 11, 12, 12, 1-5, 3-7" converted to: RangeSet("1-7, 11-12")
+    Incorrect diapason is reported according to validation policy, see SetValidationPolicy(), and empty RangeSet is returned.
+    """
+    intervals = []
+
+    try:
+        for element in diapason.split(','):
+            bounds = element.split('-')
+            intervals.append((int(bounds[0]), int(bounds[-1])))
+
+    except Exception:
+        _ReportInvalid('"{}" is not correct diapason string!', diapason)
+        return RangeSet()
+
+    return RangeSet(intervals)
+
+
+def DiapasonParser(diapason):
+    """
+    Parse input with diapason string and return sorted list of full and unique indexes in that diapason.
+    Examples:
+        String "1,5" converted to: [1, 5]
+        String "1-5" converted to: [1, 2, 3, 4, 5]
+        String "8-10, 1-5, 6" converted to: [1, 2, 3, 4, 5, 6, 8, 9, 10]
+        String "11, 11, 12, 12, 1-5, 3-7" converted to: [1, 2, 3, 4, 5, 6, 7, 11, 12]
+    Use ParseDiapason() to get lazy RangeSet instead of list for long diapasons.
+    """
+    return list(ParseDiapason(diapason))
+
+
+def IsNumber(value):
+    """
+    Return True if value is float or integer number.
+    """
+    return bool(not isinstance(value, bool) and (isinstance(value, int) or isinstance(value, float)))
+
+
+def IsCorrectFuzzyNumberValue(value):
+    """
+    All operations in fuzzy logic are executed with numbers in interval [0, 1].
+    Incorrect values are reported according to validation policy, see SetValidationPolicy().
+    """
+    if IsNumber(value) and (0. <= value) and (value <= 1.):
+        return True
+
+    _ReportInvalid('{} not a real number in [0, 1], type = {}', value, type(value))
+    return False
+
+
+def IsCorrectFuzzyArray(values, out=None):
+    """
+    Batch version of IsCorrectFuzzyNumberValue(): returns boolean mask which is True for elements of array
+    that are real numbers in [0, 1] (not NaN). Nothing is reported, use mask to filter or count incorrect values.
+    out is an optional preallocated boolean array with the same shape as values.
+    """
+    _RequireNumpy('IsCorrectFuzzyArray()')
+
+    try:
+        x = np.asarray(values, dtype=float)
+
+    except (TypeError, ValueError):
+        x = np.asarray(values, dtype=object)
+        x = np.vectorize(lambda value: float(value) if IsNumber(value) else np.nan, otypes=[float])(x)  # not numbers are NaN
+
+    if out is None:
+        out = np.empty(x.shape, dtype=bool)
+
+    elif out.shape != x.shape:
+        raise Exception('Output buffer shape {} must be equal to input shape {}!'.format(out.shape, x.shape))
+
+    return np.less_equal(np.abs(x - 0.5), 0.5, out=out)  # NaN gives False
+
+
+def FuzzyNOT(fuzzyNumber, alpha=0.5):
+    """
+    Fuzzy logic NOT operator. y = 1 - Fuzzy if alpha = 0.5
+    """
+    result = None  # return None if errors
+
+    if IsCorrectFuzzyNumberValue(fuzzyNumber) and IsCorrectFuzzyNumberValue(alpha) and alpha > 0:
+        if (0 <= fuzzyNumber) and (fuzzyNumber <= alpha):
+            result = fuzzyNumber * (alpha - 1) / alpha + 1
+
+        else:
+            result = (fuzzyNumber - 1) * alpha / (alpha - 1)
+
+    return result
+
+
+def _FuzzyNOTParabolicRoots(fuzzyNumber, alpha):
+    """
+    Both roots of parabolic fuzzy NOT equation 2a - x - y = (2a - 1)(y - x)^2 solved as quadratic equation for y.
+    With d = y - x equation looks like k * d^2 + d - c = 0, where k = 2a - 1, c = 2(a - x).
+    Roots are calculated in numerically stable form, the second root is None if k = 0 (equation is linear).
+    """
+    k = 2 * alpha - 1
+    c = 2 * (alpha - fuzzyNumber)
+    q = -0.5 * (1 + math.sqrt(max(1 + 4 * k * c, 0.)))  # discriminant is negative only due to rounding errors
+
+    return fuzzyNumber - c / q, fuzzyNumber + q / k if k != 0 else None
+
+
+def FuzzyNOTParabolic(fuzzyNumber, alpha=0.5, epsilon=0.001, method='exact'):
+    """
+    Parabolic fuzzy NOT operator. 2a - x - y = (2a - 1)(y - x)^2.
+    method is a way of solving the equation:
+        'exact' - the least root in [0, 1] of the quadratic equation for y, calculated in constant time,
+        'scan' - reference linear scan of y = 0, epsilon, 2 * epsilon, ... with O(1 / epsilon) iterations.
+    epsilon is an accuracy of 'scan' method only. If some alpha near 0 or 1 the equation has no root in [0, 1],
+    then the root nearest to [0, 1] is clipped to this interval.
+    """
+    if method not in ('exact', 'scan'):
+        raise Exception("Method must be 'exact' or 'scan'!")
+
+    result = None  # return None if errors
+
+    if IsCorrectFuzzyNumberValue(fuzzyNumber) and IsCorrectFuzzyNumberValue(alpha) and IsCorrectFuzzyNumberValue(epsilon) and alpha > 0:
+        if fuzzyNumber == 0:
+            result = 1
+
+        elif fuzzyNumber == 1:
+            result = 0
+
+        elif method == 'exact':
+            roots = [(max(0., -y, y - 1), y) for y in _FuzzyNOTParabolicRoots(fuzzyNumber, alpha) if y is not None]
+            result = min(max(min(roots)[1], 0.), 1.)  # the least root in [0, 1] or the nearest one to that interval
+
+        elif method == 'scan':
+            y = 0
+            while (y <= 1) and abs((2 * alpha - fuzzyNumber - y) - (2 * alpha - 1) * (y - fuzzyNumber) ** 2) >= epsilon / 2:
+                y += epsilon
+            result = y
+
+    return result
+
+
+def FuzzyNOTParabolicArray(fuzzyNumbers, alpha=0.5, out=None):
+    """
+    Vectorized version of FuzzyNOTParabolic() with 'exact' method for every element of array fuzzyNumbers.
+    Result is NaN for elements out of [0, 1].
+    out is an optional preallocated float array with the same shape as fuzzyNumbers, results are written into it.
+    """
+    _RequireNumpy('FuzzyNOTParabolicArray()')
+
+    if not (IsCorrectFuzzyNumberValue(alpha) and alpha > 0):
+        raise Exception('Parameter alpha must be a real number in (0, 1]!')
+
+    x = np.asarray(fuzzyNumbers, dtype=float)
+
+    if out is None:
+        out = np.empty(x.shape, dtype=float)
+
+    elif out.shape != x.shape:
+        raise Exception('Output buffer shape {} must be equal to input shape {}!'.format(out.shape, x.shape))
+
+    k = 2 * alpha - 1
+    c = 2 * (alpha - x)
+    q = -0.5 * (1 + np.sqrt(np.maximum(1 + 4 * k * c, 0.)))
+    firstRoot = x - c / q
+    secondRoot = x + q / k if k != 0 else np.full(x.shape, np.nan)
+
+    firstDistance = np.maximum(np.maximum(-firstRoot, firstRoot - 1), 0.)  # distance from root to [0, 1]
+    secondDistance = np.maximum(np.maximum(-secondRoot, secondRoot - 1), 0.)
+    secondPreferred = (secondDistance < firstDistance) | ((secondDistance == firstDistance) & (secondRoot < firstRoot))
+
+    np.clip(np.where(secondPreferred, secondRoot, firstRoot), 0., 1., out=out)
+
+    out[x == 0] = 1.
+    out[x == 1] = 0.
+    out[~((0 <= x) & (x <= 1))] = np.nan  # also catches NaN elements
+
+    return out
+
+
+def FuzzyAND(aNumber, bNumber):
+    """
+    Fuzzy AND operator is minimum of two numbers.
+    """
+    if IsNumber(aNumber) and IsNumber(bNumber):
+        return min(aNumber, bNumber)
+
+    else:
+        return None  # return None if errors
+
+
+def FuzzyOR(aNumber, bNumber):
+    """
+    Fuzzy OR operator is maximum of two numbers.
+    """
+    if IsNumber(aNumber) and IsNumber(bNumber):
+        return max(aNumber, bNumber)
+
+    else:
+        return None  # return None if errors
+
+
+def _TNormAlgebraic(a, b):
+    return a * b
+
+
+def _TNormBoundary(a, b):
+    return max(a + b - 1, 0)
+
+
+def _TNormDrastic(a, b):
+    if a == 1:
+        return b
+
+    elif b == 1:
+        return a
+
+    else:
+        return 0
+
+
+def _SCoNormAlgebraic(a, b):
+    return a + b - a * b
+
+
+def _SCoNormBoundary(a, b):
+    return min(a + b, 1)
+
+
+def _SCoNormDrastic(a, b):
+    if a == 0:
+        return b
+
+    elif b == 0:
+        return a
+
+    else:
+        return 1
+
+
+def _Compose(fuzzyNumbers, norm):
+    """
+    Folds fuzzy numbers by norm from left to right. All numbers are checked once before folding,
+    result is None if some of them is not correct fuzzy number, or if norm is None (unknown norm type).
+    Folding is stopped on absorbing element of norm, because result can't change after it.
+    Single number is returned as is, like TNormCompose() and SCoNormCompose() always did.
+    """
+    if not fuzzyNumbers or not IsNumber(fuzzyNumbers[0]):
+        return None  # return None if errors
+
+    if len(fuzzyNumbers) == 1:
+        return fuzzyNumbers[0]
+
+    if norm is None or not all(IsCorrectFuzzyNumberValue(f) for f in fuzzyNumbers):
+        return None
+
+    kernel = norm.scalar
+    absorbing = norm.absorbing
+
+    result = fuzzyNumbers[0]
+    for f in fuzzyNumbers[1:]:
+        if result == absorbing:
+            break
+
+        result = kernel(result, f)
+
+    return result
+
+
+def TNorm(aFuzzyNumber, bFuzzyNumber, normType='logic'):
+    """
+    T-Norm conjunctive operators.
+    normType is an operator's name:
+        'logic' - result of fuzzy logic AND (min operator),
+        'algebraic' - result of algebraic multiplication operation,
+        'boundary' - result of boundary multiplication operation,
+        'drastic' - result of drastic multiplication operation,
+        'einstein' - result of Einstein product,
+    or name of other T-Norm registered by RegisterNorm(), or FuzzyNorm instance.
+    """
+    result = None  # return None if errors
+
+    if IsCorrectFuzzyNumberValue(aFuzzyNumber) and IsCorrectFuzzyNumberValue(bFuzzyNumber):
+        norm = _FindNorm(normType, _tNorms)
+
+        if norm is not None:
+            result = norm.scalar(aFuzzyNumber, bFuzzyNumber)
+
+    return result
+
+
+def TNormCompose(*fuzzyNumbers, normType='logic'):
+    """
+    T-Norm compose of n numbers.
+    normType is an operator's name:
+        'logic' - result of fuzzy logic AND (min operator),
+        'algebraic' - result of algebraic multiplication operation,
+        'boundary' - result of boundary multiplication operation,
+        'drastic' - result of drastic multiplication operation,
+        'einstein' - result of Einstein product,
+    or name of other T-Norm registered by RegisterNorm(), or FuzzyNorm instance.
+    """
+    return _Compose(fuzzyNumbers, _FindNorm(normType, _tNorms))
+
+
+def SCoNorm(aFuzzyNumber, bFuzzyNumber, normType='logic'):
+    """
+    S-coNorm disjunctive operators.
+    normType is an operator's name:
+        'logic' - result of fuzzy logic OR (max operator),
+        'algebraic' - result of algebraic addition operation,
+        'boundary' - result of boundary addition operation,
+        'drastic' - result of drastic addition operation,
+        'einstein' - result of Einstein sum,
+    or name of other S-coNorm registered by RegisterNorm(), or FuzzyNorm instance.
+    """
+    result = None  # return None if errors
+
+    if IsCorrectFuzzyNumberValue(aFuzzyNumber) and IsCorrectFuzzyNumberValue(bFuzzyNumber):
+        norm = _FindNorm(normType, _sCoNorms)
+
+        if norm is not None:
+            result = norm.scalar(aFuzzyNumber, bFuzzyNumber)
+
+    return result
+
+
+def SCoNormCompose(*fuzzyNumbers, normType='logic'):
+    """
+    S-coNorm compose of n numbers.
+    normType is an operator's name:
+        'logic' - result of fuzzy logic OR (max operator),
+        'algebraic' - result of algebraic addition operation,
+        'boundary' - result of boundary addition operation,
+        'drastic' - result of drastic addition operation,
+        'einstein' - result of Einstein sum,
+    or name of other S-coNorm registered by RegisterNorm(), or FuzzyNorm instance.
+    """
+    return _Compose(fuzzyNumbers, _FindNorm(normType, _sCoNorms))
+
+
+def _FuzzyArrayArguments(routineName, arrays, out, invalid, fuzzyRange=True):
+    """
+    Prepares arguments of vectorized fuzzy operators: converts them to float arrays, checks out buffer shape
+    against broadcast shape of arguments and applies policy for invalid elements:
+        'mask' - mask of invalid elements is returned, operator sets NaN into them,
+        'raise' - exception is raised if there is at least one invalid element,
+        'ignore' - elements are not checked, result for invalid ones is undefined.
+    Elements are invalid if they are NaN or, if fuzzyRange is True, out of [0, 1].
+    Returns (arrays, out, invalidMask), invalidMask is None if there is nothing to mask.
+    """
+    _RequireNumpy(routineName)
+
+    arrays = [np.asarray(array, dtype=float) for array in arrays]
+    shape = np.broadcast_shapes(*[array.shape for array in arrays])
+
+    if out is None:
+        out = np.empty(shape, dtype=float)
+
+    elif out.shape != shape:
+        raise Exception('Output buffer shape {} must be equal to input shape {}!'.format(out.shape, shape))
+
+    return arrays, out, _InvalidMask(routineName, arrays, invalid, fuzzyRange)
+
+
+def _InvalidMask(routineName, arrays, invalid, fuzzyRange=True):
+    """
+    Returns mask of invalid elements of arrays (broadcasted together) according to policy, see _FuzzyArrayArguments().
+    If invalid is None, it is chosen by validation policy: 'raise' for 'strict', otherwise 'mask'.
+    Masked elements are reported as one error per call and counted by their number.
+    """
+    if invalid is None:
+        invalid = 'raise' if _validation['policy'] == 'strict' else 'mask'
+
+    if invalid not in ('mask', 'raise', 'ignore'):
+        raise Exception("Policy for invalid elements must be 'mask', 'raise' or 'ignore'!")
+
+    invalidMask = None
+    if invalid != 'ignore':
+        for array in arrays:
+            arrayMask = ~IsCorrectFuzzyArray(array) if fuzzyRange else np.isnan(array)
+
+            if arrayMask.any():
+                invalidMask = arrayMask if invalidMask is None else invalidMask | arrayMask
+
+        if invalidMask is not None:
+            message = '{} got {} elements which are not real numbers{}!'.format(
+                routineName, np.count_nonzero(invalidMask), ' in [0, 1]' if fuzzyRange else '')
+
+            if invalid == 'raise':
+                raise Exception(message)
+
+            _ReportInvalid(message, count=int(np.count_nonzero(invalidMask)), canRaise=False)  # 'mask' is given explicitly
+
+    return invalidMask
+
+
+def _MaskInvalid(out, invalidMask):
+    if invalidMask is not None:
+        np.copyto(out, np.nan, where=invalidMask)
+
+    return out
+
+
+def FuzzyNOTArray(fuzzyNumbers, alpha=0.5, out=None, invalid=None):
+    """
+    Vectorized version of FuzzyNOT() for every element of array fuzzyNumbers.
+    out is an optional preallocated float array with the same shape as fuzzyNumbers, it may be fuzzyNumbers itself.
+    invalid is a policy for elements out of [0, 1]: 'mask' (result is NaN), 'raise' or 'ignore',
+    by default it is chosen by validation policy, see SetValidationPolicy().
+    """
+    if not (IsNumber(alpha) and 0 < alpha <= 1):
+        raise Exception('Parameter alpha must be a real number in (0, 1]!')
+
+    (x,), out, invalidMask = _FuzzyArrayArguments('FuzzyNOTArray()', [fuzzyNumbers], out, invalid)
+
+    upper = x > alpha
+    if alpha < 1 and upper.any():
+        upperValues = (x[upper] - 1) * (alpha / (alpha - 1))  # calculated before out is changed, out may be x
+
+    else:
+        upperValues = None
+
+    np.multiply(x, (alpha - 1) / alpha, out=out)
+    out += 1
+
+    if upperValues is not None:
+        out[upper] = upperValues
+
+    return _MaskInvalid(out, invalidMask)
+
+
+def FuzzyANDArray(aNumbers, bNumbers, out=None, invalid=None):
+    """
+    Vectorized version of FuzzyAND(): elementwise minimum of broadcasted arrays.
+    invalid is a policy for NaN elements: 'mask' (result is NaN), 'raise' or 'ignore',
+    by default it is chosen by validation policy, see SetValidationPolicy().
+    """
+    (a, b), out, invalidMask = _FuzzyArrayArguments('FuzzyANDArray()', [aNumbers, bNumbers], out, invalid, fuzzyRange=False)
+
+    return _MaskInvalid(np.minimum(a, b, out=out), invalidMask)
+
+
+def FuzzyORArray(aNumbers, bNumbers, out=None, invalid=None):
+    """
+    Vectorized version of FuzzyOR(): elementwise maximum of broadcasted arrays.
+    invalid is a policy for NaN elements: 'mask' (result is NaN), 'raise' or 'ignore',
+    by default it is chosen by validation policy, see SetValidationPolicy().
+    """
+    (a, b), out, invalidMask = _FuzzyArrayArguments('FuzzyORArray()', [aNumbers, bNumbers], out, invalid, fuzzyRange=False)
+
+    return _MaskInvalid(np.maximum(a, b, out=out), invalidMask)
+
+
+def _DrasticArray(a, b, neutral, absorbing, out):
+    """
+    Drastic operator: b if a is neutral element, a if b is neutral element, otherwise absorbing element.
+    Masks are calculated before out is changed, so out may be one of arguments.
+    """
+    aNeutral = a == neutral
+    bNeutral = b == neutral
+    otherwise = ~(aNeutral | bNeutral)
+
+    np.copyto(out, a, where=bNeutral)
+    np.copyto(out, b, where=aNeutral)  # if both are neutral, then a = b
+    np.copyto(out, absorbing, where=otherwise)
+
+    return out
+
+
+def _TNormLogicArray(a, b, out):
+    return np.minimum(a, b, out=out)
+
+
+def _TNormAlgebraicArray(a, b, out):
+    return np.multiply(a, b, out=out)
+
+
+def _TNormBoundaryArray(a, b, out):
+    np.add(a, b, out=out)
+    out -= 1
+
+    return np.maximum(out, 0., out=out)
+
+
+def _TNormDrasticArray(a, b, out):
+    return _DrasticArray(a, b, 1., 0., out)
+
+
+def _SCoNormLogicArray(a, b, out):
+    return np.maximum(a, b, out=out)
+
+
+def _SCoNormAlgebraicArray(a, b, out):
+    product = a * b  # calculated before out is changed, out may be one of arguments
+    np.add(a, b, out=out)
+    out -= product
+
+    return out
+
+
+def _SCoNormBoundaryArray(a, b, out):
+    np.add(a, b, out=out)
+
+    return np.minimum(out, 1., out=out)
+
+
+def _SCoNormDrasticArray(a, b, out):
+    return _DrasticArray(a, b, 0., 1., out)
+
+
+def TNormArray(aFuzzyNumbers, bFuzzyNumbers, normType='logic', out=None, invalid=None):
+    """
+    Vectorized version of TNorm() for broadcasted arrays, e.g. matrix of membership values (rules x samples)
+    and vector of samples. normType is the same as in TNorm().
+    out is an optional preallocated float array with broadcast shape of arguments, it may be one of them.
+    invalid is a policy for elements out of [0, 1]: 'mask' (result is NaN), 'raise' or 'ignore',
+    by default it is chosen by validation policy, see SetValidationPolicy().
+    """
+    norm = _RequireNorm(normType, _tNorms)
+
+    (a, b), out, invalidMask = _FuzzyArrayArguments('TNormArray()', [aFuzzyNumbers, bFuzzyNumbers], out, invalid)
+
+    return _MaskInvalid(norm.array(a, b, out), invalidMask)
+
+
+def SCoNormArray(aFuzzyNumbers, bFuzzyNumbers, normType='logic', out=None, invalid=None):
+    """
+    Vectorized version of SCoNorm() for broadcasted arrays. normType is the same as in SCoNorm().
+    out is an optional preallocated float array with broadcast shape of arguments, it may be one of them.
+    invalid is a policy for elements out of [0, 1]: 'mask' (result is NaN), 'raise' or 'ignore',
+    by default it is chosen by validation policy, see SetValidationPolicy().
+    """
+    norm = _RequireNorm(normType, _sCoNorms)
+
+    (a, b), out, invalidMask = _FuzzyArrayArguments('SCoNormArray()', [aFuzzyNumbers, bFuzzyNumbers], out, invalid)
+
+    return _MaskInvalid(norm.array(a, b, out), invalidMask)
+
+
+def _TNormLogicReduce(x, axis, out):
+    return np.min(x, axis=axis, out=out)
+
+
+def _TNormAlgebraicReduce(x, axis, out):
+    return np.prod(x, axis=axis, out=out)
+
+
+def _TNormBoundaryReduce(x, axis, out):
+    np.sum(x, axis=axis, out=out)
+    out -= (x.shape[axis] if axis is not None else x.size) - 1  # max(a1 + ... + an - (n - 1), 0)
+
+    return np.maximum(out, 0., out=out)
+
+
+def _TNormDrasticReduce(x, axis, out):
+    notNeutral = np.count_nonzero(x != 1, axis=axis)
+    np.prod(x, axis=axis, out=out)  # product is equal to the only element which is not 1
+
+    return np.multiply(out, notNeutral <= 1, out=out)  # otherwise result is 0
+
+
+def _SCoNormLogicReduce(x, axis, out):
+    return np.max(x, axis=axis, out=out)
+
+
+def _SCoNormAlgebraicReduce(x, axis, out):
+    np.prod(1 - x, axis=axis, out=out)  # 1 - (1 - a1) * ... * (1 - an)
+    np.subtract(1., out, out=out)
+
+    return out
+
+
+def _SCoNormBoundaryReduce(x, axis, out):
+    np.sum(x, axis=axis, out=out)
+
+    return np.minimum(out, 1., out=out)
+
+
+def _SCoNormDrasticReduce(x, axis, out):
+    notNeutral = np.count_nonzero(x != 0, axis=axis)
+    np.sum(x, axis=axis, out=out)  # sum is equal to the only element which is not 0
+
+    np.copyto(out, 1., where=notNeutral > 1)  # otherwise result is 1
+
+    return out
+
+
+def _FoldReduce(array):
+    """
+    Returns reduction kernel which folds elements along axis from left to right by vectorized operator array(a, b, out).
+    """
+    def FoldReduce(x, axis, out):
+        x = x.reshape(-1) if axis is None else np.moveaxis(x, axis, -1)
+
+        out[...] = x[..., 0]
+        for index in range(1, x.shape[-1]):
+            array(out, x[..., index], out)
+
+        return out
+
+    return FoldReduce
+
+
+def _VectorizedScalar(scalar):
+    """
+    Returns vectorized operator array(a, b, out) calculated by scalar operator for every pair of elements.
+    """
+    def VectorizedScalar(a, b, out):
+        np.copyto(out, np.vectorize(scalar, otypes=[float])(a, b))
+
+        return out
+
+    return VectorizedScalar
+
+
+def _NormReduce(routineName, norm, fuzzyNumbers, axis, out, invalid):
+    """
+    Reduces array of fuzzy numbers along axis by norm, see TNormReduce().
+    Result of reduction of empty axis is identity element of norm.
+    """
+    _RequireNumpy(routineName)
+
+    x = np.asarray(fuzzyNumbers, dtype=float)
+
+    if axis is None:
+        shape = ()
+
+    elif isinstance(axis, int) and -x.ndim <= axis < x.ndim:
+        axis %= x.ndim
+        shape = x.shape[:axis] + x.shape[axis + 1:]
+
+    else:
+        raise Exception('Axis {} is out of bounds for array of dimension {}!'.format(axis, x.ndim))
+
+    if out is None:
+        out = np.empty(shape, dtype=float)
+
+    elif out.shape != shape:
+        raise Exception('Output buffer shape {} must be equal to reduced input shape {}!'.format(out.shape, shape))
+
+    invalidMask = _InvalidMask(routineName, [x], invalid)
+
+    if x.size == 0:
+        out[...] = norm.identity
+
+    else:
+        norm.reduce(x, axis, out)
+
+    if invalidMask is not None:
+        np.copyto(out, np.nan, where=invalidMask.any(axis=axis))
+
+    return out
+
+
+def TNormReduce(fuzzyNumbers, axis=-1, normType='logic', out=None, invalid=None):
+    """
+    T-Norm compose of array of fuzzy numbers along axis, vectorized analog of TNormCompose(), like np.minimum.reduce.
+    E.g. firing strengths of rules are TNormReduce() of matrix (rules x antecedents) along axis 1.
+    axis is an integer or None for all elements, normType is the same as in TNorm().
+    out is an optional preallocated float array with shape of result.
+    invalid is a policy for elements out of [0, 1]: 'mask' (result is NaN), 'raise' or 'ignore',
+    by default it is chosen by validation policy, see SetValidationPolicy().
+    """
+    return _NormReduce('TNormReduce()', _RequireNorm(normType, _tNorms), fuzzyNumbers, axis, out, invalid)
+
+
+def SCoNormReduce(fuzzyNumbers, axis=-1, normType='logic', out=None, invalid=None):
+    """
+    S-coNorm compose of array of fuzzy numbers along axis, vectorized analog of SCoNormCompose(), like np.maximum.reduce.
+    axis is an integer or None for all elements, normType is the same as in SCoNorm().
+    out is an optional preallocated float array with shape of result.
+    invalid is a policy for elements out of [0, 1]: 'mask' (result is NaN), 'raise' or 'ignore',
+    by default it is chosen by validation policy, see SetValidationPolicy().
+    """
+    return _NormReduce('SCoNormReduce()', _RequireNorm(normType, _sCoNorms), fuzzyNumbers, axis, out, invalid)
+
+
+class FuzzyNorm():
+    """
+    Fuzzy norm operator: T-Norm (kind='t') or S-coNorm (kind='s'). Registered norms are used by TNorm(), SCoNorm()
+    and all their compose, array and reduce versions by name, see RegisterNorm().
+        scalar(a, b) - operator for two correct fuzzy numbers,
+        array(a, b, out) - vectorized operator for broadcasted float arrays, it writes result into out array,
+                           out may be a or b itself. By default scalar operator is called for every pair of elements;
+        reduce(x, axis, out) - vectorized reduction of x along axis (None for all elements) into out array.
+                               By default elements are folded from left to right by array operator;
+        identity - neutral element, by default 1 for T-Norms and 0 for S-coNorms;
+        absorbing - absorbing element or None, compositions are stopped on it;
+        associative - declared property of operator, reductions of not associative operators must fold elements
+                      from left to right.
+    """
+
+    def __init__(self, name, kind, scalar, array=None, reduce=None, identity=None, absorbing=None, associative=True):
+        if not isinstance(name, str):
+            raise Exception('Name of fuzzy norm must be a string value!')
+
+        if kind not in ('t', 's'):
+            raise Exception("Kind of fuzzy norm must be 't' (T-Norm) or 's' (S-coNorm)!")
+
+        if not callable(scalar) or (array is not None and not callable(array)) or (reduce is not None and not callable(reduce)):
+            raise Exception('Operators of fuzzy norm must be callable!')
+
+        self.name = name
+        self.kind = kind
+        self.scalar = scalar
+        self.array = array if array is not None else _VectorizedScalar(scalar)
+        self.reduce = reduce if reduce is not None else _FoldReduce(self.array)
+        self.identity = identity if identity is not None else (1. if kind == 't' else 0.)
+        self.absorbing = absorbing
+        self.associative = associative
+
+    def __str__(self):
+        return '{} {}'.format('T-Norm' if self.kind == 't' else 'S-coNorm', self.name)
+
+
+_tNorms = {}  # registered T-Norms by names, see RegisterNorm()
+_sCoNorms = {}  # registered S-coNorms by names
+_builtinNorms = ('logic', 'algebraic', 'boundary', 'drastic', 'einstein')  # names which can't be replaced
+
+
+def RegisterNorm(norm, replace=False):
+    """
+    Registers FuzzyNorm, then its name can be used as normType parameter of T-Norm or S-coNorm routines.
+    Registered norm with the same name and kind is replaced only if replace is True, built-in norms are never replaced.
+    """
+    if not isinstance(norm, FuzzyNorm):
+        raise Exception('Not FuzzyNorm class instance was given!')
+
+    registry = _tNorms if norm.kind == 't' else _sCoNorms
+
+    if norm.name in registry and (not replace or norm.name in _builtinNorms):
+        raise Exception('{} is already registered!'.format(registry[norm.name]))
+
+    registry[norm.name] = norm
+
+
+def GetNorm(name, kind='t'):
+    """
+    Returns registered FuzzyNorm of given kind ('t' or 's') by name or None.
+    """
+    return (_tNorms if kind == 't' else _sCoNorms).get(name)
+
+
+def _FindNorm(normType, registry):
+    """
+    Returns norm by its name in registry, or normType itself if it is FuzzyNorm of registry's kind, otherwise None.
+    """
+    try:
+        norm = registry.get(normType)  # the only lookup for names of registered norms
+
+    except TypeError:
+        return None  # unhashable normType
+
+    if norm is None and isinstance(normType, FuzzyNorm) and normType.kind == ('t' if registry is _tNorms else 's'):
+        norm = normType
+
+    return norm
+
+
+def _RequireNorm(normType, registry):
+    norm = _FindNorm(normType, registry)
+
+    if norm is None:
+        raise Exception('Unknown {} type: {}!'.format('T-Norm' if registry is _tNorms else 'S-coNorm', normType))
+
+    return norm
+
+
+def _DualNorm(name, kind, tScalar, tArray):
+    """
+    Returns FuzzyNorm for T-Norm operators, or for S-coNorm dual to them: S(a, b) = 1 - T(1 - a, 1 - b).
+    """
+    if kind == 't':
+        return FuzzyNorm(name, 't', tScalar, tArray, absorbing=0)
+
+    def Scalar(a, b):
+        return 1 - tScalar(1 - a, 1 - b)
+
+    def Array(a, b, out):
+        tArray(1 - a, 1 - b, out)  # new arrays are calculated before out is changed, out may be a or b
+
+        return np.subtract(1., out, out=out)
+
+    return FuzzyNorm(name, 's', Scalar, Array, absorbing=1)
+
+
+def HamacherNorm(p, kind='t', name=None):
+    """
+    Hamacher family of norms with parameter p >= 0: T(a, b) = a * b / (p + (1 - p) * (a + b - a * b)).
+    p = 0 is Hamacher product, p = 1 is algebraic product, p = 2 is Einstein product. S-coNorm is dual to T-Norm.
+    """
+    if not (IsNumber(p) and p >= 0):
+        raise Exception('Parameter p of Hamacher norm must be a non-negative real number!')
+
+    def Scalar(a, b):
+        denominator = p + (1 - p) * (a + b - a * b)
+
+        return a * b / denominator if denominator != 0 else 0.  # denominator is 0 only if p = a = b = 0
+
+    def Array(a, b, out):
+        denominator = p + (1 - p) * (a + b - a * b)
+        product = a * b
+
+        out[...] = 0.
+        return np.divide(product, denominator, out=out, where=denominator != 0)
+
+    return _DualNorm(name if name is not None else 'hamacher({})'.format(p), kind, Scalar, Array)
+
+
+def YagerNorm(p, kind='t', name=None):
+    """
+    Yager family of norms with parameter p > 0: T(a, b) = max(0, 1 - ((1 - a)^p + (1 - b)^p)^(1 / p)).
+    p = 1 is boundary product, p -> infinity gives logic AND. S-coNorm is dual to T-Norm.
+    """
+    if not (IsNumber(p) and 0 < p < float('inf')):
+        raise Exception('Parameter p of Yager norm must be a positive real number!')
+
+    def Scalar(a, b):
+        return max(0., 1 - ((1 - a) ** p + (1 - b) ** p) ** (1 / p))
+
+    def Array(a, b, out):
+        np.power(np.power(1 - a, p) + np.power(1 - b, p), 1 / p, out=out)
+        np.subtract(1., out, out=out)
+
+        return np.maximum(out, 0., out=out)
+
+    return _DualNorm(name if name is not None else 'yager({})'.format(p), kind, Scalar, Array)
+
+
+def FrankNorm(s, kind='t', name=None):
+    """
+    Frank family of norms with parameter s > 0, s != 1: T(a, b) = log_s(1 + (s^a - 1) * (s^b - 1) / (s - 1)).
+    s -> 0 gives logic AND, s -> 1 gives algebraic product, s -> infinity gives boundary product.
+    S-coNorm is dual to T-Norm.
+    """
+    if not (IsNumber(s) and 0 < s < float('inf') and s != 1):
+        raise Exception('Parameter s of Frank norm must be a positive real number not equal to 1!')
+
+    logS = math.log(s)
+
+    def Scalar(a, b):
+        return max(0., math.log1p((s ** a - 1) * (s ** b - 1) / (s - 1)) / logS)
+
+    def Array(a, b, out):
+        np.multiply(np.power(s, a) - 1, np.power(s, b) - 1, out=out)
+        out /= s - 1
+        np.log1p(out, out=out)
+        out /= logS
+
+        return np.maximum(out, 0., out=out)
+
+    return _DualNorm(name if name is not None else 'frank({})'.format(s), kind, Scalar, Array)
+
+
+for _norm in [FuzzyNorm('logic', 't', min, _TNormLogicArray, _TNormLogicReduce, absorbing=0),
+              FuzzyNorm('algebraic', 't', _TNormAlgebraic, _TNormAlgebraicArray, _TNormAlgebraicReduce, absorbing=0),
+              FuzzyNorm('boundary', 't', _TNormBoundary, _TNormBoundaryArray, _TNormBoundaryReduce, absorbing=0),
+              FuzzyNorm('drastic', 't', _TNormDrastic, _TNormDrasticArray, _TNormDrasticReduce, absorbing=0),
+              HamacherNorm(2, 't', name='einstein'),
+              FuzzyNorm('logic', 's', max, _SCoNormLogicArray, _SCoNormLogicReduce, absorbing=1),
+              FuzzyNorm('algebraic', 's', _SCoNormAlgebraic, _SCoNormAlgebraicArray, _SCoNormAlgebraicReduce, absorbing=1),
+              FuzzyNorm('boundary', 's', _SCoNormBoundary, _SCoNormBoundaryArray, _SCoNormBoundaryReduce, absorbing=1),
+              FuzzyNorm('drastic', 's', _SCoNormDrastic, _SCoNormDrasticArray, _SCoNormDrasticReduce, absorbing=1),
+              HamacherNorm(2, 's', name='einstein')]:
+    RegisterNorm(_norm)  # built-in norms
+
+del _norm
+
+
+class FuzzyMetrics():
+    """
+    Counters of instrumented membership functions, fuzzy sets and fuzzy scales, see their Instrument() methods.
+    Every instrumented operation has number of calls, processed values, errors, total time in seconds, histogram
+    of call times and its own counters (e.g. integrations of Defuz). Instrumentation replaces methods of instance
+    by measuring wrappers, so not instrumented objects work without any additional cost.
+    Snapshot() returns plain dictionary, e.g. for exporting to monitoring system.
+    """
+
+    bounds = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.)  # upper bounds of histogram buckets in seconds
+
+    def __init__(self):
+        self._operations = {}
+        self._lock = threading.Lock()
+
+    def _Operation(self, operation):
+        stats = self._operations.get(operation)
+
+        if stats is None:
+            stats = {'calls': 0, 'values': 0, 'errors': 0, 'seconds': 0., 'buckets': [0] * (len(self.bounds) + 1)}
+            self._operations[operation] = stats
+
+        return stats
+
+    def Record(self, operation, seconds, values=1):
+        """
+        Records successful call of operation which took given seconds and processed given number of values.
+        """
+        with self._lock:
+            stats = self._Operation(operation)
+            stats['calls'] += 1
+            stats['values'] += values
+            stats['seconds'] += seconds
+            stats['buckets'][bisect.bisect_left(self.bounds, seconds)] += 1
+
+    def Error(self, operation):
+        """
+        Records failed call of operation.
+        """
+        with self._lock:
+            self._Operation(operation)['errors'] += 1
+
+    def Add(self, operation, counter, value=1):
+        """
+        Increases additional counter of operation.
+        """
+        with self._lock:
+            stats = self._Operation(operation)
+            stats[counter] = stats.get(counter, 0) + value
+
+    def Reset(self):
+        with self._lock:
+            self._operations = {}
+
+    def Snapshot(self):
+        """
+        Returns dictionary {operation: {'calls': n, 'values': n, 'errors': n, 'seconds': s, 'histogram': {...}, ...}}.
+        Histogram is cumulative like in Prometheus: {'1e-06': calls not longer than 1 microsecond, ..., '+Inf': calls}.
+        """
+        with self._lock:
+            snapshot = {}
+
+            for operation, stats in self._operations.items():
+                operationSnapshot = {key: value for key, value in stats.items() if key != 'buckets'}
+                histogram = {}
+                cumulative = 0
+
+                for bound, count in zip([repr(bound) for bound in self.bounds] + ['+Inf'], stats['buckets']):
+                    cumulative += count
+                    histogram[bound] = cumulative
+
+                operationSnapshot['histogram'] = histogram
+                snapshot[operation] = operationSnapshot
+
+        return snapshot
+
+
+def _Measured(function, metrics, operation, countValues=None):
+    """
+    Returns wrapper of function which records its calls, time and errors into metrics.
+    countValues(*args) returns number of processed values, by default every call processes one value.
+    """
+    clock = time.perf_counter
+
+    def Measured(*args, **kwargs):
+        start = clock()
+
+        try:
+            result = function(*args, **kwargs)
+
+        except Exception:
+            metrics.Error(operation)
+            raise
+
+        metrics.Record(operation, clock() - start, countValues(*args) if countValues is not None else 1)
+
+        return result
+
+    return Measured
+
+
+def _ArraySize(values, *args):
+    return np.size(values)
+
+
+def _RaiseInvalidInput(x):
+    raise TypeError('Real input which is not NaN is expected, but {!r} is given!'.format(x))  # reported by caller
+
+
+def _ChangeableCopy(instance, memo):
+    """
+    Returns deepcopy of instance made from its pickling state. Copy of frozen instance is changeable, see Freeze().
+    """
+    copied = instance.__class__.__new__(instance.__class__)
+    memo[id(instance)] = copied
+
+    state = copy.deepcopy(instance.__getstate__(), memo)
+    state['_frozen'] = False
+    getattr(copied, '__setstate__', copied.__dict__.update)(state)
+
+    return copied
+
+
+class MFunction():
+    """
+    Routines for work with some default membership functions.
+    mju(x) is a specialized evaluator of membership function, it is compiled once with parameters bound as locals
+    when function is created and every time when new parameters are assigned. Wrong parameters raise exception
+    at this moment, not at every call. Incorrect inputs of mju(x) (not real numbers and NaN) are reported according
+    to validation policy, see SetValidationPolicy(), mju(x) returns None for them if exception is not raised.
+    All evaluations (mju, MjuArray and shape methods) are reentrant: they never change state of the object,
+    so one instance may be used from many threads at once, also while new parameters are assigned.
+    Frozen function (see Freeze()) can't be changed at all.
+    Evaluations may be measured by FuzzyMetrics, see Instrument().
+    """
+
+    _metrics = None  # FuzzyMetrics of instrumented function
+    _metricsPrefix = ''  # prefix of operations' names in metrics
+
+    _epochs = itertools.count(1)
+    _epoch = 0  # changed every time when parameters of any function are changed, used by interval indexes of scales
+
+    _parametersNames = {'hyperbolic': ('a', 'b', 'c'),
+                        'bell': ('a', 'b', 'c'),
+                        'parabolic': ('a', 'b'),
+                        'triangle': ('a', 'b', 'c'),
+                        'trapezium': ('a', 'b', 'c', 'd'),
+                        'exponential': ('a', 'b'),
+                        'sigmoidal': ('a', 'b'),
+                        'desirability': ()}  # required parameters of all membership functions
+
+    def __init__(self, userFunc, **membershipFunctionParams):
+        self._frozen = False  # frozen function can't be changed, see Freeze()
+        self.accuracy = 1000  # Line of numbers divided by points, affect on accuracy, using in integral calculating
+        self._version = 0  # incremented every time when parameters are changed, used for invalidating of cached values
+        self._functions = {'hyperbolic': self.Hyperbolic,
+                           'bell': self.Bell,
+                           'parabolic': self.Parabolic,
+                           'triangle': self.Triangle,
+                           'trapezium': self.Trapezium,
+                           'exponential': self.Exponential,
+                           'sigmoidal': self.Sigmoidal,
+                           'desirability': self.Desirability}  # Factory registrator for all membership functions
+        self._userFunc = userFunc
+        self._name = self._functions[userFunc].__name__  # membership function method name
+        self._arrayFunctions = {'hyperbolic': self._HyperbolicArray,
+                                'bell': self._BellArray,
+                                'parabolic': self._ParabolicArray,
+                                'triangle': self._TriangleArray,
+                                'trapezium': self._TrapeziumArray,
+                                'exponential': self._ExponentialArray,
+                                'sigmoidal': self._SigmoidalArray,
+                                'desirability': self._DesirabilityArray}  # Vectorized analogs of membership functions
+        self._mjuArray = self._arrayFunctions[userFunc]
+
+        if membershipFunctionParams or self._name == 'Desirability':
+            self._parameters = MappingProxyType(dict(membershipFunctionParams))  # read-only copy of parameters
+            self.mju = self._Compile(self._parameters)  # Calculate result of define membership function
+
+        else:
+            raise Exception("You must specify all membership function's parameters!")
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['mju']  # compiled evaluator is a closure, it can't be pickled and is compiled again after unpickling
+        state['_parameters'] = dict(self._parameters)  # read-only view of parameters can't be pickled
+
+        for key in ('MjuArray', '_metrics', '_metricsPrefix'):
+            state.pop(key, None)  # copy of instrumented function is not instrumented
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault('_frozen', False)
+        self.__dict__.setdefault('_accuracy', state.get('accuracy', 1000))  # functions pickled with plain accuracy attribute
+        self.__dict__.pop('accuracy', None)
+
+        self._parameters = MappingProxyType(self._parameters)
+
+        self.mju = self._Compile(self._parameters)
+
+    def __deepcopy__(self, memo):
+        return _ChangeableCopy(self, memo)
+
+    def Instrument(self, metrics=None, prefix=''):
+        """
+        Starts recording of mju() and MjuArray() calls, times and errors into metrics (new FuzzyMetrics by default)
+        under operations' names prefix + 'mju', prefix + 'MjuArray'. Errors of shape methods (e.g. Bell()) which
+        return 0 are recorded under their names. Returns metrics.
+        Frozen function can't be instrumented, instrument its deepcopy instead.
+        """
+        if self._frozen:
+            raise Exception("Membership function is frozen and can't be instrumented!")
+
+        self._metrics = metrics if metrics is not None else FuzzyMetrics()
+        self._metricsPrefix = prefix
+
+        self.mju = _Measured(self._Compile(self._parameters), self._metrics, prefix + 'mju')
+        self.MjuArray = _Measured(MFunction.MjuArray.__get__(self), self._metrics, prefix + 'MjuArray', _ArraySize)
+
+        return self._metrics
+
+    def Uninstrument(self):
+        """
+        Stops recording of metrics, original methods are restored.
+        """
+        self.__dict__.pop('MjuArray', None)
+        self.__dict__.pop('_metrics', None)
+        self.__dict__.pop('_metricsPrefix', None)
+        self.mju = self._Compile(self._parameters)
+
+    @property
+    def metrics(self):
+        return self._metrics  # None if function is not instrumented
+
+    def _InputError(self, x):
+        """
+        Reports incorrect input of mju() and records it if function is instrumented, returns None.
+        In 'strict' validation policy exception is raised and it is recorded by instrumented mju() itself.
+        """
+        _ReportInvalid('{} membership function use real inputs x which are not NaN. Your input: mju({!r})', self._name, x)
+
+        if self._metrics is not None:
+            self._metrics.Error(self._metricsPrefix + 'mju')
+
+        return None
+
+    def _ShapeError(self, message, *args):
+        """
+        Reports error of shape method and records it if function is instrumented.
+        """
+        if self._metrics is not None:
+            self._metrics.Error(self._metricsPrefix + self._name)
+
+        _ReportInvalid(message, *args, exceptionInfo=True)
+
+    def Freeze(self):
+        """
+        Makes membership function unchangeable: setters raise exceptions.
+        """
+        self._frozen = True
+
+    @property
+    def frozen(self):
+        return self._frozen
+
+    @property
+    def accuracy(self):
+        return self._accuracy  # number of points for integral calculating
+
+    @accuracy.setter
+    def accuracy(self, value):
+        if self._frozen:
+            raise Exception("Membership function is frozen and can't be changed!")
+
+        self._accuracy = value
+
+    @property
+    def name(self):
+        return self._name
+
+    def __str__(self):
+        # return view of function: Function_name(**parameters). Example: Bell(x, {"a": 0.6, "b": 0.66, "c": 0.77}
+        funcView = '{}({})'.format(self.name, 'y' if self.name == 'Desirability' else 'x, {}'.format(
+            '{' + ', '.join('"{}": {}'.format(*val) for val in [(k, self._parameters[k])
+                                                                for k in sorted(self._parameters)]) + '}'))
+        return funcView
+
+    @property
+    def parameters(self):
+        return self._parameters  # read-only mapping of parameters, change them only by assigning new dictionary
+
+    @property
+    def version(self):
+        return self._version  # version of parameters
+
+    @parameters.setter
+    def parameters(self, value):
+        if self._frozen:
+            raise Exception("Membership function is frozen and can't be changed!")
+
+        if value or self._name == 'Desirability':
+            value = MappingProxyType(dict(value))  # later changes of given dictionary don't affect compiled function
+            mju = self._Compile(value)
+            self.mju = mju if self._metrics is None else _Measured(mju, self._metrics, self._metricsPrefix + 'mju')
+            self._parameters = value
+            self._version += 1
+            MFunction._epoch = next(MFunction._epochs)
+
+        else:
+            raise Exception("You must specify all membership function's parameters!")
+
+    def NonZeroInterval(self):
+        """
+        Returns closed interval (left, right) out of which membership function is equal to zero:
+        mju(x) == 0 for every x < left or x > right. Bounds are -inf and inf if function is not zero on half-line,
+        (inf, -inf) is returned for function which is equal to zero everywhere.
+        Interval is found by breakpoints of function, it is used to skip evaluations which give zero.
+        """
+        pars = self._parameters  # parameters are read once, so they can be reassigned concurrently
+
+        if self._userFunc == 'bell':
+            return min(pars['a'], pars['b']), max(pars['b'], pars['c'], pars['c'] + pars['b'] - pars['a'])
+
+        if self._userFunc == 'parabolic':
+            return pars['a'], math.inf
+
+        if self._userFunc == 'triangle':
+            return pars['a'], max(pars['b'], pars['c'])
+
+        if self._userFunc == 'trapezium':
+            return pars['a'], max(pars['b'], pars['c'], pars['d'])
+
+        if self._userFunc == 'exponential' and pars['b'] == 0:
+            return math.inf, -math.inf
+
+        return -math.inf, math.inf  # hyperbolic, sigmoidal, desirability and exponential functions are never zero
+
+    def _Compile(self, parameters):
+        """
+        Validates parameters and returns specialized evaluator of membership function with parameters bound as locals.
+        Not real and NaN inputs of evaluator are passed to inputError(x), its result is returned.
+        """
+        names = self._parametersNames[self._userFunc]
+
+        missing = [name for name in names if name not in parameters]
+        if missing:
+            raise Exception('{} membership function use parameters {}, but {} not given!'.format(self._name, ', '.join(names), ', '.join(missing)))
+
+        for name in names:
+            if not (isinstance(parameters[name], numbers.Real) and not isinstance(parameters[name], bool)):
+                raise Exception('Parameter {} of {} membership function must be a real number, but {} given!'.format(name, self._name, repr(parameters[name])))
+
+        return getattr(self, '_Compile{}'.format(self._name))(self._InputError, *[parameters[name] for name in names])
+
+    @staticmethod
+    def _CompileHyperbolic(inputError, a, b, c):
+        def Hyperbolic(x):
+            try:
+                if x <= c:
+                    return 1
+
+                if x == x:  # NaN is not equal to itself
+                    return 1 / (1 + (a * (x - c)) ** b)
+
+            except OverflowError:
+                return 0  # power is too large, so result is less than minimal float number
+
+            except TypeError:
+                pass  # not real input, e.g. string or None
+
+            return inputError(x)
+
+        return Hyperbolic
+
+    @staticmethod
+    def _CompileBell(inputError, a, b, c):
+        leftMiddle, leftWidth = (a + b) / 2, (b - a) ** 2
+        right = c + b - a  # right side of bell is 1 - Parabolic(x) with parameters c, c + b - a
+        rightMiddle, rightWidth = (c + right) / 2, (right - c) ** 2
+
+        def Bell(x):
+            try:
+                if x < b:
+                    if x <= a:
+                        return 0
+
+                    if x <= leftMiddle:
+                        return (2 * (x - a) ** 2) / leftWidth
+
+                    return 1 - (2 * (x - b) ** 2) / leftWidth
+
+                if x <= c:
+                    return 1
+
+                if x <= rightMiddle:
+                    return 1 - (2 * (x - c) ** 2) / rightWidth
+
+                if x < right:
+                    return 1 - (1 - (2 * (x - right) ** 2) / rightWidth)
+
+                if x == x:  # all comparisons with NaN are false, so only NaN is checked here
+                    return 0
+
+            except TypeError:
+                pass  # not real input, e.g. string or None
+
+            return inputError(x)
+
+        return Bell
+
+    @staticmethod
+    def _CompileParabolic(inputError, a, b):
+        middle, width = (a + b) / 2, (b - a) ** 2
+
+        def Parabolic(x):
+            try:
+                if x <= a:
+                    return 0
+
+                if x <= middle:
+                    return (2 * (x - a) ** 2) / width
+
+                if x < b:
+                    return 1 - (2 * (x - b) ** 2) / width
+
+                if x == x:  # all comparisons with NaN are false, so only NaN is checked here
+                    return 1
+
+            except TypeError:
+                pass  # not real input, e.g. string or None
+
+            return inputError(x)
+
+        return Parabolic
+
+    @staticmethod
+    def _CompileTriangle(inputError, a, b, c):
+        def Triangle(x):
+            try:
+                if x <= a:
+                    return 0
+
+                if x <= c:
+                    return (x - a) / (c - a)
+
+                if x < b:
+                    return (b - x) / (b - c)
+
+                if x == x:  # all comparisons with NaN are false, so only NaN is checked here
+                    return 0
+
+            except TypeError:
+                pass  # not real input, e.g. string or None
+
+            return inputError(x)
+
+        return Triangle
+
+    @staticmethod
+    def _CompileTrapezium(inputError, a, b, c, d):
+        def Trapezium(x):
+            try:
+                if x < a:
+                    return 0
+
+                if a < x < c:
+                    return (x - a) / (c - a)
+
+                if c <= x <= d:
+                    return 1
+
+                if d < x <= b:
+                    return (b - x) / (b - d)
+
+                if x == x:  # all comparisons with NaN are false, so only NaN is checked here
+                    return 0
+
+            except TypeError:
+                pass  # not real input, e.g. string or None
+
+            return inputError(x)
+
+        return Trapezium
+
+    @staticmethod
+    def _CompileExponential(inputError, a, b):
+        e = math.exp(1)
+
+        def Exponential(x):
+            try:
+                if x == x:  # NaN is not equal to itself
+                    return e ** (-0.5 * ((x - a) / b) ** 2)
+
+            except OverflowError:
+                return 0  # square of distance is too large, so result is less than minimal float number
+
+            except TypeError:
+                pass  # not real input, e.g. string or None
+
+            return inputError(x)
+
+        def Zero(x):
+            try:
+                if -math.inf <= x <= math.inf:  # false for NaN
+                    return 0
+
+            except TypeError:
+                pass  # not real input, e.g. string or None
+
+            return inputError(x)
+
+        return Exponential if b != 0 else Zero
+
+    @staticmethod
+    def _CompileSigmoidal(inputError, a, b):
+        e = math.exp(1)
+
+        def Sigmoidal(x):
+            try:
+                if x == x:  # NaN is not equal to itself
+                    return 1 / (1 + e ** (-a * (x - b)))
+
+            except OverflowError:
+                return 0  # exponent is too large, so result is less than minimal float number
+
+            except TypeError:
+                pass  # not real input, e.g. string or None
+
+            return inputError(x)
+
+        return Sigmoidal
+
+    @staticmethod
+    def _CompileDesirability(inputError):
+        def Desirability(y):
+            try:
+                if y == y:  # NaN is not equal to itself
+                    return math.exp(-math.exp(-y))
+
+            except OverflowError:
+                return 0
+
+            except TypeError:
+                pass  # not real input, e.g. string or None
+
+            return inputError(y)
+
+        return Desirability
+
+    def Hyperbolic(self, x):
+        """
+        This is hyperbolic membership function with real inputs x and parameters a, b, c.
+        """
+        a, b, c, result = 0, 0, 0, 0
+
+        try:
+            a = self._parameters['a']
+            b = self._parameters['b']
+            c = self._parameters['c']
+
+            if x <= c:
+                result = 1
+
+            else:
+                result = 1 / (1 + (a * (x - c)) ** b)
+
+        except OverflowError:
+            return 0  # power is too large, function is saturated
+
+        except Exception:
+            self._ShapeError('Hyperbolic membership function use real inputs x and parameters a, b, c. Your inputs: mju_hyperbolic({}, {}, {}, {})', x, a, b, c)
+            return 0
+
+        return result
+
+    def Bell(self, x):
+        """
+        This is bell membership function with real inputs x and parameters a, b, c.
+        """
+        a, b, c, result = 0, 0, 0, 0
+
+        try:
+            a = self._parameters['a']
+            b = self._parameters['b']
+            c = self._parameters['c']
+
+            if x < b:
+                result = self._CompileParabolic(_RaiseInvalidInput, a, b)(x)
+
+            elif (b <= x) and (x <= c):
+                result = 1
+
+            else:
+                result = 1 - self._CompileParabolic(_RaiseInvalidInput, c, c + b - a)(x)  # shared parameters are never changed temporarily
+
+        except Exception:
+            self._ShapeError('Bell membership function use real inputs x and parameters a, b, c. Your inputs: mju_bell({}, {}, {}, {})', x, a, b, c)
+            return 0
+
+        return result
+
+    def Parabolic(self, x):
+        """
+        This is parabolic membership function with real inputs x and parameters a, b.
+        """
+        a, b, result = 0, 0, 0
+
+        try:
+            a = self._parameters['a']
+            b = self._parameters['b']
+
+            if x <= a:
+                result = 0
+
+            elif (a < x) and (x <= (a + b) / 2):
+                result = (2 * (x - a) ** 2) / (b - a) ** 2
+
+            elif ((a + b) / 2 < x) and (x < b):
+                result = 1 - (2 * (x - b) ** 2) / (b - a) ** 2
+
+            else:
+                result = 1
+
+        except Exception:
+            self._ShapeError('Parabolic membership function use real inputs x and parameters a, b. Your inputs: mju_parabolic({}, {}, {})', x, a, b)
+            return 0
+
+        return result
+
+    def Triangle(self, x):
+        """
+        This is triangle membership function with real inputs x and parameters a, b, c.
+        """
+        a, b, c, result = 0, 0, 0, 0
+
+        try:
+            a = self._parameters['a']
+            b = self._parameters['b']
+            c = self._parameters['c']
+
+            if x <= a:
+                result = 0
+
+            elif (a < x) and (x <= c):
+                result = (x - a) / (c - a)
+
+            elif (c < x) and (x < b):
+                result = (b - x) / (b - c)
+
+            else:
+                result = 0
+
+        except Exception:
+            self._ShapeError('Triangle membership function use real inputs x and parameters a, b, c. Your inputs: mju_triangle({}, {}, {}, {})', x, a, b, c)
+            return 0
+
+        return result
+
+    def Trapezium(self, x):
+        """
+        This is trapezium membership function with real inputs x and parameters a, b, c, d.
+        """
+        a, b, c, d, result = 0, 0, 0, 0, 0
+
+        try:
+            a = self._parameters['a']
+            b = self._parameters['b']
+            c = self._parameters['c']
+            d = self._parameters['d']
+
+            if x < a:
+                result = 0
+
+            elif (a < x) and (x < c):
+                result = (x - a) / (c - a)
+
+            elif (c <= x) and (x <= d):
+                result = 1
+
+            elif (d < x) and (x <= b):
+                result = (b - x) / (b - d)
+
+            else:
+                result = 0
+
+        except Exception:
+            self._ShapeError('Trapezium membership function use real inputs x and parameters a, b, c, d. Your inputs: mju_trapezium({}, {}, {}, {}, {})', x, a, b, c, d)
+            return 0
+
+        return result
+
+    def Exponential(self, x):
+        """
+        This is exponential membership function with real inputs x and parameters a, b.
+        """
+        a, b, result = 0, 0, 0
+
+        try:
+            a = self._parameters['a']
+            b = self._parameters['b']
+
+            if b != 0:
+                result = math.exp(1) ** (-0.5 * ((x - a) / b) ** 2)
+
+        except OverflowError:
+            return 0  # square of distance is too large, function is saturated
+
+        except Exception:
+            self._ShapeError('Exponential membership function use real inputs x and parameters a, b. Your inputs: mju_exponential({}, {}, {})', x, a, b)
+            return 0
+
+        return result
+
+    def Sigmoidal(self, x):
+        """
+        This is sigmoidal membership function with real inputs x and parameters a, b.
+        """
+        a, b, result = 0, 0, 0
+
+        try:
             a = self._parameters['a']
             b = self._parameters['b']
 
-            if b != 0:
-                result = math.exp(1) ** (-0.5 * ((x - a) / b) ** 2)
+            result = 1 / (1 + math.exp(1) ** (-a * (x - b)))
+
+        except OverflowError:
+            return 0  # exponent is too large, function is saturated
+
+        except Exception:
+            self._ShapeError('Sigmoidal membership function use real inputs x and parameters a, b. Your inputs: mju_sigmoidal({}, {}, {})', x, a, b)
+            return 0
+
+        return result
+
+    def Desirability(self, y):
+        """
+        This is Harrington's desirability membership function with real input y without any parameters.
+        """
+        try:
+            result = math.exp(-math.exp(-y))
+
+        except OverflowError:
+            return 0  # exponent is too large, function is saturated
+
+        except Exception:
+            self._ShapeError("Harrington's desirability membership function use only real input y without any parameters. Your inputs: mju_desirability({})", y)
+            return 0
+
+        return result
+
+    def MjuArray(self, xs, out=None):
+        """
+        Vectorized version of mju(): calculates membership function for every element of 1-D or N-D array xs.
+        Results are equal to scalar mju() calls within floating-point tolerance.
+        out is an optional preallocated float array with the same shape as xs, results are written into it.
+        """
+        _RequireNumpy('MFunction.MjuArray()')
+
+        x = np.asarray(xs, dtype=float)
+
+        if out is None:
+            out = np.empty(x.shape, dtype=float)
+
+        elif out.shape != x.shape:
+            raise Exception('Output buffer shape {} must be equal to input shape {}!'.format(out.shape, x.shape))
+
+        with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+            return self._mjuArray(x, out, self._parameters)  # parameters are read once, so they can be reassigned concurrently
+
+    def _HyperbolicArray(self, x, out, pars):
+        a = pars['a']
+        b = pars['b']
+        c = pars['c']
+
+        return _PiecewiseArray(x, out, [(x <= c, lambda v: 1.),
+                                        (x > c, lambda v: 1 / (1 + (a * (v - c)) ** b))], default=np.nan)
+
+    def _BellArray(self, x, out, pars):
+        a = pars['a']
+        b = pars['b']
+        c = pars['c']
+
+        return _PiecewiseArray(x, out, [(x < b, lambda v: self._ParabolicKernel(v, a, b)),
+                                        ((b <= x) & (x <= c), lambda v: 1.),
+                                        (x > c, lambda v: 1 - self._ParabolicKernel(v, c, c + b - a))])
+
+    def _ParabolicArray(self, x, out, pars):
+        return self._ParabolicKernel(x, pars['a'], pars['b'], out)
+
+    @staticmethod
+    def _ParabolicKernel(x, a, b, out=None):
+        return _PiecewiseArray(x, np.empty(x.shape, dtype=float) if out is None else out,
+                               [(x <= a, lambda v: 0.),
+                                ((a < x) & (x <= (a + b) / 2), lambda v: (2 * (v - a) ** 2) / (b - a) ** 2),
+                                (((a + b) / 2 < x) & (x < b), lambda v: 1 - (2 * (v - b) ** 2) / (b - a) ** 2)],
+                               default=1.)
+
+    def _TriangleArray(self, x, out, pars):
+        a = pars['a']
+        b = pars['b']
+        c = pars['c']
+
+        return _PiecewiseArray(x, out, [(x <= a, lambda v: 0.),
+                                        ((a < x) & (x <= c), lambda v: (v - a) / (c - a)),
+                                        ((c < x) & (x < b), lambda v: (b - v) / (b - c))])
+
+    def _TrapeziumArray(self, x, out, pars):
+        a = pars['a']
+        b = pars['b']
+        c = pars['c']
+        d = pars['d']
+
+        return _PiecewiseArray(x, out, [(x < a, lambda v: 0.),
+                                        ((a < x) & (x < c), lambda v: (v - a) / (c - a)),
+                                        ((c <= x) & (x <= d), lambda v: 1.),
+                                        ((d < x) & (x <= b), lambda v: (b - v) / (b - d))])
+
+    def _ExponentialArray(self, x, out, pars):
+        a = pars['a']
+        b = pars['b']
+
+        if b != 0:
+            np.exp(-0.5 * ((x - a) / b) ** 2, out=out)
+
+        else:
+            out[...] = 0.
+
+        return out
+
+    def _SigmoidalArray(self, x, out, pars):
+        a = pars['a']
+        b = pars['b']
+
+        np.exp(-a * (x - b), out=out)  # overflow gives inf and result 0 like OverflowError in scalar version
+        out += 1
+        np.reciprocal(out, out=out)
+
+        return out
+
+    def _DesirabilityArray(self, y, out, pars):
+        np.exp(-y, out=out)
+        np.negative(out, out=out)
+        np.exp(out, out=out)
+
+        return out
+
+    def _Pieces(self, pars):
+        """
+        Piecewise polynomial view of membership function: list of pieces (left, right, x0, (c0, c1, c2)),
+        where mju(x) = c0 + c1 * (x - x0) + c2 * (x - x0)^2 for left < x < right and mju(x) = 0 out of all pieces.
+        Returns None if function is not piecewise polynomial or its parameters are not in usual order.
+        """
+        name = self.name
+        pieces = None
+
+        if name in ('Parabolic', 'Bell') and pars['a'] < pars['b']:
+            a, b = pars['a'], pars['b']
+            k = 2 / (b - a) ** 2
+            pieces = [(a, (a + b) / 2, a, (0., 0., k)), ((a + b) / 2, b, b, (1., 0., -k))]
+
+            if name == 'Parabolic':
+                pieces.append((b, math.inf, b, (1., 0., 0.)))
+
+            elif b <= pars['c']:
+                c, d = pars['c'], pars['c'] + b - a  # right side of bell is 1 - Parabolic(x) with parameters c, c + b - a
+                pieces += [(b, c, c, (1., 0., 0.)), (c, (c + d) / 2, c, (1., 0., -k)), ((c + d) / 2, d, d, (0., 0., k))]
+
+            else:
+                pieces = None
+
+        elif name == 'Triangle' and pars['a'] <= pars['c'] <= pars['b'] and pars['a'] < pars['b']:
+            a, b, c = pars['a'], pars['b'], pars['c']
+            pieces = [(a, c, a, (0., 1 / (c - a) if c > a else 0., 0.)), (c, b, b, (0., -1 / (b - c) if b > c else 0., 0.))]
+
+        elif name == 'Trapezium' and pars['a'] <= pars['c'] <= pars['d'] <= pars['b'] and pars['a'] < pars['b']:
+            a, b, c, d = pars['a'], pars['b'], pars['c'], pars['d']
+            pieces = [(a, c, a, (0., 1 / (c - a) if c > a else 0., 0.)), (c, d, c, (1., 0., 0.)),
+                      (d, b, b, (0., -1 / (b - d) if b > d else 0., 0.))]
+
+        return pieces
+
+    def Breakpoints(self):
+        """
+        Sorted list of points where membership function has a kink or changes its shape very fast.
+        Numeric integrators split integration interval at these points.
+        """
+        pars = self._parameters
+        pieces = self._Pieces(pars)
+
+        if pieces is not None:
+            points = set(x for piece in pieces for x in piece[:2] if math.isfinite(x))
+
+        elif self.name == 'Hyperbolic':
+            points = {pars['c']}
+
+        elif self.name == 'Exponential':
+            points = {pars['a']}
+
+        elif self.name == 'Sigmoidal':
+            points = {pars['b']}
+
+        else:
+            points = set()
+
+        return sorted(points)
+
+    def Moments(self, left, right):
+        """
+        Exact integrals of mju(x) and x * mju(x) from left to right, they are used by center of gravity method.
+        Closed forms are known for piecewise polynomial functions (parabolic, bell, triangle, trapezium),
+        for exponential function (error function) and for sigmoidal function (logarithm and dilogarithm).
+        Returns None if there is no closed form for this function, e.g. for hyperbolic and desirability functions.
+        """
+        name = self.name
+        pars = self._parameters
+        pieces = self._Pieces(pars)
+
+        if pieces is not None:
+            m0, m1 = 0., 0.
+
+            for pieceLeft, pieceRight, x0, coefficients in pieces:
+                lo = max(left, pieceLeft) - x0
+                hi = min(right, pieceRight) - x0
+
+                if lo < hi:
+                    integral = sum(c * (hi ** (i + 1) - lo ** (i + 1)) / (i + 1) for i, c in enumerate(coefficients))
+                    m0 += integral
+                    m1 += x0 * integral + sum(c * (hi ** (i + 2) - lo ** (i + 2)) / (i + 2) for i, c in enumerate(coefficients))
+
+            return m0, m1
+
+        if name == 'Exponential' and pars['b'] != 0:
+            a, b = pars['a'], abs(pars['b'])
+
+            m0 = b * math.sqrt(math.pi / 2) * (math.erf((right - a) / (b * math.sqrt(2))) - math.erf((left - a) / (b * math.sqrt(2))))
+            m1 = a * m0 + b ** 2 * (math.exp(-0.5 * ((left - a) / b) ** 2) - math.exp(-0.5 * ((right - a) / b) ** 2))
+
+            return m0, m1
+
+        if name == 'Sigmoidal':
+            a, b = pars['a'], pars['b']
+
+            if a == 0:
+                return (right - left) / 2, (right ** 2 - left ** 2) / 4
+
+            uLeft, uRight = a * (left - b), a * (right - b)  # substitution u = a(x - b), then x = b + u / a
+            primitive = lambda u: u * _Softplus(u) + _NegExpDilogarithm(u)  # integral of u / (1 + e^-u)
+
+            m0 = (_Softplus(uRight) - _Softplus(uLeft)) / a
+            m1 = b * m0 + (primitive(uRight) - primitive(uLeft)) / a ** 2
+
+            return m0, m1
+
+        return None
+
+
+class RiemannIntegrator():
+    """
+    Numeric integration by Riemann sum with fixed grid of accuracy points, it is used by FuzzySet by default.
+    """
+
+    def __init__(self, accuracy=1000):
+        if isinstance(accuracy, int) and accuracy > 0:
+            self.accuracy = accuracy  # Line of numbers divided by points
+
+        else:
+            raise Exception('Accuracy of Riemann integrator must be a positive integer number!')
+
+    def Integrate(self, mju, left, right, breakpoints=()):
+        """
+        Returns integrals of x * mju(x) and mju(x) from left to right and number of mju() evaluations.
+        Breakpoints are ignored because grid is fixed.
+        """
+        step = (right - left) / self.accuracy
+
+        numeratorIntegral = 0
+        denominatorIntegral = 0
+
+        for iteration in range(self.accuracy):
+            x = left + (iteration + 1) * step
+            mjuValue = mju(x)
+
+            numeratorIntegral += x * mjuValue
+            denominatorIntegral += mjuValue
+
+        return numeratorIntegral * step, denominatorIntegral * step, self.accuracy
+
+    def CacheKey(self):
+        """
+        Returns tuple which identifies results of integrator, it is a part of key in DefuzCache.
+        """
+        return 'RiemannIntegrator', self.accuracy
+
+
+class GaussKronrodIntegrator():
+    """
+    Adaptive numeric integration by 7-point Gauss and 15-point Kronrod rules.
+    Integration interval is split at breakpoints of membership function first, then the subinterval with the largest
+    error estimate is bisected until total error is less than max(absTolerance, relTolerance * |integral|)
+    or until maxEvaluations of mju() are spent.
+    """
+
+    _nodes = (0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+              0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+              0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+              0.207784955007898467600689403773245, 0.)  # Kronrod nodes, odd ones are Gauss nodes
+    _kronrodWeights = (0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+                       0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+                       0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+                       0.204432940075298892414161999234649, 0.209482141084727828012999174891714)
+    _gaussWeights = (0., 0.129484966168869693270611432679082, 0., 0.279705391489276667901467771423780,
+                     0., 0.381830050505118944950369775488975, 0., 0.417959183673469387755102040816327)
+
+    def __init__(self, absTolerance=1e-10, relTolerance=1e-8, maxEvaluations=15000):
+        if absTolerance < 0 or relTolerance < 0 or absTolerance == relTolerance == 0:
+            raise Exception('Tolerances must be non-negative numbers and at least one of them must be positive!')
+
+        self.absTolerance = absTolerance
+        self.relTolerance = relTolerance
+        self.maxEvaluations = maxEvaluations
+
+    def _Rule(self, mju, left, right):
+        """
+        Returns integrals of x * mju(x) and mju(x) on [left, right] and its error estimate.
+        """
+        center = (left + right) / 2
+        half = (right - left) / 2
+
+        kronrod = [0., 0.]
+        gauss = [0., 0.]
+
+        for node, kronrodWeight, gaussWeight in zip(self._nodes, self._kronrodWeights, self._gaussWeights):
+            for x in ((center - half * node, center + half * node) if node else (center,)):
+                mjuValue = mju(x)
+
+                kronrod[0] += kronrodWeight * x * mjuValue
+                kronrod[1] += kronrodWeight * mjuValue
+                gauss[0] += gaussWeight * x * mjuValue
+                gauss[1] += gaussWeight * mjuValue
+
+        return half * kronrod[0], half * kronrod[1], half * max(abs(kronrod[0] - gauss[0]), abs(kronrod[1] - gauss[1]))
+
+    def Integrate(self, mju, left, right, breakpoints=()):
+        """
+        Returns integrals of x * mju(x) and mju(x) from left to right and number of mju() evaluations.
+        """
+        points = [left] + [x for x in sorted(breakpoints) if left < x < right] + [right]
+
+        intervals = []  # heap of (-error, left, right, numerator, denominator)
+        for lo, hi in zip(points[:-1], points[1:]):
+            numerator, denominator, error = self._Rule(mju, lo, hi)
+            heapq.heappush(intervals, (-error, lo, hi, numerator, denominator))
+
+        evaluations = 15 * len(intervals)
+
+        while evaluations + 30 <= self.maxEvaluations:
+            totalError = -sum(item[0] for item in intervals)
+            scale = max(abs(sum(item[3] for item in intervals)), abs(sum(item[4] for item in intervals)))
+
+            if totalError <= max(self.absTolerance, self.relTolerance * scale):
+                break
+
+            _, lo, hi, _, _ = heapq.heappop(intervals)
+            center = (lo + hi) / 2
+
+            for subLo, subHi in ((lo, center), (center, hi)):
+                numerator, denominator, error = self._Rule(mju, subLo, subHi)
+                heapq.heappush(intervals, (-error, subLo, subHi, numerator, denominator))
+
+            evaluations += 30
+
+        return math.fsum(item[3] for item in intervals), math.fsum(item[4] for item in intervals), evaluations
+
+    def CacheKey(self):
+        """
+        Returns tuple which identifies results of integrator, it is a part of key in DefuzCache.
+        """
+        return 'GaussKronrodIntegrator', self.absTolerance, self.relTolerance, self.maxEvaluations
+
+
+class DefuzCache():
+    """
+    Persistent cache of defuzzy values in SQLite database file, it is shared between processes and restarts.
+    Fuzzy set consults the cache only before numeric integration, see SetDefuzCache(). Key of value is a hash of
+    codeVersion, membership function name and parameters, support set and integrator's CacheKey().
+    directory - directory of database file, by default FUZZYROUTINES_CACHE_DIR environment variable
+                or ~/.cache/fuzzyroutines;
+    maxEntries - maximum number of values, the least recently used values are evicted when it is exceeded.
+    Values written by other codeVersion are removed when database is opened.
+    """
+
+    codeVersion = 1  # must be increased every time when defuzzyfication or integrators give other results
+    fileName = 'defuz_cache.sqlite'
+
+    def __init__(self, directory=None, maxEntries=100000):
+        if not (isinstance(maxEntries, int) and maxEntries > 0):
+            raise Exception('Maximum number of cached values must be a positive integer number!')
+
+        if directory is None:
+            directory = os.environ.get('FUZZYROUTINES_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'fuzzyroutines'))
+
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = os.path.join(directory, self.fileName)
+        self.maxEntries = maxEntries
+        self.hits = 0  # number of values found in cache
+        self.misses = 0  # number of values not found in cache
+
+        self._lock = threading.Lock()  # one connection is used by all threads
+        self._connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')  # readers of other processes are not blocked by writer
+        self._connection.execute('PRAGMA synchronous=NORMAL')  # cache may lose last values on power loss, but not be broken
+        self._connection.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS defuz (key TEXT PRIMARY KEY, value REAL, used INTEGER)')
+        self._connection.execute('CREATE INDEX IF NOT EXISTS defuzUsed ON defuz (used)')
+
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM meta WHERE name = 'codeVersion'").fetchone()
+
+            if row is None or row[0] != str(self.codeVersion):
+                self._connection.execute('DELETE FROM defuz')  # values of other code version are invalid
+                self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('codeVersion', ?)", (str(self.codeVersion),))
+
+            self._count = self._connection.execute('SELECT COUNT(*) FROM defuz').fetchone()[0]
+            self._used = self._connection.execute('SELECT COALESCE(MAX(used), 0) FROM defuz').fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM defuz').fetchone()[0]
+
+    def Key(self, fuzzySet):
+        """
+        Returns stable key of defuzzy value of fuzzy set or None if its integrator has no CacheKey() method.
+        """
+        integrator = fuzzySet.integrator
+        if integrator is None:
+            integratorKey = ('RiemannIntegrator', fuzzySet.mFunction.accuracy)
+
+        elif callable(getattr(integrator, 'CacheKey', None)):
+            integratorKey = integrator.CacheKey()
+
+        else:
+            return None
+
+        parameters = fuzzySet.mFunction.parameters
+        description = repr((self.codeVersion, fuzzySet.mFunction.name, sorted(parameters.items()),
+                            tuple(fuzzySet.supportSet), integratorKey))
+
+        return hashlib.sha256(description.encode('utf-8')).hexdigest()
+
+    def Get(self, key):
+        """
+        Returns cached value for given key or None.
+        """
+        with self._lock:
+            row = self._connection.execute('SELECT value FROM defuz WHERE key = ?', (key,)).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._used += 1
+            self._connection.execute('UPDATE defuz SET used = ? WHERE key = ?', (self._used, key))
+
+            return row[0]
+
+    def Put(self, key, value):
+        """
+        Saves value for given key and evicts the least recently used values if cache is full.
+        """
+        with self._lock:
+            self._used += 1
+            inserted = self._connection.execute('INSERT OR IGNORE INTO defuz VALUES (?, ?, ?)', (key, value, self._used)).rowcount
+            self._count += inserted
+
+            if self._count > self.maxEntries:
+                self._count = self._connection.execute('SELECT COUNT(*) FROM defuz').fetchone()[0]  # other processes also write
+                extra = self._count - self.maxEntries
+
+                if extra > 0:
+                    extra += self.maxEntries // 10  # free some place at once, so eviction is not done on every write
+                    self._connection.execute('DELETE FROM defuz WHERE key IN (SELECT key FROM defuz ORDER BY used LIMIT ?)', (extra,))
+                    self._count = max(self._count - extra, 0)
+
+    def Clear(self):
+        """
+        Removes all cached values.
+        """
+        with self._lock:
+            self._connection.execute('DELETE FROM defuz')
+            self._count = 0
+
+    def Close(self):
+        with self._lock:
+            self._connection.close()
+
+
+_persistentDefuzCache = None  # persistent cache of defuzzy values used by all fuzzy sets, see SetDefuzCache()
+
+
+def SetDefuzCache(cache):
+    """
+    Sets persistent cache of defuzzy values (DefuzCache instance) for all fuzzy sets, None disables it.
+    Returns previous cache.
+    """
+    global _persistentDefuzCache
+
+    if cache is not None and not (callable(getattr(cache, 'Key', None)) and callable(getattr(cache, 'Get', None))
+                                  and callable(getattr(cache, 'Put', None))):
+        raise Exception('Defuzzy cache must be None or an object with Key(), Get() and Put() methods!')
+
+    previous = _persistentDefuzCache
+    _persistentDefuzCache = cache
+
+    return previous
+
+
+class FuzzySet():
+    """
+    Routines for work with fuzzy sets.
+    Fuzzy set A = <membershipFunction, supportSet>
+    integrator is used for defuzzyfication if membership function has no closed form of integrals,
+    by default it is RiemannIntegrator with accuracy of membership function.
+    Defuzzy value is calculated on first request and cached until support set, membership function,
+    its parameters or accuracy, or integrator are changed.
+    Reading of fuzzy set is reentrant: concurrent first requests may calculate defuzzy value twice,
+    but cached value and its stamp are replaced together, so no thread gets a stale or mixed result.
+    Frozen fuzzy set (see Freeze()) can't be changed, but its defuzzy value is still calculated on first request.
+    Defuzzyfications may be measured by FuzzyMetrics, see Instrument().
+    """
+
+    _metrics = None  # FuzzyMetrics of instrumented fuzzy set
+
+    def __init__(self, membershipFunction, supportSet=(0., 1.), linguisticName='FuzzySet', integrator=None):
+        self._frozen = False  # frozen fuzzy set can't be changed, see Freeze()
+
+        if isinstance(linguisticName, str):
+            self._name = linguisticName
+
+        else:
+            raise Exception("Linguistic name of Fuzzy Set must be a string value!")
+
+        if isinstance(membershipFunction, MFunction):
+            self._mFunction = membershipFunction  # instance of MembershipFunction class
+
+        else:
+            raise Exception('Not MFunction class instance was given!')
+
+        if isinstance(supportSet, tuple) and (len(supportSet) == 2) and (supportSet[0] < supportSet[1]):
+            self._supportSet = supportSet  # support set of given membership function
+
+        else:
+            raise Exception('Support Set must be 2-dim tuple (a, b) with real a, b parameters, a < b!')
+
+        self._version = 0  # incremented every time when support set, membership function or integrator are changed
+        self.integrator = integrator  # instance of RiemannIntegrator, GaussKronrodIntegrator or any object with Integrate()
+        self._defuzEvaluations = 0  # number of mju() evaluations spent on the last defuzzyfication
+        self._defuzCache = (None, None)  # (version stamp, defuzzy value), it is calculated only on request
+
+    def __str__(self):
+        # return view of fuzzy set - name = <mju(x|y, params), supportSet>. Example: FuzzySet = <Bell(x, a, b), [0, 1]>
+        fSetView = '{} = <{}, [{}, {}]>'.format(self._name, self._mFunction, self._supportSet[0], self._supportSet[1])
+        return fSetView
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+
+        for key in ('_Defuz', '_metrics'):
+            state.pop(key, None)  # copy of instrumented fuzzy set is not instrumented
+
+        return state
+
+    def __deepcopy__(self, memo):
+        return _ChangeableCopy(self, memo)
+
+    def Instrument(self, metrics=None, prefix=''):
+        """
+        Starts recording of defuzzyfications into metrics (new FuzzyMetrics by default) under operation's name
+        prefix + 'Defuz' with additional counters: 'integrations' - numeric integrations, 'evaluations' - mju() calls
+        spent on them. Calls which are not integrations used exact integrals or persistent cache.
+        Membership function of fuzzy set is instrumented with the same metrics and prefix. Returns metrics.
+        Frozen fuzzy set can't be instrumented, instrument its deepcopy instead.
+        """
+        if self._frozen or self._mFunction.frozen:
+            raise Exception("Fuzzy Set or its membership function is frozen and can't be instrumented!")
+
+        self._metrics = metrics if metrics is not None else FuzzyMetrics()
+        self._mFunction.Instrument(self._metrics, prefix)
+
+        defuz = _Measured(FuzzySet._Defuz.__get__(self), self._metrics, prefix + 'Defuz')
+        operation = prefix + 'Defuz'
+
+        def Defuz():
+            value = defuz()
+
+            if self._defuzEvaluations:
+                self._metrics.Add(operation, 'integrations')
+                self._metrics.Add(operation, 'evaluations', self._defuzEvaluations)
+
+            return value
+
+        self._Defuz = Defuz
+
+        return self._metrics
+
+    def Uninstrument(self):
+        """
+        Stops recording of metrics by fuzzy set and its membership function.
+        """
+        self.__dict__.pop('_Defuz', None)
+        self.__dict__.pop('_metrics', None)
+        self._mFunction.Uninstrument()
+
+    @property
+    def metrics(self):
+        return self._metrics  # None if fuzzy set is not instrumented
+
+    def Freeze(self):
+        """
+        Makes fuzzy set and its membership function unchangeable, setters raise exceptions after it.
+        """
+        self._mFunction.Freeze()
+        self._frozen = True
+
+    @property
+    def frozen(self):
+        return self._frozen
+
+    def _CheckFrozen(self):
+        if self._frozen:
+            raise Exception("Fuzzy Set is frozen and can't be changed!")
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        self._CheckFrozen()
+
+        if isinstance(value, str):
+            self._name = value
+
+        else:
+            raise Exception("Linguistic name of Fuzzy Set must be a string value!")
+
+    @property
+    def mFunction(self):
+        return self._mFunction  # current membership
+
+    @mFunction.setter
+    def mFunction(self, value):
+        self._CheckFrozen()
+
+        if isinstance(value, MFunction):
+            self._mFunction = value
+            self._version += 1
+            MFunction._epoch = next(MFunction._epochs)  # levels of scales may have new membership function
+
+        else:
+            raise Exception('Not MFunction class instance was given!')
+
+    @property
+    def supportSet(self):
+        return self._supportSet
+
+    @supportSet.setter
+    def supportSet(self, value):
+        self._CheckFrozen()
+
+        if isinstance(value, tuple) and (len(value) == 2) and (value[0] < value[1]):
+            self._supportSet = value  # new support set of given membership function
+            self._version += 1
+
+        else:
+            raise Exception('Support Set must be 2-dim tuple (a, b) with real a, b parameters, a < b!')
+
+    @property
+    def integrator(self):
+        return self._integrator
+
+    @integrator.setter
+    def integrator(self, value):
+        self._CheckFrozen()
 
-        except Exception:
-            print(traceback.format_exc())
-            print('Exponential membership function use real inputs x and parameters a, b.')
-            print('Your inputs: mju_exponential({}, {}, {})'.format(x, a, b))
-            return 0
+        if value is None or callable(getattr(value, 'Integrate', None)):
+            self._integrator = value
+            self._version += 1
 
-        return result
+        else:
+            raise Exception('Integrator must be None or an object with Integrate() method!')
 
-    def Sigmoidal(self, x):
+    @property
+    def defuzValue(self):
+        stamp = (self._version, self._mFunction.version, self._mFunction.accuracy)
+        cachedStamp, value = self._defuzCache
+
+        if cachedStamp != stamp:
+            value = self._Defuz()
+            self._defuzCache = (stamp, value)  # stamp and value are replaced together, so other threads never mix them
+
+        return value
+
+    @property
+    def defuzEvaluations(self):
+        return self._defuzEvaluations  # spent on the last defuzzyfication, 0 if integrals were calculated exactly
+
+    def _Defuz(self):
         """
-        This is sigmoidal membership function with real inputs x and parameters a, b.
+        Defuzzyfication function returns real value in support set of given fuzzy set using "center of gravity method".
+        Integrals in this method calculated from left to right border of support set of membership function.
+        Integrals are calculated exactly if membership function has closed form of them, see MFunction.Moments(),
+        otherwise they are approximately calculated by integrator of fuzzy set,
+        result of integration is read from and saved to persistent cache if it is set by SetDefuzCache().
+        If membership function is zero on support set, result is None, see SetValidationPolicy().
         """
-        a, b, result = 0, 0, 0
+        left = self._supportSet[0]
+        right = self._supportSet[1]
 
-        try:
-            a = self._parameters['a']
-            b = self._parameters['b']
+        moments = self._mFunction.Moments(left, right)
+        if moments is not None and moments[0] != 0:
+            self._defuzEvaluations = 0
+            return moments[1] / moments[0]
 
-            result = 1 / (1 + math.exp(1) ** (-a * (x - b)))
+        cache = _persistentDefuzCache
+        cacheKey = cache.Key(self) if cache is not None else None
+        if cacheKey is not None:
+            value = cache.Get(cacheKey)
 
-        except Exception:
-            print(traceback.format_exc())
-            print('Sigmoidal membership function use real inputs x and parameters a, b.')
-            print('Your inputs: mju_sigmoidal({}, {}, {})'.format(x, a, b))
-            return 0
+            if value is not None:
+                self._defuzEvaluations = 0
+                return value
 
-        return result
+        integrator = self._integrator if self._integrator is not None else RiemannIntegrator(self._mFunction.accuracy)
+        numeratorIntegral, denominatorIntegral, self._defuzEvaluations = integrator.Integrate(
+            self._mFunction.mju, left, right, self._mFunction.Breakpoints())
 
-    def Desirability(self, y):
+        if denominatorIntegral == 0:
+            _ReportInvalid('Membership function of fuzzy set {} is zero on its support set, center of gravity is undefined!', self)
+            return None
+
+        value = numeratorIntegral / denominatorIntegral
+        if cacheKey is not None:
+            cache.Put(cacheKey, value)
+
+        return value
+
+    def Defuz(self):
         """
-        This is Harrington's desirability membership function with real input y without any parameters.
+        This function now used for backward compatibility.
         """
-        try:
-            result = math.exp(-math.exp(-y))
+        return self.defuzValue
 
-        except Exception:
-            print(traceback.format_exc())
-            print("Harrington's desirability membership function use only real input y without any parameters.")
-            print('Your inputs: mju_desirability({})'.format(y))
-            return 0
 
-        return result
+class FuzzyLevel(Mapping):
+    """
+    Level of fuzzy scale: linguistic name, fuzzy set and index of level in scale.
+    Level is immutable and compact: it has no instance dictionary, only slots for name, fSet and index.
+    For backward compatibility level also behaves like read-only dictionary {'name': name, 'fSet': fSet}.
+    """
+    __slots__ = ('name', 'fSet', 'index')
 
+    _keys = ('name', 'fSet')  # keys of dictionary view, index is not a part of it
 
-class FuzzySet():
+    def __init__(self, name, fSet, index=0):
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'fSet', fSet)
+        object.__setattr__(self, 'index', index)
+
+    def __setattr__(self, key, value):
+        raise Exception("Fuzzy level is immutable! Set up new levels of fuzzy scale instead.")
+
+    def __delattr__(self, key):
+        raise Exception("Fuzzy level is immutable! Set up new levels of fuzzy scale instead.")
+
+    def __reduce__(self):
+        return FuzzyLevel, (self.name, self.fSet, self.index)  # for pickle and deepcopy, slots are read-only
+
+    def __getitem__(self, key):
+        if key == 'name':
+            return self.name
+
+        elif key == 'fSet':
+            return self.fSet
+
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return 2
+
+    def __repr__(self):
+        return repr({'name': self.name, 'fSet': self.fSet})  # the same view as for old levels-dictionaries
+
+
+class FuzzyProfile():
     """
-    Routines for work with fuzzy sets.
-    Fuzzy set A = <membershipFunction, supportSet>
+    Membership profile of real value on fuzzy scale, see FuzzyScale.Profile():
+        degrees - tuple of MF values of all levels in order of levels,
+        winner - index of level which is returned by Fuzzy(),
+        top - indexes of k levels with the highest MF values, in descending order of values,
+        margin - difference between the highest and the second highest MF values, confidence of winner.
     """
+    __slots__ = ('degrees', 'winner', 'top', 'margin')
 
-    def __init__(self, membershipFunction, supportSet=(0., 1.), linguisticName='FuzzySet'):
-        if isinstance(linguisticName, str):
-            self._name = linguisticName
+    def __init__(self, degrees, winner, top, margin):
+        object.__setattr__(self, 'degrees', degrees)
+        object.__setattr__(self, 'winner', winner)
+        object.__setattr__(self, 'top', top)
+        object.__setattr__(self, 'margin', margin)
+
+    def __setattr__(self, key, value):
+        raise Exception("Fuzzy profile is immutable!")
+
+    def __reduce__(self):
+        return FuzzyProfile, (self.degrees, self.winner, self.top, self.margin)
+
+    def __repr__(self):
+        return 'FuzzyProfile(winner={}, top={}, margin={}, degrees={})'.format(self.winner, self.top, self.margin, self.degrees)
+
+
+class FuzzyProfiles():
+    """
+    Membership profiles of array of values on fuzzy scale, see FuzzyScale.ProfileBatch(). All fields are arrays:
+        degrees - matrix (levels x values) of MF values,
+        winners - indexes of levels which are returned by FuzzyBatch(),
+        top - matrix (k x values) of indexes of levels with the highest MF values, in descending order of values,
+        margins - differences between the highest and the second highest MF values.
+    Profiles may be given to the next ProfileBatch() call as out parameter, then its arrays are reused.
+    """
+    __slots__ = ('degrees', 'winners', 'top', 'margins')
+
+    def __init__(self, levels, k, shape):
+        self.degrees = np.empty((levels,) + shape, dtype=float)
+        self.winners = np.empty(shape, dtype=np.intp)
+        self.top = np.empty((k,) + shape, dtype=np.intp)
+        self.margins = np.empty(shape, dtype=float)
+
+    def __len__(self):
+        return self.winners.size
+
+
+class FuzzyScale():
+    """
+    Routines for work with fuzzy scales. Fuzzy scale is an ordered set of linguistic variables.
+    Fuzzy scale contains named levels and its MF. This object looks like this:
+    S = [{'name': 'name_1', 'fSet': fuzzySet_1},
+         {'name': 'name_2', 'fSet': fuzzySet_2}, ...]
+        where name-key is a linguistic name of fuzzy set,
+        fSet-key is a user define fuzzy set, an instance of FuzzySet class.
+    Levels are stored as tuple of immutable FuzzyLevel objects, which are also readable as dictionaries above.
+    Fuzzy(), FuzzyBatch() and GetLevelByName() only read the scale, so they may be called from many threads at once.
+    """
+
+    _sharedScales = {}  # frozen canonical instances of scales' classes, see Shared()
+    _metrics = None  # FuzzyMetrics of instrumented scale
+    _sparseLevels = 4  # Fuzzy() and FuzzyBatch() of scales with less levels calculate all MF values, it is faster
+    _levelIndex = None  # interval index of levels for Fuzzy(), see _LevelIndex()
+
+    def __init__(self):
+        self._name = 'DefaultScale'  # default scale contains 3 levels, DefaultScale = {Min, Med, High}
+        self._frozen = False  # frozen scale can't be changed, see Freeze()
+        self._levels = self._MakeLevels(self._DefaultLevels())  # tuple of FuzzyLevel objects
+        self._levelsVersion = 0  # incremented every time when levels are changed, used by compiled fuzzy scales
+        self._levelsNames = self._GetLevelsNames()  # dictionary with only levels' names
+        self._levelsNamesUpper = self._GetLevelsNamesUpper()  # dictionary with only level's names in upper cases
+
+    def __str__(self):
+        # return view of fuzzy scale - name = {**levels} and levels interpreter. Example:
+        # DefaultScale = {Min, Med, High}
+        #     Minimum = <Hyperbolic(x, {"a": 7, "b": 4, "c": 0}), [0.0, 1.0]>
+        #     Medium = <Bell(x, {"a": 0.35, "b": 0.5, "c": 0.6}), [0.0, 1.0]>
+        #     High = <Triangle(x, {"a": 0.7, "b": 1, "c": 1}), [0.0, 1.0]>
+        allLevelsName = self._levels[0].name
+        allLevels = '\n    {}'.format(self._levels[0].fSet.__str__())
+
+        for level in self._levels[1:]:
+            allLevelsName += ', {}'.format(level.name)
+            allLevels += '\n    {}'.format(str(level.fSet))
+
+        scaleView = '{} = {{{}}}{}'.format(self._name, allLevelsName, allLevels)
+
+        return scaleView
+
+    def _DefaultLevels(self):
+        """
+        Returns list of default levels-dictionaries, scales with other default levels override this function.
+        """
+        return [{'name': 'Min',
+                 'fSet': FuzzySet(membershipFunction=MFunction('hyperbolic', **{'a': 7, 'b': 4, 'c': 0}),
+                                  supportSet=(0., 1.),
+                                  linguisticName='Minimum')},
+                {'name': 'Med',
+                 'fSet': FuzzySet(membershipFunction=MFunction('bell', **{'a': 0.35, 'b': 0.5, 'c': 0.6}),
+                                  supportSet=(0., 1.),
+                                  linguisticName='Medium')},
+                {'name': 'High',
+                 'fSet': FuzzySet(membershipFunction=MFunction('triangle', **{'a': 0.7, 'b': 1, 'c': 1}),
+                                  supportSet=(0., 1.),
+                                  linguisticName='High')}]
+
+    @classmethod
+    def Shared(cls):
+        """
+        Returns frozen canonical instance of scale with default levels. It is created once per scale class,
+        then the same object is returned, so it may be used instead of creating new scale on every request.
+        Use constructor to get scale which can be changed.
+        """
+        scale = FuzzyScale._sharedScales.get(cls)
+
+        if scale is None:
+            scale = cls()
+            scale.Freeze()
+            scale = FuzzyScale._sharedScales.setdefault(cls, scale)  # if other thread was first, its instance wins
+
+        return scale
+
+    def Freeze(self):
+        """
+        Makes scale, its fuzzy sets and their membership functions unchangeable, setters raise exceptions after it.
+        Frozen scale can't be unfrozen, make deepcopy of scale or its levels to get changeable ones.
+        """
+        for level in self._levels:
+            level.fSet.Freeze()
+
+        self._frozen = True
+
+    @property
+    def frozen(self):
+        return self._frozen
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+
+        for key in ('Fuzzy', 'FuzzyBatch', '_metrics'):
+            state.pop(key, None)  # copy of instrumented scale is not instrumented
+
+        state.pop('_levelIndex', None)  # index depends on versions of membership functions in this process
+
+        return state
+
+    def __deepcopy__(self, memo):
+        return _ChangeableCopy(self, memo)
+
+    def Instrument(self, metrics=None, levels=True):
+        """
+        Starts recording of Fuzzy() and FuzzyBatch() calls, times and errors into metrics (new FuzzyMetrics
+        by default). If levels is True then fuzzy sets of all levels are instrumented too, their operations
+        are prefixed by level's name, e.g. 'Med.mju', 'Med.Defuz'. Returns metrics.
+        Frozen scale, e.g. Shared() one, can't be instrumented, instrument its deepcopy instead.
+        """
+        if self._frozen or (levels and any(level.fSet.frozen or level.fSet.mFunction.frozen for level in self._levels)):
+            raise Exception("Fuzzy Scale or its fuzzy sets are frozen and can't be instrumented!")
+
+        self.Uninstrument()
+        self._metrics = metrics if metrics is not None else FuzzyMetrics()
+
+        self.Fuzzy = _Measured(self.Fuzzy, self._metrics, 'Fuzzy')
+        self.FuzzyBatch = _Measured(self.FuzzyBatch, self._metrics, 'FuzzyBatch', _ArraySize)
+
+        if levels:
+            for level in self._levels:
+                level.fSet.Instrument(self._metrics, level.name + '.')
+
+        return self._metrics
+
+    def Uninstrument(self):
+        """
+        Stops recording of metrics by scale and fuzzy sets of its levels.
+        """
+        for key in ('Fuzzy', 'FuzzyBatch', '_metrics'):
+            self.__dict__.pop(key, None)
+
+        for level in self._levels:
+            if level.fSet.metrics is not None:
+                level.fSet.Uninstrument()
+
+    @property
+    def metrics(self):
+        return self._metrics  # None if scale is not instrumented
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        if self._frozen:
+            raise Exception("Fuzzy Scale is frozen and can't be changed!")
+
+        if isinstance(value, str):
+            self._name = value
 
         else:
-            raise Exception("Linguistic name of Fuzzy Set must be a string value!")
+            raise Exception("Name of Fuzzy Scale must be a string value!")
 
-        if isinstance(membershipFunction, MFunction):
-            self._mFunction = membershipFunction  # instance of MembershipFunction class
+    @property
+    def levels(self):
+        return self._levels
+
+    @levels.setter
+    def levels(self, value):
+        if self._frozen:
+            raise Exception("Fuzzy Scale is frozen and can't be changed!")
+
+        if value:
+            for level in value:
+                if isinstance(level, Mapping) and (len(level) == 2) and ('name' in level.keys()) and ('fSet' in level.keys()):
+                    if not isinstance(level['name'], str):
+                        raise Exception("Level name - 'name' parameter - must be a string value!")
+
+                    if not isinstance(level['fSet'], FuzzySet):
+                        raise Exception("Fuzzy set - 'fSet' parameter - must be an instance of FuzzySet class!")
+
+                    nameCount = 0  # check for unique name:
+                    for otherLevel in value:
+                        if otherLevel['name'] == level['name']:
+                            nameCount += 1
+
+                    if nameCount > 1:
+                        raise Exception("The scale contains no unique levels! Warning for: {}".format(level['name']))
+
+                else:
+                    raise Exception("Level of fuzzy scale must be 2-dim dictionary looks like {'name': 'level_name', 'fSet': FuzzySet_instance}!")
+
+            self._levels = self._MakeLevels(value)  # set up new tuple of fuzzy levels
+            self._levelsVersion += 1
+            self._levelsNames = self._GetLevelsNames()  # updating dictionary with only levels' names
+            self._levelsNamesUpper = self._GetLevelsNamesUpper()  # updating dictionary with only level's names in upper cases
 
         else:
-            raise Exception('Not MFunction class instance was given!')
+            raise Exception('Fuzzy scale must contain at least one linguistic variable!')
 
-        if isinstance(supportSet, tuple) and (len(supportSet) == 2) and (supportSet[0] < supportSet[1]):
-            self._supportSet = supportSet  # support set of given membership function
+    @staticmethod
+    def _MakeLevels(levels):
+        """
+        Returns tuple of FuzzyLevel objects for given list of levels-dictionaries or levels.
+        """
+        return tuple(FuzzyLevel(level['name'], level['fSet'], index) for index, level in enumerate(levels))
+
+    def _GetLevelsNames(self):
+        """
+        Returns dictionary with only fuzzy levels' names and it's fuzzy level.
+        Example: {'Min': <FuzzyLevel>, 'Med': <FuzzyLevel>, 'High': <FuzzyLevel>}
+        """
+        return dict([(level.name, level) for level in self._levels])
+
+    def _GetLevelsNamesUpper(self):
+        """
+        Returns dictionary with only fuzzy levels' names in upper cases and it's fuzzy level.
+        Example: {'MIN': <FuzzyLevel>, 'MED': <FuzzyLevel>, 'HIGH': <FuzzyLevel>}
+        """
+        return dict([(level.name.upper(), level) for level in self._levels])
+
+    def Fuzzy(self, realValue):
+        """
+        Fuzzyfication function returns one of levels on fuzzy scale for given real value who MF(value) are highest.
+        """
+        return self._levels[self._FuzzyIndex(realValue)]
+
+    def _FuzzyIndex(self, realValue):
+        """
+        Returns index of level in levels list for Fuzzy() function.
+        Only levels which NonZeroInterval() contains value are evaluated, they are found by bisection in interval
+        index of levels, see _LevelIndex(). Other levels are zeros, so if all evaluated levels are zeros too
+        then the last level of scale wins as in full evaluation. Values which are not found in index (e.g. NaN)
+        and results out of [0, 1] are processed by full evaluation of all levels, so results are always the same.
+        """
+        levels = self._levels
+
+        if len(levels) < self._sparseLevels:
+            return self._FullFuzzyIndex(realValue)
+
+        _, bounds, candidates = self._LevelIndex()
+
+        try:
+            position = bisect.bisect_left(bounds, realValue)
+
+        except TypeError:
+            return self._FullFuzzyIndex(realValue)
+
+        if position < len(bounds) and bounds[position] == realValue:
+            region = 2 * position + 1  # value is equal to one of bounds
+
+        elif realValue == realValue:
+            region = 2 * position  # value is between two bounds
 
         else:
-            raise Exception('Support Set must be 2-dim tuple (a, b) with real a, b parameters, a < b!')
+            return self._FullFuzzyIndex(realValue)  # NaN
+
+        fuzzyIndex = len(levels) - 1
+        fuzzyValue = 0
+
+        for index in candidates[region]:
+            levelValue = levels[index].fSet.mFunction.mju(realValue)
+
+            if not (0 <= levelValue <= 1):
+                return self._FullFuzzyIndex(realValue)
+
+            if 0 < levelValue and fuzzyValue <= levelValue:  # the last of levels with equal MF values wins
+                fuzzyIndex = index
+                fuzzyValue = levelValue
+
+        return fuzzyIndex
+
+    def _LevelIndex(self):
+        """
+        Returns interval index of levels: (key, bounds, candidates), where bounds is a sorted list of finite bounds
+        of levels' NonZeroInterval() and candidates[2 * i] is a tuple of levels' indexes which can be non-zero
+        between bounds[i - 1] and bounds[i], candidates[2 * i + 1] - levels which can be non-zero at bounds[i].
+        Index is rebuilt if levels of scale or parameters of any membership function were changed.
+        """
+        key = (self._levelsVersion, MFunction._epoch)
+        levelIndex = self._levelIndex
+
+        if levelIndex is None or levelIndex[0] != key:
+            intervals = [level.fSet.mFunction.NonZeroInterval() for level in self._levels]
+            bounds = sorted(set(bound for interval in intervals for bound in interval if math.isfinite(bound)))
+            regions = [[] for _ in range(2 * len(bounds) + 1)]
+
+            for index, (left, right) in enumerate(intervals):
+                if left > right:
+                    continue  # membership function is zero everywhere
+
+                first = 0 if left == -math.inf else 2 * bisect.bisect_left(bounds, left) + 1
+                last = len(regions) - 1 if right == math.inf else 2 * bisect.bisect_left(bounds, right) + 1
+
+                for region in range(first, last + 1):
+                    regions[region].append(index)
+
+            levelIndex = (key, bounds, tuple(tuple(region) for region in regions))
+            self._levelIndex = levelIndex  # replaced at once, so concurrent readers see old or new index
+
+        return levelIndex
+
+    def _FullFuzzyIndex(self, realValue):
+        """
+        Returns index of level in levels list by MF values of all levels.
+        """
+        fuzzyIndex = 0
+        fuzzyValue = self._levels[0].fSet.mFunction.mju(realValue) or 0  # mju() is None for incorrect value
+
+        for index, level in enumerate(self._levels[1:], 1):
+            levelValue = level.fSet.mFunction.mju(realValue) or 0
+
+            if fuzzyValue <= levelValue:  # the last of levels with equal MF values wins
+                fuzzyIndex = index
+                fuzzyValue = levelValue
+
+        return fuzzyIndex
+
+    def FuzzyBatch(self, values, out=None):
+        """
+        Vectorized version of Fuzzy(): returns array of level indexes in levels list for every element of array values.
+        Values are sorted once, then MF of every level is calculated only for the slice of values inside of
+        its NonZeroInterval(), other values have zero degree of this level. So cost depends on number of levels
+        which can be non-zero for values, not on number of all levels in scale (scales with only a few levels
+        are fuzzyfied by MF values of all levels).
+        Ties are resolved as in Fuzzy(): the last of levels with equal MF values wins, e.g. the last level of scale
+        wins if all MF values are zeros.
+        out is an optional preallocated integer array with the same shape as values, results are written into it.
+        """
+        _RequireNumpy('FuzzyScale.FuzzyBatch()')
+
+        x = np.asarray(values, dtype=float)
+
+        if out is None:
+            out = np.empty(x.shape, dtype=np.intp)
+
+        elif out.shape != x.shape:
+            raise Exception('Output buffer shape {} must be equal to input shape {}!'.format(out.shape, x.shape))
+
+        if len(self._levels) < self._sparseLevels:
+            out[...] = self._DenseFuzzyBatch(x)
+            return out
+
+        flat = x.ravel()
+        order = np.argsort(flat, kind='stable')
+        sortedValues = flat[order]
+        numbers = sortedValues.size - np.count_nonzero(np.isnan(sortedValues))  # NaNs are sorted to the end
+
+        levels = self._levels
+        best = np.zeros(sortedValues.size, dtype=float)  # the highest MF value of every value
+        winners = np.full(sortedValues.size, len(levels) - 1, dtype=np.intp)
+        nanWinners = None  # argmax chooses NaN MF value as the highest one, the same is done here
+
+        for index, level in enumerate(levels):
+            left, right = level.fSet.mFunction.NonZeroInterval()
+            start = np.searchsorted(sortedValues[:numbers], left, side='left')
+            stop = np.searchsorted(sortedValues[:numbers], right, side='right')
+
+            if start >= stop:
+                continue
+
+            degrees = level.fSet.mFunction.MjuArray(sortedValues[start:stop])
+            better = (degrees >= best[start:stop]) & (degrees > 0)  # the last of levels with equal MF values wins
+            best[start:stop][better] = degrees[better]
+            winners[start:stop][better] = index
+
+            nans = np.isnan(degrees)
+            if nans.any():
+                if nanWinners is None:
+                    nanWinners = np.full(sortedValues.size, -1, dtype=np.intp)
+
+                nanWinners[start:stop][nans] = index
+
+        if numbers < sortedValues.size:
+            winners[numbers:] = self._DenseFuzzyBatch(sortedValues[numbers:])
+
+        if nanWinners is not None:
+            np.copyto(winners, nanWinners, where=nanWinners >= 0)
+
+        result = np.empty(flat.size, dtype=np.intp)
+        result[order] = winners  # back to the original order of values
+        out[...] = result.reshape(x.shape)
+
+        return out
+
+    def _DenseFuzzyBatch(self, x):
+        """
+        Returns indexes of levels, calculated by MF values of all levels for every element of array x.
+        """
+        degrees = np.empty((len(self._levels),) + x.shape, dtype=float)  # matrix (levels x values) of MF values
+        for index, level in enumerate(self._levels):
+            level.fSet.mFunction.MjuArray(x, out=degrees[index])
+
+        return len(self._levels) - 1 - np.argmax(degrees[::-1], axis=0)  # argmax returns the first maximum
+
+    def _Degrees(self, realValue):
+        """
+        Returns list of MF values of all levels for real value. Only levels from interval index are evaluated,
+        MF values of other levels are exactly zeros.
+        """
+        levels = self._levels
+
+        if len(levels) >= self._sparseLevels and realValue == realValue:
+            _, bounds, candidates = self._LevelIndex()
+
+            try:
+                position = bisect.bisect_left(bounds, realValue)
+
+            except TypeError:
+                position = None
+
+            if position is not None:
+                region = 2 * position + 1 if position < len(bounds) and bounds[position] == realValue else 2 * position
+                degrees = [0.] * len(levels)
+
+                for index in candidates[region]:
+                    degrees[index] = levels[index].fSet.mFunction.mju(realValue)
+
+                return degrees
+
+        return [level.fSet.mFunction.mju(realValue) or 0 for level in levels]  # mju() is None for incorrect value
+
+    def Profile(self, realValue, k=2):
+        """
+        Returns FuzzyProfile of real value: MF values of all levels, winner level's index (the same as index of
+        Fuzzy() result), indexes of k levels with the highest MF values and margin between two highest MF values.
+        Every level is evaluated once at most. Levels with equal MF values are ordered as in Fuzzy(): the last wins.
+        """
+        degrees = self._Degrees(realValue)
 
-        self._defuzValue = self._Defuz()  # initiating defuzzy value of current fuzzy set
+        winner = 0
+        for index in range(1, len(degrees)):
+            if degrees[winner] <= degrees[index]:  # the same comparisons as in Fuzzy()
+                winner = index
 
-    def __str__(self):
-        # return view of fuzzy set - name = <mju(x|y, params), supportSet>. Example: FuzzySet = <Bell(x, a, b), [0, 1]>
-        fSetView = '{} = <{}, [{}, {}]>'.format(self._name, self._mFunction, self._supportSet[0], self._supportSet[1])
-        return fSetView
+        top = heapq.nlargest(max(k, 2), range(len(degrees) - 1, -1, -1), key=degrees.__getitem__)  # stable as sorted()
+        margin = degrees[top[0]] - degrees[top[1]] if len(top) > 1 else degrees[top[0]]
 
-    @property
-    def name(self):
-        return self._name
+        return FuzzyProfile(tuple(degrees), winner, tuple(top[:k]), margin)
 
-    @name.setter
-    def name(self, value):
-        if isinstance(value, str):
-            self._name = value
+    def ProfileBatch(self, values, k=2, out=None):
+        """
+        Vectorized version of Profile(): returns FuzzyProfiles with arrays of MF values of all levels, winners
+        (the same as FuzzyBatch() results), top k levels and margins for every element of array values.
+        MF of every level is calculated once for whole array. out is an optional FuzzyProfiles of previous call
+        with the same shape of values and k, its arrays are filled instead of allocating new ones.
+        """
+        _RequireNumpy('FuzzyScale.ProfileBatch()')
 
-        else:
-            raise Exception("Linguistic name of Fuzzy Set must be a string value!")
+        x = np.asarray(values, dtype=float)
+        levels = len(self._levels)
+        k = min(k, levels)
 
-    @property
-    def mFunction(self):
-        return self._mFunction  # current membership
+        if out is None:
+            out = FuzzyProfiles(levels, k, x.shape)
 
-    @mFunction.setter
-    def mFunction(self, value):
-        if isinstance(value, MFunction):
-            self._mFunction = value
+        elif out.degrees.shape != (levels,) + x.shape or out.top.shape[0] != k:
+            raise Exception('Output profiles shape {} must be equal to (levels, values) shape {}!'.format(
+                out.degrees.shape, (levels,) + x.shape))
 
-        else:
-            raise Exception('Not MFunction class instance was given!')
+        for index, level in enumerate(self._levels):
+            level.fSet.mFunction.MjuArray(x, out=out.degrees[index])
 
-    @property
-    def supportSet(self):
-        return self._supportSet
+        reversedDegrees = out.degrees[::-1]  # the last of levels with equal MF values is the first in reversed order
+        np.subtract(levels - 1, np.argmax(reversedDegrees, axis=0), out=out.winners)
 
-    @supportSet.setter
-    def supportSet(self, value):
-        if isinstance(value, tuple) and (len(value) == 2) and (value[0] < value[1]):
-            self._supportSet = value  # new support set of given membership function
+        order = np.argsort(-reversedDegrees, axis=0, kind='stable')[:max(k, 2)]
+        np.subtract(levels - 1, order[:k], out=out.top)
+
+        highest = np.take_along_axis(reversedDegrees, order[:1], axis=0)[0]
+        if levels > 1:
+            np.subtract(highest, np.take_along_axis(reversedDegrees, order[1:2], axis=0)[0], out=out.margins)
 
         else:
-            raise Exception('Support Set must be 2-dim tuple (a, b) with real a, b parameters, a < b!')
+            out.margins[...] = highest
 
-    @property
-    def defuzValue(self):
-        return self._defuzValue
+        return out
 
-    def _Defuz(self):
+    def Stream(self, source, chunkSize=65536):
         """
-        Defuzzyfication function returns real value in support set of given fuzzy set using "center of gravity method".
-        Integrals in this method calculated from left to right border of support set of membership function.
-        Integrals are approximately calculated by Newton-Leibniz formula.
+        Generator for fuzzyfication of long streams: consumes iterable of real numbers or file-like object with one
+        number per line (see also ReadNumbers() and ReadCsvColumn()) by chunks of chunkSize numbers
+        and yields arrays of level indexes, calculated by FuzzyBatch(), in the same order.
+        Memory usage is bounded by chunk size, so multi-GB files can be fuzzyfied.
         """
-        left = self._supportSet[0]
-        right = self._supportSet[1]
-        step = (right - left) / self._mFunction.accuracy
+        for chunk in _StreamChunks(source, chunkSize):
+            yield self.FuzzyBatch(chunk)
 
-        numeratorIntegral = 0
-        denominatorIntegral = 0
+    def FuzzyParallel(self, values, workers=None, chunkSize=1048576):
+        """
+        Parallel version of FuzzyBatch() for huge arrays: values are split into tasks of chunkSize elements,
+        which are fuzzyfied by pool of workers processes (os.cpu_count() by default).
+        Input values and output level indexes are placed in shared memory, the scale is sent to every worker once,
+        so only tasks bounds are pickled. Returns array of level indexes with the same shape as values,
+        its type is uint8 for scales with 256 levels or less, int16 or int32 otherwise.
+        Speedup over FuzzyBatch() on several cores is not measured yet, run benchmarks/bench_parallel.py to check it.
+        On one core pool of workers is only an overhead: 2 workers are about 7% slower than 1 for 4M values.
+        """
+        _RequireNumpy('FuzzyScale.FuzzyParallel()')
 
-        for iteration in range(self._mFunction.accuracy):
-            x = left + (iteration + 1) * step
-            mjuValue = self._mFunction.mju(x)
+        x = np.asarray(values, dtype=float)
+        levelsCount = len(self._levels)
+        outputType = np.dtype(np.uint8 if levelsCount <= 256 else np.int16 if levelsCount <= 32768 else np.int32)
+        workers = workers or os.cpu_count() or 1
 
-            numeratorIntegral += x * mjuValue
-            denominatorIntegral += mjuValue
+        if workers == 1 or x.size <= chunkSize:
+            return self.FuzzyBatch(x).astype(outputType)
 
-        return numeratorIntegral / denominatorIntegral
+        inputBlock = shared_memory.SharedMemory(create=True, size=x.nbytes)
+        outputBlock = shared_memory.SharedMemory(create=True, size=max(x.size * outputType.itemsize, 1))
 
-    def Defuz(self):
+        try:
+            np.ndarray(x.shape, dtype=float, buffer=inputBlock.buf)[...] = x
+            tasks = [(start, min(start + chunkSize, x.size)) for start in range(0, x.size, chunkSize)]
+
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_ParallelInit,
+                                     initargs=(self, inputBlock.name, outputBlock.name, x.size, outputType.str)) as executor:
+                for _ in executor.map(_ParallelFuzzyTask, tasks):
+                    pass  # results are already written into shared memory
+
+            return np.ndarray(x.shape, dtype=outputType, buffer=outputBlock.buf).copy()
+
+        finally:
+            inputBlock.close()
+            inputBlock.unlink()
+            outputBlock.close()
+            outputBlock.unlink()
+
+    def Compile(self, resolution=1000, mode='crossover'):
         """
-        This function now used for backward compatibility.
+        Returns CompiledFuzzyScale: fast fuzzyfier which is equal to Fuzzy() but does not calculate MF at all.
+        Winning level is a step function of real value, it is precalculated on the grid of resolution cells
+        over union of levels' support sets, see CompiledFuzzyScale for modes description.
         """
-        return self._defuzValue
+        return CompiledFuzzyScale(self, resolution=resolution, mode=mode)
 
+    def GetLevelByName(self, levelName, exactMatching=True):
+        """
+        Function return fuzzy level, it is readable as dictionary level = {'name': 'level_name', 'fSet': fuzzySet}
+        exactMatching is a flag for exact matching search,
+            if True then levelName must be equal to level['name'],
+            otherwise - level['name'] in uppercase must contains levelName in uppercase.
+        """
+        if exactMatching:
+            return self._levelsNames.get(levelName)
 
-class FuzzyScale():
+        else:
+            return self._levelsNamesUpper.get(levelName.upper())
+
+
+class CompiledFuzzyScale():
     """
-    Routines for work with fuzzy scales. Fuzzy scale is an ordered set of linguistic variables.
-    Fuzzy scale contains named levels and its MF. This object looks like this:
-    S = [{'name': 'name_1', 'fSet': fuzzySet_1},
-         {'name': 'name_2', 'fSet': fuzzySet_2}, ...]
-        where name-key is a linguistic name of fuzzy set,
-        fSet-key is a user define fuzzy set, an instance of FuzzySet class.
+    Precompiled fuzzyfier for fuzzy scale. Domain of compiled scale is union of levels' support sets,
+    it is divided by grid of resolution cells. Compiling modes are:
+        'crossover' - exact crossover points between winning levels are found by bisection inside grid cells,
+                      then level is searched by bisect over sorted crossover points;
+        'table' - dense quantized table of winning levels in the centers of grid cells, level is found by indexing.
+    maxError is the maximum distance between real value and crossover point at which value can be misclassified.
+    In 'crossover' mode breakpoints of levels' membership functions are added to the grid, so peaks of narrow levels
+    are sampled, but level that wins only between two grid nodes may still be missed, so maxError is the widest grid cell.
+    Values out of domain are fuzzyfied by scale itself. Compiled scale is rebuilt if levels of scale are reassigned,
+    it may be shared between threads like the scale itself.
     """
 
-    def __init__(self):
-        self._name = 'DefaultScale'  # default scale contains 3 levels, DefaultScale = {Min, Med, High}:
-
-        self._levels = [{'name': 'Min',
-                         'fSet': FuzzySet(membershipFunction=MFunction('hyperbolic', **{'a': 7, 'b': 4, 'c': 0}),
-                                          supportSet=(0., 1.),
-                                          linguisticName='Minimum')},
-                        {'name': 'Med',
-                         'fSet': FuzzySet(membershipFunction=MFunction('bell', **{'a': 0.35, 'b': 0.5, 'c': 0.6}),
-                                          supportSet=(0., 1.),
-                                          linguisticName='Medium')},
-                        {'name': 'High',
-                         'fSet': FuzzySet(membershipFunction=MFunction('triangle', **{'a': 0.7, 'b': 1, 'c': 1}),
-                                          supportSet=(0., 1.),
-                                          linguisticName='High')}]
+    def __init__(self, scale, resolution=1000, mode='crossover'):
+        if not isinstance(scale, FuzzyScale):
+            raise Exception('Not FuzzyScale class instance was given!')
 
-        self._levelsNames = self._GetLevelsNames()  # dictionary with only levels' names
-        self._levelsNamesUpper = self._GetLevelsNamesUpper()  # dictionary with only level's names in upper cases
+        if not (isinstance(resolution, int) and resolution > 0):
+            raise Exception('Resolution must be a positive integer number!')
 
-    def __str__(self):
-        # return view of fuzzy scale - name = {**levels} and levels interpreter. Example:
-        # DefaultScale = {Min, Med, High}
-        #     Minimum = <Hyperbolic(x, {"a": 7, "b": 4, "c": 0}), [0.0, 1.0]>
-        #     Medium = <Bell(x, {"a": 0.35, "b": 0.5, "c": 0.6}), [0.0, 1.0]>
-        #     High = <Triangle(x, {"a": 0.7, "b": 1, "c": 1}), [0.0, 1.0]>
-        allLevelsName = self._levels[0]['name']
-        allLevels = '\n    {}'.format(self._levels[0]['fSet'].__str__())
+        if mode not in ('crossover', 'table'):
+            raise Exception("Compiling mode must be 'crossover' or 'table'!")
 
-        for level in self._levels[1:]:
-            allLevelsName += ', {}'.format(level['name'])
-            allLevels += '\n    {}'.format(str(level['fSet']))
+        self._scale = scale
+        self._resolution = resolution
+        self._mode = mode
 
-        scaleView = '{} = {{{}}}{}'.format(self._name, allLevelsName, allLevels)
+        self._Build()
 
-        return scaleView
+    @property
+    def scale(self):
+        return self._scale
 
     @property
-    def name(self):
-        return self._name
+    def mode(self):
+        return self._mode
 
-    @name.setter
-    def name(self, value):
-        if isinstance(value, str):
-            self._name = value
+    @property
+    def maxError(self):
+        return self._State()[7]
+
+    @property
+    def crossovers(self):
+        return self._State()[5]  # sorted crossover points in 'crossover' mode, empty list in 'table' mode
+
+    def _Build(self):
+        """
+        Precalculates crossover points or table of winning levels.
+        All precalculated values are replaced together, so concurrent readers never see half-built state.
+        """
+        version = self._scale._levelsVersion
+        left = min(level.fSet.supportSet[0] for level in self._scale.levels)
+        right = max(level.fSet.supportSet[1] for level in self._scale.levels)
+        step = (right - left) / self._resolution
+
+        winner = self._scale._FuzzyIndex
+
+        table, crossovers, winners = [], [], []  # level winners[i + 1] wins right after crossover point crossovers[i]
+
+        if self._mode == 'table':
+            table = [winner(left + (cell + 0.5) * step) for cell in range(self._resolution)]
+            maxError = step / 2
 
         else:
-            raise Exception("Name of Fuzzy Scale must be a string value!")
+            tolerance = max(step * 1e-9, math.ulp(max(abs(left), abs(right))))  # bisection can't be finer than float numbers
+            grid = {left + node * step for node in range(self._resolution)} | {right}
 
-    @property
-    def levels(self):
-        return self._levels
+            for level in self._scale.levels:  # peaks and kinks of narrow levels are sampled, so such levels aren't missed
+                grid.update(x for x in level.fSet.mFunction.Breakpoints() + list(level.fSet.supportSet) if left < x < right)
 
-    @levels.setter
-    def levels(self, value):
-        if value:
-            for level in value:
-                if isinstance(level, dict) and (len(level) == 2) and ('name' and 'fSet' in level.keys()):
-                    if not isinstance(level['name'], str):
-                        raise Exception("Level name - 'name' parameter - must be a string value!")
+            grid = sorted(grid)
+            gridWinners = [winner(x) for x in grid]
+            winners.append(gridWinners[0])
 
-                    if not isinstance(level['fSet'], FuzzySet):
-                        raise Exception("Fuzzy set - 'fSet' parameter - must be an instance of FuzzySet class!")
+            for node in range(len(grid) - 1):
+                current, lo = gridWinners[node], grid[node]
 
-                    nameCount = 0  # check for unique name:
-                    for otherLevel in value:
-                        if otherLevel['name'] == level['name']:
-                            nameCount += 1
+                while current != gridWinners[node + 1]:  # there may be several crossovers inside one grid cell
+                    hi = grid[node + 1]
 
-                    if nameCount > 1:
-                        raise Exception("The scale contains no unique levels! Warning for: {}".format(level['name']))
+                    while hi - lo > tolerance:
+                        middle = (lo + hi) / 2
 
-                else:
-                    raise Exception("Level of fuzzy scale must be 2-dim dictionary looks like {'name': 'level_name', 'fSet': FuzzySet_instance}!")
+                        if middle == lo or middle == hi:
+                            break  # there are no float numbers between lo and hi
 
-            self._levels = value  # set up new list of fuzzy levels
-            self._levelsNames = self._GetLevelsNames()  # updating dictionary with only levels' names
-            self._levelsNamesUpper = self._GetLevelsNamesUpper()  # updating dictionary with only level's names in upper cases
+                        if winner(middle) == current:
+                            lo = middle
 
-        else:
-            raise Exception('Fuzzy scale must contain at least one linguistic variable!')
+                        else:
+                            hi = middle
 
-    def _GetLevelsNames(self):
+                    current, lo = winner(hi), hi
+                    crossovers.append(hi)
+                    winners.append(current)
+
+            maxError = max(hi - lo for lo, hi in zip(grid, grid[1:])) if len(grid) > 1 else 0  # level winning only inside one cell may be missed
+
+        self._state = (version, left, right, step, table, crossovers, winners, maxError)
+
+    def _State(self):
         """
-        Returns dictionary with only fuzzy levels' names and it's fuzzy set.
-        Example: {'Min': <fSet_Object>, 'Med': <fSet_Object>, 'High': <fSet_Object>}
+        Returns precalculated state, it is rebuilt if levels of scale were reassigned.
         """
-        return dict([(x['name'], self._levels[lvl]) for lvl, x in enumerate(self._levels)])
+        if self._state[0] != self._scale._levelsVersion:
+            self._Build()
 
-    def _GetLevelsNamesUpper(self):
+        return self._state
+
+    def FuzzyIndex(self, realValue):
         """
-        Returns dictionary with only fuzzy levels' names in upper cases and it's fuzzy set.
-        Example: {'MIN': <fSet_Object>, 'MED': <fSet_Object>, 'HIGH': <fSet_Object>}
+        Returns index of level in scale levels list, equal to scale.levels.index(scale.Fuzzy(realValue)).
         """
-        return dict([(x['name'].upper(), self._levels[lvl]) for lvl, x in enumerate(self._levels)])
+        _, left, right, step, table, crossovers, winners, _ = self._State()
+
+        if not (left <= realValue <= right):
+            return self._scale._FuzzyIndex(realValue)
+
+        if table:
+            return table[min(int((realValue - left) / step), self._resolution - 1)]
+
+        return winners[bisect.bisect_right(crossovers, realValue)]
 
     def Fuzzy(self, realValue):
         """
-        Fuzzyfication function returns one of levels on fuzzy scale for given real value who MF(value) are highest.
+        Returns one of levels on fuzzy scale for given real value as scale.Fuzzy() does.
         """
-        fuzzyLevel = self._levels[0]
-
-        for level in self._levels[1:]:
-            if fuzzyLevel['fSet'].mFunction.mju(realValue) <= level['fSet'].mFunction.mju(realValue):
-                fuzzyLevel = level
-
-        return fuzzyLevel
+        return self._scale.levels[self.FuzzyIndex(realValue)]
 
-    def GetLevelByName(self, levelName, exactMatching=True):
+    def FuzzyBatch(self, values, out=None):
         """
-        Function return fuzzy level as dictionary level = {'name': 'level_name', 'fSet': fuzzySet}
-        exactMatching is a flag for exact matching search,
-            if True then levelName must be equal to level['name'],
-            otherwise - level['name'] in uppercase must contains levelName in uppercase.
+        Vectorized version of FuzzyIndex(), analog of scale.FuzzyBatch().
+        out is an optional preallocated integer array with the same shape as values, results are written into it.
         """
-        if exactMatching:
-            return self._levelsNames.get(levelName)
+        _RequireNumpy('CompiledFuzzyScale.FuzzyBatch()')
+
+        _, left, right, step, table, crossovers, winners, _ = self._State()
+
+        x = np.asarray(values, dtype=float)
+
+        if out is None:
+            out = np.empty(x.shape, dtype=np.intp)
+
+        elif out.shape != x.shape:
+            raise Exception('Output buffer shape {} must be equal to input shape {}!'.format(out.shape, x.shape))
+
+        if table:
+            cells = np.clip(((x - left) / step).astype(np.intp), 0, self._resolution - 1)
+            out[...] = np.asarray(table, dtype=np.intp)[cells]
 
         else:
-            return self._levelsNamesUpper.get(levelName.upper())
+            out[...] = np.asarray(winners, dtype=np.intp)[np.searchsorted(crossovers, x, side='right')]
+
+        outside = ~((left <= x) & (x <= right))
+        if outside.any():
+            out[outside] = self._scale.FuzzyBatch(x[outside])
+
+        return out
+
+    def Stream(self, source, chunkSize=65536):
+        """
+        Streaming fuzzyfication as scale.Stream() does, but level indexes are calculated by FuzzyBatch() of compiled scale.
+        """
+        for chunk in _StreamChunks(source, chunkSize):
+            yield self.FuzzyBatch(chunk)
 
 
 class UniversalFuzzyScale(FuzzyScale):
@@ -729,31 +3652,32 @@ class UniversalFuzzyScale(FuzzyScale):
     def __init__(self):
         super().__init__()
 
-        self._name = 'FuzzyScale'  # default universal fuzzy scale contains 5 levels, FuzzyScale = {Min, Low, Med, High, Max}:
-
-        self._levels = [{'name': 'Min',
-                         'fSet': FuzzySet(membershipFunction=MFunction('hyperbolic', **{'a': 8, 'b': 20, 'c': 0}),
-                                          supportSet=(0., 0.23),
-                                          linguisticName='Min')},
-                        {'name': 'Low',
-                         'fSet': FuzzySet(membershipFunction=MFunction('bell', **{'a': 0.17, 'b': 0.23, 'c': 0.34}),
-                                          supportSet=(0.17, 0.4),
-                                          linguisticName='Low')},
-                        {'name': 'Med',
-                         'fSet': FuzzySet(membershipFunction=MFunction('bell', **{'a': 0.34, 'b': 0.4, 'c': 0.6}),
-                                          supportSet=(0.34, 0.66),
-                                          linguisticName='Med')},
-                        {'name': 'High',
-                         'fSet': FuzzySet(membershipFunction=MFunction('bell', **{'a': 0.6, 'b': 0.66, 'c': 0.77}),
-                                          supportSet=(0.6, 0.83),
-                                          linguisticName='High')},
-                        {'name': 'Max',
-                         'fSet': FuzzySet(membershipFunction=MFunction('parabolic', **{'a': 0.77, 'b': 0.95}),
-                                          supportSet=(0.77, 1.),
-                                          linguisticName='Max')}]
-
-        self._levelsNames = self._GetLevelsNames()  # dictionary with only universal fuzzy scale levels' names
-        self._levelsNamesUpper = self._GetLevelsNamesUpper()  # dictionary with only level's names in upper cases
+        self._name = 'FuzzyScale'  # default universal fuzzy scale contains 5 levels, FuzzyScale = {Min, Low, Med, High, Max}
+
+    def _DefaultLevels(self):
+        """
+        Returns list of universal fuzzy scale levels-dictionaries, they are used instead of default scale levels.
+        """
+        return [{'name': 'Min',
+                 'fSet': FuzzySet(membershipFunction=MFunction('hyperbolic', **{'a': 8, 'b': 20, 'c': 0}),
+                                  supportSet=(0., 0.23),
+                                  linguisticName='Min')},
+                {'name': 'Low',
+                 'fSet': FuzzySet(membershipFunction=MFunction('bell', **{'a': 0.17, 'b': 0.23, 'c': 0.34}),
+                                  supportSet=(0.17, 0.4),
+                                  linguisticName='Low')},
+                {'name': 'Med',
+                 'fSet': FuzzySet(membershipFunction=MFunction('bell', **{'a': 0.34, 'b': 0.4, 'c': 0.6}),
+                                  supportSet=(0.34, 0.66),
+                                  linguisticName='Med')},
+                {'name': 'High',
+                 'fSet': FuzzySet(membershipFunction=MFunction('bell', **{'a': 0.6, 'b': 0.66, 'c': 0.77}),
+                                  supportSet=(0.6, 0.83),
+                                  linguisticName='High')},
+                {'name': 'Max',
+                 'fSet': FuzzySet(membershipFunction=MFunction('parabolic', **{'a': 0.77, 'b': 0.95}),
+                                  supportSet=(0.77, 1.),
+                                  linguisticName='Max')}]
 
     @property
     def levels(self):
@@ -768,5 +3692,309 @@ class UniversalFuzzyScale(FuzzyScale):
         return self._levelsNamesUpper  # only levels' names of Universal Fuzzy Scale in upper cases
 
 
+class RuleBase():
+    """
+    Mamdani fuzzy inference system over fuzzy scales. inputs is a dictionary {variable name: FuzzyScale},
+    output is a variable name and outputScale is its FuzzyScale. Rules are strings with levels' names of scales:
+        "IF cpu IS High AND latency IS Max THEN risk IS High"
+        "IF cpu IS Min OR latency IS Min THEN risk IS Min"
+    Antecedents of one rule are joined by AND (T-Norm tNorm) or by OR (S-coNorm sCoNorm), not by both.
+    Rules are compiled into index arrays, so firing strengths of all rules are calculated for whole batch of inputs
+    by MjuArray() of every used level and TNormReduce(). Output levels are clipped by firing strengths (min implication),
+    aggregated by S-coNorm sCoNorm and defuzzyfied by centroid on the grid of gridSize points over union of
+    output levels' support sets. Compiled state is rebuilt if rules, levels of scales or their fuzzy sets are changed.
+    Throughput is about 0.7-0.8M inferences/s on one core for 50 rules over two inputs with 5 levels and default
+    grid (benchmarks/bench_suite.py), it is below 1M/s. Bottlenecks are MjuArray() of input levels, which are evaluated
+    by masked branches (about 2/3 of time with firing strengths), and clipping and aggregation on the output grid,
+    which cost is proportional to number of values multiplied by gridSize.
+    """
+
+    _rulePattern = re.compile(r'^\s*IF\s+(.+?)\s+THEN\s+(\w+)\s+IS\s+(\w+)\s*$', re.IGNORECASE)
+    _termPattern = re.compile(r'^\s*(\w+)\s+IS\s+(\w+)\s*$', re.IGNORECASE)
+    _connectorPattern = re.compile(r'\s+(AND|OR)\s+', re.IGNORECASE)
+
+    def __init__(self, inputs, output, outputScale, rules=(), tNorm='logic', sCoNorm='logic', gridSize=101):
+        _RequireNumpy('RuleBase')
+
+        if not (isinstance(inputs, dict) and inputs and all(isinstance(scale, FuzzyScale) for scale in inputs.values())):
+            raise Exception('Inputs must be not empty dictionary {variable name: FuzzyScale}!')
+
+        if not isinstance(outputScale, FuzzyScale):
+            raise Exception('Not FuzzyScale class instance was given for output variable!')
+
+        if not (isinstance(gridSize, int) and gridSize > 1):
+            raise Exception('Grid size must be an integer number greater than 1!')
+
+        self._inputs = dict(inputs)
+        self._output = output
+        self._outputScale = outputScale
+        self._tNorm = _RequireNorm(tNorm, _tNorms)
+        self._sCoNorm = _RequireNorm(sCoNorm, _sCoNorms)
+        self._gridSize = gridSize
+
+        self._rules = ()  # parsed rules: (text, connector, ((variable, level name), ...), output level name)
+        self._state = None
+
+        for rule in rules:
+            self.AddRule(rule)
+
+    @property
+    def inputs(self):
+        return self._inputs
+
+    @property
+    def output(self):
+        return self._output
+
+    @property
+    def outputScale(self):
+        return self._outputScale
+
+    @property
+    def rules(self):
+        return tuple(rule[0] for rule in self._rules)
+
+    @property
+    def grid(self):
+        return self._State()[7]  # points of output domain, on which aggregated output fuzzy set is defuzzyfied
+
+    def AddRule(self, rule):
+        """
+        Parses rule string, checks its variables and levels' names and adds it to rule base. Returns index of rule.
+        """
+        match = self._rulePattern.match(rule) if isinstance(rule, str) else None
+        if match is None:
+            raise Exception('Rule "{}" must look like "IF variable IS level AND ... THEN output IS level"!'.format(rule))
+
+        parts = self._connectorPattern.split(match.group(1))
+        connectors = set(connector.upper() for connector in parts[1::2])
+
+        if len(connectors) > 1:
+            raise Exception('Rule "{}" mixes AND and OR, split it into several rules!'.format(rule))
+
+        terms = []
+        for term in parts[::2]:
+            termMatch = self._termPattern.match(term)
+
+            if termMatch is None:
+                raise Exception('Antecedent "{}" of rule "{}" must look like "variable IS level"!'.format(term, rule))
+
+            terms.append(self._Term(rule, self._inputs, termMatch.group(1), termMatch.group(2)))
+
+        outputTerm = self._Term(rule, {self._output: self._outputScale}, match.group(2), match.group(3))
+
+        self._rules += ((rule, connectors.pop() if connectors else 'AND', tuple(terms), outputTerm[1]),)
+
+        return len(self._rules) - 1
+
+    @staticmethod
+    def _Term(rule, scales, variable, levelName):
+        if variable not in scales:
+            raise Exception('Unknown variable "{}" in rule "{}"!'.format(variable, rule))
+
+        if scales[variable].GetLevelByName(levelName) is None:
+            raise Exception('Level "{}" is not found on scale of variable "{}" in rule "{}"!'.format(levelName, variable, rule))
+
+        return variable, levelName
+
+    def _Key(self):
+        return (self._rules,
+                tuple(scale._levelsVersion for scale in self._inputs.values()),
+                tuple((level.fSet._version, level.fSet.mFunction.version) for scale in self._inputs.values() for level in scale.levels),
+                tuple((level.fSet._version, level.fSet.mFunction.version) for level in self._outputScale.levels),
+                self._outputScale._levelsVersion)
+
+    def _Compile(self, key):
+        """
+        Builds index arrays of rules and table of output levels' MF values on grid.
+        Every used level of input variable becomes one row of matrix of membership degrees, two additional rows
+        contain ones and zeros to pad antecedents of AND and OR rules to the same length.
+        """
+        if not self._rules:
+            raise Exception('Rule base is empty, add rules by AddRule()!')
+
+        terms = {}  # (variable, level name) -> row of degrees matrix
+        for _, _, antecedents, _ in self._rules:
+            for term in antecedents:
+                terms.setdefault(term, len(terms))
+
+        ones, zeros = len(terms), len(terms) + 1
+        width = max(len(antecedents) for _, _, antecedents, _ in self._rules)
+
+        groups = []  # (norm, connector, rules' numbers, matrix of degrees' rows) for AND and OR rules
+        for connector, norm, padding in (('AND', self._tNorm, ones), ('OR', self._sCoNorm, zeros)):
+            numbers = [number for number, rule in enumerate(self._rules) if rule[1] == connector]
+
+            if numbers:
+                rows = [[terms[term] for term in self._rules[number][2]] for number in numbers]
+                rows = np.array([row + [padding] * (width - len(row)) for row in rows], dtype=np.intp)
+                groups.append((norm, connector, np.array(numbers, dtype=np.intp), rows))
+
+        levels = self._outputScale.levels
+        left = min(level.fSet.supportSet[0] for level in levels)
+        right = max(level.fSet.supportSet[1] for level in levels)
+        grid = np.linspace(left, right, self._gridSize)
+
+        outputDegrees = np.empty((len(levels), self._gridSize), dtype=float)
+        for level in levels:
+            level.fSet.mFunction.MjuArray(grid, out=outputDegrees[level.index])
+
+        columns = []  # slices of grid where MF values of output levels are not zeros, only they are aggregated
+        for index in range(len(levels)):
+            nonZero = np.flatnonzero(outputDegrees[index])
+            columns.append(slice(nonZero[0], nonZero[-1] + 1) if nonZero.size else slice(0, 0))
+
+        consequents = [self._outputScale.GetLevelByName(rule[3]).index for rule in self._rules]
+
+        # rules with the same consequent, they are aggregated before implication by max S-coNorm:
+        byLevel = [(index, np.array([number for number, level in enumerate(consequents) if level == index], dtype=np.intp))
+                   for index in range(len(levels))]
+        byLevel = [(index, numbers) for index, numbers in byLevel if numbers.size]
+
+        inputTerms = [(variable, self._inputs[variable].GetLevelByName(levelName).fSet.mFunction)
+                      for variable, levelName in terms]
+
+        self._state = (key, inputTerms, groups, consequents, byLevel, outputDegrees, columns, grid)
+
+    def _State(self):
+        key = self._Key()
+
+        if self._state is None or self._state[0] != key:
+            self._Compile(key)
+
+        return self._state
+
+    def _Inputs(self, inputs):
+        """
+        Returns flat arrays of input variables' values broadcasted to one shape and this shape.
+        """
+        missing = [variable for variable in self._inputs if variable not in inputs]
+        if missing:
+            raise Exception('Values of input variables {} are not given!'.format(missing))
+
+        arrays = np.broadcast_arrays(*[np.asarray(inputs[variable], dtype=float) for variable in self._inputs])
+
+        return {variable: array.ravel() for variable, array in zip(self._inputs, arrays)}, arrays[0].shape
+
+    def _Firing(self, state, values, size):
+        """
+        Returns matrix (rules x values) of firing strengths for flat arrays of input values.
+        MF of every used level is calculated only for values inside of its NonZeroInterval(). Rules which can't fire
+        for any of values (AND rule with not active level or OR rule without active levels) are not calculated.
+        """
+        inputTerms, groups = state[1], state[2]
+
+        degrees = np.zeros((len(inputTerms) + 2, size), dtype=float)
+        active = np.zeros(len(inputTerms) + 2, dtype=bool)  # rows of levels which are not zeros for some values
+        active[-2] = True
+        degrees[-2] = 1.
+
+        for row, (variable, mFunction) in enumerate(inputTerms):
+            x = values[variable]
+            left, right = mFunction.NonZeroInterval()
+
+            if left == -math.inf and right == math.inf:
+                mFunction.MjuArray(x, out=degrees[row])
+                active[row] = True
+                continue
+
+            inside = np.flatnonzero((left <= x) & (x <= right))
+            if inside.size == size:
+                mFunction.MjuArray(x, out=degrees[row])
+
+            elif inside.size:
+                degrees[row, inside] = mFunction.MjuArray(x[inside])
+
+            active[row] = inside.size > 0
+
+        firing = np.zeros((len(self._rules), size), dtype=float)
+        for norm, connector, numbers, rows in groups:
+            fired = active[rows].all(axis=1) if connector == 'AND' else active[rows].any(axis=1)
+
+            if fired.all():
+                firing[numbers] = _NormReduce('RuleBase', norm, degrees[rows], 1, None, 'ignore')
+
+            elif fired.any():
+                firing[numbers[fired]] = _NormReduce('RuleBase', norm, degrees[rows[fired]], 1, None, 'ignore')
+
+        return firing
+
+    def FiringStrengths(self, inputs):
+        """
+        Returns array of firing strengths of rules with shape (rules,) + shape of broadcasted input values.
+        inputs is a dictionary {variable name: real value or array of values}.
+        """
+        values, shape = self._Inputs(inputs)
+
+        return self._Firing(self._State(), values, int(np.prod(shape))).reshape((len(self._rules),) + shape)
+
+    def Infer(self, inputs, out=None, chunkSize=4096):
+        """
+        Returns crisp values of output variable for inputs dictionary {variable name: real value or array of values}.
+        Arrays are broadcasted to one shape, result has the same shape, it is float for scalar inputs.
+        Result is NaN where no rule fires. Inputs are processed by chunks of chunkSize values to keep
+        intermediate matrices (values x grid points) small.
+        out is an optional preallocated float array with broadcast shape of inputs.
+        """
+        state = self._State()
+        _, _, _, consequents, byLevel, outputDegrees, columns, grid = state
+
+        values, shape = self._Inputs(inputs)
+        size = int(np.prod(shape))
+
+        if out is None:
+            result = np.empty(size, dtype=float)
+
+        elif out.shape != shape:
+            raise Exception('Output buffer shape {} must be equal to input shape {}!'.format(out.shape, shape))
+
+        else:
+            result = out.reshape(size)  # view for contiguous buffer
+
+        fastAggregation = self._sCoNorm is _sCoNorms['logic']  # max S-coNorm commutes with min implication
+        moments = np.column_stack((grid, np.ones_like(grid)))  # centroid's numerator and denominator by one product
+
+        buffer = np.empty((min(chunkSize, size), len(grid)), dtype=float)
+        clippedBuffer = np.empty_like(buffer)
+
+        for start in range(0, size, chunkSize):
+            stop = min(start + chunkSize, size)
+            chunk = {variable: array[start:stop] for variable, array in values.items()}
+            firing = self._Firing(state, chunk, stop - start)
+
+            aggregated, clipped = buffer[:stop - start], clippedBuffer[:stop - start]
+            aggregated.fill(0.)
+
+            # zero is identity of S-coNorms, so only columns of grid where output level is not zero are aggregated:
+            if fastAggregation:
+                for index, numbers in byLevel:
+                    strength = firing[numbers].max(axis=0) if numbers.size > 1 else firing[numbers[0]]
+                    part = columns[index]
+
+                    if strength.any():
+                        np.minimum(strength[:, None], outputDegrees[index, part], out=clipped[:, part])
+                        np.maximum(aggregated[:, part], clipped[:, part], out=aggregated[:, part])
+
+            else:
+                for number, index in enumerate(consequents):
+                    part = columns[index]
+
+                    if firing[number].any():
+                        np.minimum(firing[number][:, None], outputDegrees[index, part], out=clipped[:, part])
+                        self._sCoNorm.array(aggregated[:, part], clipped[:, part], aggregated[:, part])
+
+            numerator, denominator = (aggregated @ moments).T
+            result[start:stop] = np.nan
+            np.divide(numerator, denominator, out=result[start:stop], where=denominator > 0)
+
+        if out is not None:
+            if not np.shares_memory(result, out):
+                out[...] = result.reshape(shape)
+
+            return out
+
+        return float(result[0]) if shape == () else result.reshape(shape)
+
+
 if __name__ == "__main__":
     pass
@@ -79,6 +79,10 @@ setup(
     install_requires=[
     ],
 
+    extras_require={
+        'numpy': ['numpy'],  # optional, used only by vectorized routines
+    },
+
     package_data={
         '': [
             './fuzzyroutines/*'
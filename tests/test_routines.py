@@ -1,8 +1,22 @@
 # -*- coding: utf-8 -*-
 
+import io
+import copy
+import math
+import sys
+import pickle
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from fuzzyroutines.FuzzyRoutines import *
 
+try:
+    import numpy as np
+
+except ImportError:
+    np = None
+
+needsNumpy = pytest.mark.skipif(np is None, reason='NumPy is not installed')
+
 
 class TestBaseMethods():
 
@@ -29,6 +43,33 @@ class TestBaseMethods():
         for test in testData:
             assert DiapasonParser(test[0]) == test[1], 'Input: [ {} ] expected output: [ {} ]'.format(test[0], test[1])
 
+    def test_RangeSet(self):
+        testData = [
+            ["1-1000000000", ((1, 1000000000),), 1000000000],
+            ["8-10, 1-5, 6", ((1, 6), (8, 10)), 9],
+            ["11, 11, 12, 12, 1-5, 3-7", ((1, 7), (11, 12)), 9],
+            ["5-1", (), 0],
+            ["1-x", (), 0],
+        ]
+        for test in testData:
+            result = ParseDiapason(test[0])
+            assert result.intervals == test[1] and len(result) == test[2], 'Input: [ {} ] expected output: [ {}, len = {} ]'.format(test[0], test[1], test[2])
+
+        rangeSet = ParseDiapason("1-10, 20-30, 1000000-2000000")
+        assert (5 in rangeSet, 15 in rangeSet, 1500000 in rangeSet, 5.5 in rangeSet) == (True, False, True, False), 'Expected membership by intervals'
+        assert (rangeSet[0], rangeSet[10], rangeSet[-1], rangeSet.index(21)) == (1, 20, 2000000, 11), 'Expected indexing by intervals'
+        assert rangeSet[8:13].intervals == ((9, 10), (20, 22)) and list(rangeSet[:12:4]) == [1, 5, 9], 'Expected slicing by positions'
+        assert list(rangeSet[:3]) == [1, 2, 3] and list(reversed(rangeSet[:3])) == [3, 2, 1], 'Expected lazy iteration'
+        assert (rangeSet & "5-25").intervals == ((5, 10), (20, 25)), 'Expected intersection of diapasons'
+        assert (rangeSet | ParseDiapason("11-19")).intervals == ((1, 30), (1000000, 2000000)), 'Expected union of diapasons'
+        assert pickle.loads(pickle.dumps(rangeSet)) == rangeSet, 'Expected equal RangeSet after pickling'
+
+        # slice with step is lazy view, elements are not materialized:
+        stepped = ParseDiapason("0-1000000000")[::2]
+        assert (len(stepped), stepped[1], stepped[-1], 999999998 in stepped, 7 in stepped) == (500000001, 2, 1000000000, True, False), 'Expected lazy stepped slice'
+        assert list(stepped[1:4]) == [2, 4, 6] and list(stepped[::-250000000]) == [1000000000, 500000000, 0], 'Expected slicing of stepped slice'
+        assert list(rangeSet[::-10][:3]) == [2000000, 1999990, 1999980] and rangeSet[::7].index(1000000) == 3, 'Expected stepped slice across intervals'
+
     def test_IsNumber(self):
         testData = [
             # positive tests:
@@ -135,6 +176,37 @@ class TestBaseMethods():
         for test in testDataNegative:
             assert FuzzyNOTParabolic(test[0], alpha=test[1], epsilon=test[2]) is test[3], 'Input: [ {}, alpha={}, epsilon={} ] expected output: [ {} ]'.format(test[0], test[1], test[2], test[3])
 
+    def test_FuzzyNOTParabolicExact(self):
+        # exact method must satisfy the equation 2a - x - y = (2a - 1)(y - x)^2 and coincide with reference scan method:
+        testData = [
+            [0.25, 0.5, 0.75],
+            [0.75, 0.5, 0.25],
+            [0.25, 0.75, 0.98205],
+            [0.25, 0.25, 0.25],
+            [0.1, 0.4, 0.79722],
+            [0.3, 0.6, 0.84138],
+            [0.6, 0.3, 0.1],
+        ]
+        for test in testData:
+            result = FuzzyNOTParabolic(test[0], alpha=test[1])
+            assert round(result, 5) == test[2], 'Input: [ {}, alpha={} ] expected output: [ {} ]'.format(test[0], test[1], test[2])
+            assert abs((2 * test[1] - test[0] - result) - (2 * test[1] - 1) * (result - test[0]) ** 2) < 1e-12, 'Input: [ {}, alpha={} ] expected root of equation'.format(test[0], test[1])
+            assert abs(FuzzyNOTParabolic(test[0], alpha=test[1], epsilon=0.001, method='scan') - result) <= 0.001, 'Input: [ {}, alpha={} ] expected output of scan method'.format(test[0], test[1])
+
+        for method in ['Exact', 'bisection', None]:
+            with pytest.raises(Exception):
+                FuzzyNOTParabolic(0.25, method=method)
+
+    @needsNumpy
+    def test_FuzzyNOTParabolicArray(self):
+        xs = np.array([-0.5, 0., 0.1, 0.25, 0.5, 0.75, 0.9, 1., 1.5, np.nan])
+        for alpha in [0.05, 0.25, 0.5, 0.75, 1.]:
+            expected = np.array([FuzzyNOTParabolic(x, alpha=alpha) if 0 <= x <= 1 else np.nan for x in xs], dtype=float)
+            assert np.allclose(FuzzyNOTParabolicArray(xs, alpha=alpha), expected, atol=1e-12, equal_nan=True), 'Input: [ {}, alpha={} ] expected output: [ {} ]'.format(xs, alpha, expected)
+
+        with pytest.raises(Exception):
+            FuzzyNOTParabolicArray(xs, alpha=0)
+
     def test_FuzzyAND(self):
         # positive tests:
         testDataPositive = [
@@ -358,3 +430,722 @@ class TestBaseMethods():
         ]
         for test in testDataNegative:
             assert SCoNormCompose(test[0]) is test[1], 'Input: [ {} ] expected output: [ {} ]'.format(test[0], test[1])
+
+    def test_FuzzySetDefuz(self):
+        testData = [
+            # closed form of center of gravity:
+            ['bell', {'a': 0.35, 'b': 0.5, 'c': 0.6}, (0., 1.), 0.55],
+            ['bell', {'a': 0.6, 'b': 0.66, 'c': 0.77}, (0.6, 0.83), 0.715],
+            ['parabolic', {'a': 0., 'b': 1.}, (0.5, 1.), 0.775],
+            ['triangle', {'a': 0.7, 'b': 1, 'c': 1}, (0., 1.), 0.9],
+            ['trapezium', {'a': 0.1, 'b': 1, 'c': 0.5, 'd': 0.8}, (0., 1.), 0.59167],
+            ['exponential', {'a': 0.5, 'b': 0.15}, (0., 1.), 0.5],
+            ['sigmoidal', {'a': 15, 'b': 0.5}, (0., 1.), 0.73546],
+            ['sigmoidal', {'a': 0, 'b': 0.5}, (0., 1.), 0.5],
+            # numeric integration:
+            ['hyperbolic', {'a': 7, 'b': 4, 'c': 0}, (0., 1.), 0.10011],
+            ['desirability', {}, (0., 1.), 0.55092],
+        ]
+        for test in testData:
+            fSet = FuzzySet(MFunction(test[0], **test[1]), supportSet=test[2])
+            assert round(fSet.Defuz(), 5) == test[3], 'Input: [ {} ] expected output: [ {} ]'.format(fSet, test[3])
+
+    def test_FuzzySetDefuzCache(self):
+        fSet = FuzzySet(MFunction('trapezium', **{'a': 0.1, 'b': 1, 'c': 0.5, 'd': 0.8}), supportSet=(0., 1.))
+        assert fSet._defuzCache == (None, None), 'Defuzzy value must not be calculated before first request'
+        assert round(fSet.Defuz(), 5) == 0.59167, 'Input: [ {} ] expected output: [ 0.59167 ]'.format(fSet)
+
+        fSet.mFunction.parameters = {'a': 0, 'b': 1, 'c': 0.5, 'd': 0.8}
+        assert round(fSet.Defuz(), 5) == 0.56154, 'Input: [ {} ] expected output after parameters change: [ 0.56154 ]'.format(fSet)
+
+        fSet.supportSet = (0.5, 1)
+        assert round(fSet.Defuz(), 5) == 0.70417, 'Input: [ {} ] expected output after support set change: [ 0.70417 ]'.format(fSet)
+
+        fSet.mFunction = MFunction('triangle', **{'a': 0.5, 'b': 1, 'c': 1})
+        assert round(fSet.defuzValue, 5) == 0.83333, 'Input: [ {} ] expected output after function change: [ 0.83333 ]'.format(fSet)
+
+        fSet.mFunction = MFunction('hyperbolic', **{'a': 7, 'b': 4, 'c': 0})
+        riemannValue = fSet.Defuz()
+        fSet.mFunction.accuracy = 10
+        assert fSet.Defuz() != riemannValue, 'Input: [ {} ] expected new output after accuracy change'.format(fSet)
+
+        fSet.integrator = GaussKronrodIntegrator()
+        assert fSet.Defuz() != riemannValue and fSet.defuzEvaluations > 10, 'Input: [ {} ] expected new output after integrator change'.format(fSet)
+
+    def test_FuzzySetIntegrator(self):
+        testData = [
+            ['bell', {'a': 0.35, 'b': 0.5, 'c': 0.6}, (0., 1.)],
+            ['trapezium', {'a': 0.1, 'b': 1, 'c': 0.5, 'd': 0.8}, (0., 1.)],
+            ['parabolic', {'a': 0.77, 'b': 0.95}, (0.77, 1.)],
+            ['sigmoidal', {'a': 15, 'b': 0.5}, (0., 1.)],
+        ]
+        for test in testData:
+            funct = MFunction(test[0], **test[1])
+            numerator, denominator, evaluations = GaussKronrodIntegrator(absTolerance=1e-12, relTolerance=0).Integrate(funct.mju, *test[2], breakpoints=funct.Breakpoints())
+            exactDenominator, exactNumerator = funct.Moments(*test[2])
+            assert abs(numerator - exactNumerator) < 1e-11 and abs(denominator - exactDenominator) < 1e-11, 'Input: [ {} ] expected output: [ {}, {} ]'.format(funct, exactNumerator, exactDenominator)
+            assert evaluations < funct.accuracy, 'Input: [ {} ] expected less evaluations than Riemann integrator'.format(funct)
+
+        # fuzzy set without closed form of integrals:
+        fSet = FuzzySet(MFunction('hyperbolic', **{'a': 7, 'b': 4, 'c': 0}), integrator=GaussKronrodIntegrator(absTolerance=1e-10))
+        assert round(fSet.Defuz(), 8) == 0.09979032, 'Input: [ {} ] expected output: [ 0.09979032 ]'.format(fSet)
+        assert 0 < fSet.defuzEvaluations < 1000, 'Input: [ {} ] expected number of evaluations in (0, 1000)'.format(fSet)
+
+        # fuzzy set with closed form of integrals:
+        fSet = FuzzySet(MFunction('triangle', **{'a': 0.7, 'b': 1, 'c': 1}), integrator=GaussKronrodIntegrator())
+        assert fSet.defuzEvaluations == 0, 'Input: [ {} ] expected no evaluations'.format(fSet)
+
+        with pytest.raises(Exception):
+            FuzzySet(MFunction('triangle', **{'a': 0.7, 'b': 1, 'c': 1}), integrator='simpson')
+
+    @needsNumpy
+    def test_MFunctionMjuArray(self):
+        testData = [
+            ['hyperbolic', {'a': 7, 'b': 4, 'c': 0}],
+            ['bell', {'a': 0.35, 'b': 0.5, 'c': 0.6}],
+            ['parabolic', {'a': 0.77, 'b': 0.95}],
+            ['triangle', {'a': 0.2, 'b': 0.8, 'c': 0.7}],
+            ['triangle', {'a': 0.7, 'b': 1, 'c': 1}],
+            ['trapezium', {'a': 0.1, 'b': 1, 'c': 0.5, 'd': 0.8}],
+            ['exponential', {'a': 0.5, 'b': 0.15}],
+            ['sigmoidal', {'a': 15, 'b': 0.5}],
+            ['desirability', {}],
+        ]
+        xs = np.concatenate([np.linspace(-1, 2, 601), [0.1, 0.35, 0.5, 0.6, 0.7, 0.77, 0.8, 0.95, 1.]])
+        for test in testData:
+            funct = MFunction(test[0], **test[1])
+            expected = np.array([funct.mju(x) for x in xs])
+            assert np.allclose(funct.MjuArray(xs), expected, rtol=0, atol=1e-12), 'Input: [ {} ] expected scalar mju() values'.format(funct)
+
+            buffer = np.empty((3, 3))
+            result = funct.MjuArray(xs[:9].reshape(3, 3), out=buffer)
+            assert result is buffer, 'Input: [ {} ] expected result in given out buffer'.format(funct)
+            assert np.allclose(result.ravel(), expected[:9], rtol=0, atol=1e-12), 'Input: [ {} ] expected N-D array support'.format(funct)
+
+    def test_FuzzyScaleFuzzy(self):
+        testData = [
+            [0., 'Min'],
+            [0.1, 'Min'],
+            [0.2, 'Low'],
+            [0.3, 'Low'],
+            [0.5, 'Med'],
+            [0.7, 'High'],
+            [0.8, 'High'],
+            [0.9, 'Max'],
+            [1., 'Max'],
+        ]
+        scale = UniversalFuzzyScale()
+        for test in testData:
+            assert scale.Fuzzy(test[0])['name'] == test[1], 'Input: [ {} ] expected output: [ {} ]'.format(test[0], test[1])
+
+    def test_FuzzyLevel(self):
+        scale = UniversalFuzzyScale()
+        for index, level in enumerate(scale.levels):
+            assert isinstance(level, FuzzyLevel) and level.index == index, 'Input: [ {} ] expected FuzzyLevel with index {}'.format(level.name, index)
+            assert level['name'] == level.name and level['fSet'] is level.fSet, 'Input: [ {} ] expected dictionary view of level'.format(level.name)
+            assert dict(level) == {'name': level.name, 'fSet': level.fSet}, 'Input: [ {} ] expected 2-dim dictionary'.format(level.name)
+            assert not hasattr(level, '__dict__'), 'Input: [ {} ] expected level without instance dictionary'.format(level.name)
+
+        assert isinstance(scale.levels, tuple), 'Input: [ UniversalFuzzyScale ] expected tuple of levels'
+        assert scale.GetLevelByName('Med') is scale.levels[2], 'Input: [ Med ] expected the same level object'
+        assert scale.Fuzzy(0.5) is scale.levels[2], 'Input: [ 0.5 ] expected the same level object'
+
+        with pytest.raises(Exception):
+            scale.levels[0].name = 'Changed'
+
+        with pytest.raises(KeyError):
+            scale.levels[0]['index']
+
+        # levels of other scale and dictionaries may be mixed, indexes are renumbered:
+        newScale = FuzzyScale()
+        newScale.levels = [scale.levels[4], {'name': 'Other', 'fSet': FuzzySet(MFunction('triangle', **{'a': 0., 'b': 1., 'c': 0.5}))}]
+        assert [level.index for level in newScale.levels] == [0, 1], 'Input: [ mixed levels ] expected renumbered indexes'
+        assert newScale.levels[0].fSet is scale.levels[4].fSet, 'Input: [ mixed levels ] expected the same fuzzy set'
+
+        copied = pickle.loads(pickle.dumps(newScale.levels[0]))
+        assert copied.name == 'Max' and copied.index == 0, 'Input: [ pickled level ] expected the same name and index'
+
+    @needsNumpy
+    def test_FuzzyScaleFuzzyBatch(self):
+        xs = np.concatenate([np.linspace(-0.5, 1.5, 2001), [0.17, 0.23, 0.34, 0.4, 0.6, 0.66, 0.77, 0.83, 0.95]])
+        for scale in [FuzzyScale(), UniversalFuzzyScale()]:
+            expected = np.array([scale.levels.index(scale.Fuzzy(x)) for x in xs])
+            assert np.array_equal(scale.FuzzyBatch(xs), expected), 'Input: [ {} ] expected indexes of Fuzzy() levels'.format(scale.name)
+
+            buffer = np.empty((3, 3), dtype=np.int16)
+            assert scale.FuzzyBatch(xs[:9].reshape(3, 3), out=buffer) is buffer, 'Input: [ {} ] expected result in given out buffer'.format(scale.name)
+            assert np.array_equal(buffer.ravel(), expected[:9]), 'Input: [ {} ] expected indexes of Fuzzy() levels'.format(scale.name)
+
+        # ties are resolved in favour of the last level:
+        scale = FuzzyScale()
+        scale.levels = [{'name': 'A', 'fSet': FuzzySet(MFunction('triangle', **{'a': 0., 'b': 1., 'c': 0.5}))},
+                        {'name': 'B', 'fSet': FuzzySet(MFunction('triangle', **{'a': 0., 'b': 1., 'c': 0.5}))}]
+        assert list(scale.FuzzyBatch([0.25, 0.5, 2.])) == [1, 1, 1], 'Expected the last of levels with equal MF values'
+
+    def test_FuzzyScaleCompile(self):
+        xs = [x / 1000 for x in range(-200, 1201)]
+        for scale in [FuzzyScale(), UniversalFuzzyScale()]:
+            compiled = scale.Compile(resolution=200)
+            for x in xs:
+                assert compiled.FuzzyIndex(x) == scale.levels.index(scale.Fuzzy(x)), 'Input: [ {}, {} ] expected index of Fuzzy() level'.format(scale.name, x)
+
+            compiled = scale.Compile(resolution=200, mode='table')
+            crossovers = scale.Compile(resolution=200).crossovers
+            for x in xs:
+                if compiled.Fuzzy(x) is not scale.Fuzzy(x):
+                    assert min(abs(x - point) for point in crossovers) <= compiled.maxError, 'Input: [ {}, {} ] expected misclassification near crossover only'.format(scale.name, x)
+
+        # compiled scale is rebuilt after levels reassigning:
+        scale = FuzzyScale()
+        compiled = scale.Compile()
+        assert compiled.Fuzzy(0.9)['name'] == 'High', 'Input: [ 0.9 ] expected output: [ High ]'
+        scale.levels = [{'name': 'Low', 'fSet': FuzzySet(MFunction('triangle', **{'a': -1., 'b': 0.6, 'c': 0.}))},
+                        {'name': 'Top', 'fSet': FuzzySet(MFunction('triangle', **{'a': 0.4, 'b': 2., 'c': 1.}))}]
+        assert compiled.Fuzzy(0.9)['name'] == 'Top' and compiled.Fuzzy(0.45)['name'] == 'Low', 'Expected rebuilt compiled scale'
+        assert abs(compiled.crossovers[0] - 0.5) <= 1e-9, 'Input: [ {} ] expected crossover point: [ 0.5 ]'.format(compiled.crossovers)
+
+        # narrow level peaking between grid nodes isn't missed, and maxError isn't smaller than grid cell:
+        scale.levels = [{'name': 'A', 'fSet': FuzzySet(MFunction('triangle', **{'a': 0., 'b': 1., 'c': 0.5}), supportSet=(0., 1.))},
+                        {'name': 'B', 'fSet': FuzzySet(MFunction('triangle', **{'a': 0.5005, 'b': 0.5035, 'c': 0.502}), supportSet=(0.5005, 0.5035))}]
+        compiled = scale.Compile(resolution=100)
+        assert compiled.Fuzzy(0.502)['name'] == scale.Fuzzy(0.502)['name'] == 'B', 'Input: [ 0.502 ] expected output: [ B ]'
+        assert compiled.maxError >= 0.0025, 'Input: [ {} ] expected maxError not smaller than grid cell'.format(compiled.maxError)
+
+        # bisection stops at float resolution for levels far from zero:
+        scale.levels = [{'name': 'A', 'fSet': FuzzySet(MFunction('triangle', **{'a': 1e9, 'b': 1e9 + 1, 'c': 1e9 + 0.3}), supportSet=(1e9, 1e9 + 1))},
+                        {'name': 'B', 'fSet': FuzzySet(MFunction('triangle', **{'a': 1e9 + 0.2, 'b': 1e9 + 1, 'c': 1e9 + 0.8}), supportSet=(1e9 + 0.2, 1e9 + 1))}]
+        compiled = scale.Compile()
+        for x in [1e9 + 0.1, 1e9 + 0.5, 1e9 + 0.6, 1e9 + 0.9]:
+            assert compiled.Fuzzy(x) is scale.Fuzzy(x), 'Input: [ {} ] expected output: [ {} ]'.format(x, scale.Fuzzy(x)['name'])
+
+        with pytest.raises(Exception):
+            scale.Compile(mode='tree')
+
+    @needsNumpy
+    def test_FuzzyScaleCompileBatch(self):
+        xs = np.linspace(-0.5, 1.5, 4001)
+        scale = UniversalFuzzyScale()
+        for mode in ['crossover', 'table']:
+            compiled = scale.Compile(mode=mode)
+            expected = np.array([compiled.FuzzyIndex(x) for x in xs])
+            assert np.array_equal(compiled.FuzzyBatch(xs), expected), 'Input: [ {} ] expected output of FuzzyIndex()'.format(mode)
+
+    def test_MFunctionCompile(self):
+        testData = [
+            ['hyperbolic', {'a': 7, 'b': 4, 'c': 0}],
+            ['bell', {'a': 0.35, 'b': 0.5, 'c': 0.6}],
+            ['parabolic', {'a': 0.77, 'b': 0.95}],
+            ['triangle', {'a': 0.2, 'b': 0.8, 'c': 0.7}],
+            ['trapezium', {'a': 0.1, 'b': 1, 'c': 0.5, 'd': 0.8}],
+            ['exponential', {'a': 0.5, 'b': 0.15}],
+            ['sigmoidal', {'a': 15, 'b': 0.5}],
+            ['desirability', {}],
+        ]
+        xs = [x / 100 for x in range(-100, 201)]
+        for test in testData:
+            funct = MFunction(test[0], **test[1])
+            method = getattr(funct, funct.name)  # not compiled method with the same formula
+            for x in xs:
+                assert funct.mju(x) == method(x), 'Input: [ {}, {} ] expected output: [ {} ]'.format(funct, x, method(x))
+
+            for x in [1e20, -1e20, 1e200, -1e200]:  # saturated functions return limits instead of overflow errors
+                assert funct.mju(x) == method(x) and 0 <= funct.mju(x) <= 1, 'Input: [ {}, {} ] expected output: [ {} ]'.format(funct, x, method(x))
+
+        assert MFunction('hyperbolic', **{'a': 8, 'b': 20, 'c': 0}).mju(1e20) == 0, 'Input: [ 1e20 ] expected output: [ 0 ] for hyperbolic function'
+        assert MFunction('exponential', **{'a': 0, 'b': 1}).mju(1e200) == 0, 'Input: [ 1e200 ] expected output: [ 0 ] for exponential function'
+        assert UniversalFuzzyScale().Fuzzy(1e20)['name'] == 'Max', "Input: [ 1e20 ] expected output: [ 'Max' ]"
+
+        # wrong parameters raise exception at once:
+        testDataNegative = [
+            ['hyperbolic', {'a': 7, 'b': 4}],
+            ['trapezium', {'a': 0.1, 'b': 1, 'c': 0.5}],
+            ['triangle', {'a': 0.2, 'b': '0.8', 'c': 0.7}],
+            ['sigmoidal', {'a': None, 'b': 0.5}],
+        ]
+        for test in testDataNegative:
+            with pytest.raises(Exception):
+                MFunction(test[0], **test[1])
+
+        funct = MFunction('triangle', **{'a': 0.2, 'b': 0.8, 'c': 0.7})
+        with pytest.raises(Exception):
+            funct.parameters = {'a': 0.2, 'b': 0.8}
+        assert funct.mju(0.7) == 1 and funct.parameters == {'a': 0.2, 'b': 0.8, 'c': 0.7}, 'Expected old parameters after wrong assigning'
+
+        parameters = {'a': 0., 'b': 1., 'c': 0.5}
+        funct.parameters = parameters
+        assert funct.mju(0.25) == 0.5, 'Input: [ {}, 0.25 ] expected output: [ 0.5 ]'.format(funct)
+
+        # compiled function can't be silently outdated by changing parameters in place:
+        with pytest.raises(TypeError):
+            funct.parameters['a'] = 0.4
+        parameters['a'] = 0.4
+        assert funct.parameters == {'a': 0., 'b': 1., 'c': 0.5} and funct.mju(0.25) == funct.Triangle(0.25) == 0.5, 'Expected not changed parameters of function'
+
+    def test_ConcurrentEvaluation(self):
+        scale = UniversalFuzzyScale()
+        compiled = scale.Compile()
+        bell = scale.GetLevelByName('High')['fSet'].mFunction
+        xs = [x / 500 for x in range(-100, 601)]
+
+        def Evaluate(shift):
+            values = xs[shift:] + xs[:shift]  # every thread walks values in its own order
+            return [{x: (scale.Fuzzy(x)['name'], compiled.Fuzzy(x)['name'], bell.mju(x), bell.Bell(x)) for x in values}
+                    for _ in range(5)]
+
+        baseline = Evaluate(0)
+
+        switchInterval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # force threads to switch as often as possible
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(Evaluate, range(0, 700, 25)))
+
+        finally:
+            sys.setswitchinterval(switchInterval)
+
+        for result in results:
+            for repeat in result:
+                assert repeat == baseline[0], 'Expected the same results in all threads as in single thread'
+
+        assert bell.parameters == {'a': 0.6, 'b': 0.66, 'c': 0.77}, 'Expected not changed parameters of bell function'
+
+    def test_ReadNumbers(self):
+        assert list(ReadNumbers(io.StringIO('0.5\n\n 1 \n-2.5e-1\n'))) == [0.5, 1., -0.25], 'Expected numbers from lines'
+        assert list(ReadNumbers(['1', '2'])) == [1., 2.], 'Expected numbers from list of strings'
+
+        csvData = 'id,cpu,latency\n1,0.5,10\n2,,20\n3,0.75,30\n'
+        assert list(ReadCsvColumn(io.StringIO(csvData), column='cpu')) == [0.5, 0.75], 'Expected numbers from named column'
+        assert list(ReadCsvColumn(io.StringIO(csvData), column=2, skipHeader=True)) == [10., 20., 30.], 'Expected numbers from column by index'
+
+        with pytest.raises(Exception):
+            list(ReadCsvColumn(io.StringIO(csvData), column='memory'))
+
+    @needsNumpy
+    def test_FuzzyScaleStream(self):
+        scale = UniversalFuzzyScale()
+        xs = [x / 1000 for x in range(-100, 1101)]
+        expected = [scale.levels.index(scale.Fuzzy(x)) for x in xs]
+
+        chunks = list(scale.Stream(iter(xs), chunkSize=100))
+        assert [len(chunk) for chunk in chunks] == [100] * 12 + [1], 'Expected chunks with 100 values at most'
+        assert list(np.concatenate(chunks)) == expected, 'Expected indexes of Fuzzy() levels'
+
+        fileSource = io.StringIO('\n'.join(str(x) for x in xs))
+        assert list(np.concatenate(list(scale.Compile().Stream(fileSource, chunkSize=256)))) == expected, 'Expected indexes of Fuzzy() levels for file'
+
+        assert list(scale.Stream([])) == [], 'Expected no chunks for empty source'
+
+        with pytest.raises(Exception):
+            list(scale.Stream(xs, chunkSize=0))
+
+    def test_MFunctionPickle(self):
+        funct = MFunction('bell', **{'a': 0.35, 'b': 0.5, 'c': 0.6})
+        copied = pickle.loads(pickle.dumps(funct))
+        assert str(copied) == str(funct) and copied.mju(0.45) == funct.mju(0.45), 'Expected the same function after unpickling'
+
+    @needsNumpy
+    def test_FuzzyScaleFuzzyParallel(self):
+        scale = UniversalFuzzyScale()
+        xs = np.linspace(-0.5, 1.5, 20000).reshape(100, 200)
+        result = scale.FuzzyParallel(xs, workers=2, chunkSize=3000)
+        assert result.dtype == np.uint8 and result.shape == xs.shape, 'Expected uint8 array with the same shape as input'
+        assert np.array_equal(result, scale.FuzzyBatch(xs)), 'Expected indexes of FuzzyBatch() levels'
+
+    def test_FuzzyScaleShared(self, monkeypatch):
+        scale = UniversalFuzzyScale.Shared()
+        assert scale is UniversalFuzzyScale.Shared(), 'Expected the same shared instance'
+        assert FuzzyScale.Shared() is not scale and type(FuzzyScale.Shared()) is FuzzyScale, 'Expected shared instance per scale class'
+        assert scale.frozen and all(level.fSet.frozen and level.fSet.mFunction.frozen for level in scale.levels), 'Expected frozen scale, sets and functions'
+        assert scale.Fuzzy(0.5)['name'] == 'Med', 'Input: [ 0.5 ] expected output: [ Med ]'
+        assert str(scale) == str(UniversalFuzzyScale()), 'Expected the same view as new universal scale'
+
+        fSet = scale.GetLevelByName('Med').fSet
+        for change in [lambda: setattr(scale, 'name', 'Changed'),
+                       lambda: setattr(FuzzyScale.Shared(), 'levels', UniversalFuzzyScale().levels),
+                       lambda: setattr(fSet, 'supportSet', (0., 1.)),
+                       lambda: setattr(fSet, 'integrator', GaussKronrodIntegrator()),
+                       lambda: setattr(fSet.mFunction, 'parameters', {'a': 0.3, 'b': 0.4, 'c': 0.6}),
+                       lambda: setattr(fSet.mFunction, 'accuracy', 10)]:
+            with pytest.raises(Exception):
+                change()
+
+        with pytest.raises(TypeError):
+            fSet.mFunction.parameters['a'] = 0.3
+
+        copied = pickle.loads(pickle.dumps(fSet.mFunction))
+        assert copied.frozen and copied.mju(0.45) == fSet.mFunction.mju(0.45), 'Expected the same frozen function after unpickling'
+
+        # deepcopy of frozen scale, fuzzy set or function is changeable, shared instance stays frozen:
+        copied = copy.deepcopy(scale)
+        assert not copied.frozen and not any(level.fSet.frozen or level.fSet.mFunction.frozen for level in copied.levels), 'Expected changeable copies'
+        copied.GetLevelByName('Med').fSet.mFunction.parameters = {'a': 0.3, 'b': 0.4, 'c': 0.6}
+        copied.name = 'Changed'
+        assert copied.Fuzzy(0.5)['name'] == 'Med' and scale.name != 'Changed', 'Expected changed copy and unchanged shared scale'
+        assert fSet.mFunction.parameters['a'] != 0.3 and scale.frozen and fSet.frozen, 'Expected unchanged frozen shared scale'
+
+        copied = copy.deepcopy(fSet)
+        copied.supportSet = (0., 1.)
+        assert not copied.frozen and not copied.mFunction.frozen and copied.supportSet == (0., 1.), 'Expected changeable copy of fuzzy set'
+
+        # universal scale does not build default levels of parent scale:
+        monkeypatch.setattr(FuzzyScale, '_DefaultLevels', lambda self: pytest.fail('Default levels were built'))
+        assert len(UniversalFuzzyScale().levels) == 5, 'Expected 5 levels of universal scale'
+
+    def test_DefuzCache(self, tmp_path):
+        cache = DefuzCache(directory=str(tmp_path), maxEntries=20)
+        previous = SetDefuzCache(cache)
+        try:
+            fSet = FuzzySet(MFunction('hyperbolic', **{'a': 7, 'b': 4, 'c': 0}), supportSet=(0., 1.))
+            expected = fSet.Defuz()
+            assert fSet.defuzEvaluations == 1000 and cache.misses == 1 and len(cache) == 1, 'Expected integration and saving of value'
+
+            fSet = FuzzySet(MFunction('hyperbolic', **{'a': 7, 'b': 4, 'c': 0}), supportSet=(0., 1.))
+            assert fSet.Defuz() == expected and fSet.defuzEvaluations == 0 and cache.hits == 1, 'Expected value from cache'
+
+            fSet.mFunction.accuracy = 500
+            assert fSet.Defuz() != expected and fSet.defuzEvaluations == 500, 'Expected integration with other accuracy'
+
+            fSet = FuzzySet(MFunction('triangle', **{'a': 0., 'b': 1., 'c': 0.5}))
+            fSet.Defuz()
+            assert len(cache) == 2, 'Expected no cached values for exact integrals'
+
+            # the least recently used values are evicted:
+            for number in range(30):
+                cache.Put('key{}'.format(number), number)
+            assert len(cache) <= 20 and cache.Get('key29') == 29 and cache.Get('key0') is None, 'Expected eviction of old values'
+
+        finally:
+            SetDefuzCache(previous)
+            cache.Close()
+
+        reopened = DefuzCache(directory=str(tmp_path), maxEntries=20)
+        assert reopened.Get('key29') == 29, 'Expected persistent value after reopening'
+        reopened.Close()
+
+        class NewDefuzCache(DefuzCache):
+            codeVersion = DefuzCache.codeVersion + 1
+
+        newVersion = NewDefuzCache(directory=str(tmp_path))
+        assert len(newVersion) == 0, 'Expected no values of old code version'
+        newVersion.Close()
+
+        with pytest.raises(Exception):
+            SetDefuzCache(object())
+
+    @needsNumpy
+    def test_FuzzyOperatorsArray(self):
+        values = [0., 0.1, 0.3, 0.5, 0.7, 1., 1.2, -0.1]
+        column = np.array(values).reshape(-1, 1)  # broadcasting of (values x 1) and (values) gives matrix of all pairs
+        for normType in ['logic', 'algebraic', 'boundary', 'drastic']:
+            for scalarNorm, arrayNorm in [(TNorm, TNormArray), (SCoNorm, SCoNormArray)]:
+                expected = np.array([[np.nan if scalarNorm(a, b, normType) is None else scalarNorm(a, b, normType) for b in values] for a in values])
+                assert np.allclose(arrayNorm(column, values, normType), expected, equal_nan=True), 'Input: [ {} ] expected {} values'.format(normType, scalarNorm.__name__)
+
+                buffer = np.broadcast_to(column, expected.shape).copy()
+                assert arrayNorm(buffer, values, normType, out=buffer) is buffer, 'Input: [ {} ] expected result in given out buffer'.format(normType)
+                assert np.allclose(buffer, expected, equal_nan=True), 'Input: [ {} ] expected {} values in argument buffer'.format(normType, scalarNorm.__name__)
+
+            with pytest.raises(Exception):
+                TNormArray(column, values, normType, invalid='raise')
+
+        for alpha in [0.2, 0.5, 1.]:
+            expected = np.array([np.nan if FuzzyNOT(x, alpha) is None else FuzzyNOT(x, alpha) for x in values])
+            assert np.allclose(FuzzyNOTArray(values, alpha), expected, equal_nan=True), 'Input: [ {} ] expected FuzzyNOT() values'.format(alpha)
+
+        assert np.allclose(FuzzyANDArray([1., np.nan, 3.], 2.), [1., np.nan, 2.], equal_nan=True), 'Expected elementwise minimum'
+        assert np.allclose(FuzzyORArray([1., 5.], [[2.], [6.]]), [[2., 5.], [6., 6.]]), 'Expected broadcasted elementwise maximum'
+        assert np.isnan(SCoNormArray([0.5, 2.], 0.5, 'boundary', invalid='ignore')).sum() == 0, 'Expected no masked values'
+
+        with pytest.raises(Exception):
+            TNormArray(column, values, 'unknown')
+
+        with pytest.raises(Exception):
+            TNormArray(column, values, out=np.empty(3))
+
+    def test_NormComposeShortCircuit(self):
+        values = [0.5, 0., 0.7, 0.9]
+        for normType in ['logic', 'algebraic', 'boundary', 'drastic']:
+            assert TNormCompose(*values, normType=normType) == 0, 'Input: [ {} ] expected absorbing element 0'.format(normType)
+            assert SCoNormCompose(*[1 - x for x in values], normType=normType) == 1, 'Input: [ {} ] expected absorbing element 1'.format(normType)
+
+            # absorbing element does not hide incorrect numbers:
+            assert TNormCompose(0., 1.5, normType=normType) is None, 'Input: [ {} ] expected None for incorrect number'.format(normType)
+            assert SCoNormCompose(1., -0.5, normType=normType) is None, 'Input: [ {} ] expected None for incorrect number'.format(normType)
+
+        assert TNormCompose(5) == 5 and TNormCompose() is None and TNormCompose(0.5, 0.5, normType='unknown') is None, 'Expected old results of special cases'
+
+    @needsNumpy
+    def test_NormReduce(self):
+        rng = np.random.RandomState(5)
+        x = rng.choice([0., 0.2, 0.5, 0.8, 1.], size=(40, 4, 5))  # many neutral and absorbing elements
+        for normType in ['logic', 'algebraic', 'boundary', 'drastic']:
+            for compose, reduce in [(TNormCompose, TNormReduce), (SCoNormCompose, SCoNormReduce)]:
+                for axis in [0, 1, -1]:
+                    moved = np.moveaxis(x, axis, -1)
+                    expected = np.array([compose(*row, normType=normType) for row in moved.reshape(-1, moved.shape[-1])]).reshape(moved.shape[:-1])
+                    assert np.allclose(reduce(x, axis=axis, normType=normType), expected, atol=1e-12), 'Input: [ {}, axis={} ] expected {} values'.format(normType, axis, compose.__name__)
+
+                buffer = np.empty(4)
+                assert reduce(x[:, :, 0], axis=0, normType=normType, out=buffer) is buffer, 'Input: [ {} ] expected result in given out buffer'.format(normType)
+
+            assert TNormReduce(x, axis=None, normType=normType) == TNormCompose(*x.ravel(), normType=normType), 'Input: [ {} ] expected reduction of all elements'.format(normType)
+            assert TNormReduce(np.empty((3, 0)), normType=normType).tolist() == [1., 1., 1.], 'Input: [ {} ] expected neutral element 1'.format(normType)
+            assert SCoNormReduce(np.empty((3, 0)), normType=normType).tolist() == [0., 0., 0.], 'Input: [ {} ] expected neutral element 0'.format(normType)
+
+        masked = TNormReduce([[0.5, 0.2], [1.5, 0.]], axis=1)
+        assert masked[0] == 0.2 and np.isnan(masked[1]), 'Expected NaN for row with incorrect number'
+
+        with pytest.raises(Exception):
+            SCoNormReduce([[0.5, -1.]], invalid='raise')
+
+    def test_NormRegistry(self):
+        values = [0., 0.2, 0.5, 0.9, 1.]
+        families = [HamacherNorm(0.), HamacherNorm(3.), YagerNorm(0.5), YagerNorm(2.), FrankNorm(0.1), FrankNorm(10.), GetNorm('einstein')]
+        for tNorm in families:
+            for a in values:
+                assert abs(TNorm(a, 1., tNorm) - a) < 1e-12 and abs(TNorm(a, 0., tNorm)) < 1e-12, 'Input: [ {}, {} ] expected identity 1 and absorbing 0'.format(tNorm, a)
+                for b in values:
+                    assert abs(TNorm(a, b, tNorm) - TNorm(b, a, tNorm)) < 1e-12, 'Input: [ {}, {}, {} ] expected commutative T-Norm'.format(tNorm, a, b)
+                    assert TNorm(a, b, tNorm) <= min(a, b) + 1e-12, 'Input: [ {}, {}, {} ] expected T-Norm not greater than min'.format(tNorm, a, b)
+
+        for family, builtinName in [(HamacherNorm(1.), 'algebraic'), (YagerNorm(1.), 'boundary'), (HamacherNorm(2.), 'einstein')]:
+            for a in values:
+                for b in values:
+                    assert abs(TNorm(a, b, family) - TNorm(a, b, builtinName)) < 1e-12, 'Input: [ {}, {}, {} ] expected {} values'.format(family, a, b, builtinName)
+
+        assert abs(TNorm(0.5, 0.5, 'einstein') - 0.25 / 1.25) < 1e-15 and abs(SCoNorm(0.5, 0.5, 'einstein') - 0.8) < 1e-15, 'Expected Einstein product and sum'
+
+        RegisterNorm(YagerNorm(2., kind='s', name='yager2'), replace=True)
+        assert abs(SCoNormCompose(0.3, 0.4, normType='yager2') - 0.5) < 1e-12, 'Expected registered Yager S-coNorm'
+        assert TNorm(0.3, 0.4, 'yager2') is None, 'Expected no T-Norm with S-coNorm name'
+
+        with pytest.raises(Exception):
+            RegisterNorm(YagerNorm(3., kind='s', name='yager2'))
+
+        RegisterNorm(YagerNorm(3., kind='s', name='yager2'), replace=True)
+        assert abs(SCoNorm(0.3, 0.4, 'yager2') - (0.3 ** 3 + 0.4 ** 3) ** (1 / 3)) < 1e-12, 'Expected replaced Yager S-coNorm'
+
+        with pytest.raises(Exception):
+            RegisterNorm(FuzzyNorm('logic', 't', max), replace=True)
+
+        # user norm without vectorized kernels:
+        RegisterNorm(FuzzyNorm('geometric', 't', lambda a, b: (a * b) ** 0.5 if a * b else 0., associative=False), replace=True)
+        assert TNormCompose(0.25, 0.5, 0., 1., normType='geometric') == 0., 'Expected composition of user T-Norm'
+
+        if np is not None:
+            x = np.array([[0.25, 0.5, 1.], [0.9, 0.4, 0.6]])
+            for normType in ['geometric', 'einstein', HamacherNorm(0.), FrankNorm(5.)]:
+                expected = [TNormCompose(*row, normType=normType) for row in x.tolist()]
+                assert np.allclose(TNormReduce(x, axis=1, normType=normType), expected), 'Input: [ {} ] expected reduction equal to composition'.format(normType)
+                assert np.allclose(TNormArray(x[0], x[1], normType), [TNorm(a, b, normType) for a, b in zip(x[0], x[1])]), 'Input: [ {} ] expected array values'.format(normType)
+                assert np.allclose(SCoNormArray(x[0], x[1], 'einstein'), [SCoNorm(a, b, 'einstein') for a, b in zip(x[0], x[1])]), 'Expected Einstein sum array values'
+
+    def test_ValidationPolicy(self, caplog, capsys):
+        previous = SetValidationPolicy('count')
+        try:
+            ValidationErrors(reset=True)
+            with caplog.at_level('WARNING', logger='fuzzyroutines'):
+                assert TNorm(1.5, 0.5) is None and not IsCorrectFuzzyNumberValue('x'), "Input: [ 'count' ] expected None and False results"
+                assert MFunction('hyperbolic', **{'a': 7, 'b': 4, 'c': 0}).Hyperbolic('x') == 0, "Input: [ 'count' ] expected 0 for incorrect input"
+            assert ValidationErrors() == 3 and not caplog.records, "Input: [ 'count' ] expected 3 counted errors without logging"
+
+            mju = MFunction('bell', **{'a': 0.35, 'b': 0.5, 'c': 0.6}).mju
+            for value in ['x', None, float('nan'), 0.1j]:
+                assert mju(value) is None, "Input: [ 'count', {!r} ] expected output: [ None ]".format(value)
+            assert ValidationErrors(reset=True) == 7 and mju(0.55) == 1 and mju(True) == 0, "Input: [ 'count' ] expected 4 counted errors of mju()"
+
+            for name, parameters in [['hyperbolic', {'a': 7, 'b': 4, 'c': 0}], ['parabolic', {'a': 0.77, 'b': 0.95}],
+                                     ['triangle', {'a': 0.2, 'b': 0.8, 'c': 0.7}], ['trapezium', {'a': 0.1, 'b': 1, 'c': 0.5, 'd': 0.8}],
+                                     ['exponential', {'a': 0.5, 'b': 0.15}], ['exponential', {'a': 0.5, 'b': 0}],
+                                     ['sigmoidal', {'a': 15, 'b': 0.5}], ['desirability', {}]]:
+                function = MFunction(name, **parameters).mju
+                assert [function(value) for value in ['x', None, float('nan')]] == [None] * 3, "Input: [ {} ] expected None for incorrect inputs".format(name)
+                assert 0 <= function(float('inf')) <= 1 and 0 <= function(-math.inf) <= 1, "Input: [ {} ] expected correct infinite inputs".format(name)
+            assert ValidationErrors(reset=True) == 24, "Input: [ 'count' ] expected 3 counted errors of every function"
+
+            SetValidationPolicy('mask', logMessages=3, logInterval=3600)
+            with caplog.at_level('WARNING', logger='fuzzyroutines'):
+                for value in range(10):
+                    assert FuzzyNOT(value + 2) is None, "Input: [ 'mask' ] expected None for incorrect input"
+                assert mju('x') is None and mju(float('nan')) is None, "Input: [ 'mask' ] expected None for incorrect input of mju()"
+            assert len(caplog.records) == 3 and ValidationErrors(reset=True) == 12, "Input: [ 'mask' ] expected 3 logged of 12 counted errors"
+            assert capsys.readouterr().out == '', "Input: [ 'mask' ] expected nothing printed"
+
+            SetValidationPolicy('strict')
+            for call in [lambda: TNorm(1.5, 0.5),
+                         lambda: DiapasonParser('1-x'),
+                         lambda: MFunction('bell', **{'a': 0.35, 'b': 0.5, 'c': 0.6}).Bell('x'),
+                         lambda: mju('x'),
+                         lambda: mju(None),
+                         lambda: mju(float('nan')),
+                         lambda: FuzzySet(MFunction('triangle', **{'a': 0.5, 'b': 0.6, 'c': 0.55}), supportSet=(0., 0.1)).Defuz()]:
+                with pytest.raises(Exception):
+                    call()
+
+            assert MFunction('sigmoidal', **{'a': 1000, 'b': 0.5}).Sigmoidal(-10) == 0, "Input: [ 'strict' ] expected saturated sigmoidal function"
+
+            if np is not None:
+                with pytest.raises(Exception):
+                    TNormArray([0.5, 1.5], 0.5)
+                assert np.isnan(TNormArray([0.5, 1.5], 0.5, invalid='mask')[1]), "Input: [ 'strict' ] expected explicit mask policy"
+
+        finally:
+            SetValidationPolicy(previous, logMessages=10, logInterval=1.)
+
+        with pytest.raises(Exception):
+            SetValidationPolicy('unknown')
+
+    @needsNumpy
+    def test_IsCorrectFuzzyArray(self):
+        testData = [
+            [[0., 0.5, 1., 1.5, -0.1, np.nan, np.inf], [True, True, True, False, False, False, False]],
+            [['x', 0.3, None, True], [False, True, False, False]],
+            [[[0.2, 2.], [1., 0.]], [[True, False], [True, True]]],
+        ]
+        for test in testData:
+            assert IsCorrectFuzzyArray(test[0]).tolist() == test[1], 'Input: [ {} ] expected output: [ {} ]'.format(test[0], test[1])
+
+        buffer = np.empty(3, dtype=bool)
+        assert IsCorrectFuzzyArray([0.1, 2., 0.3], out=buffer) is buffer and buffer.tolist() == [True, False, True], 'Expected result in given out buffer'
+
+    @needsNumpy
+    def test_Instrumentation(self):
+        scale = FuzzyScale()
+        metrics = scale.Instrument()
+        for value in [0.1, 0.5, 0.9]:
+            scale.Fuzzy(value)
+        scale.FuzzyBatch([0.1, 0.5, 0.9, 1.])
+        assert scale.levels[0].fSet.mFunction.mju('x') is None, "Input: [ 'x' ] expected output: [ None ]"
+        scale.levels[1].fSet.mFunction.Bell('x')
+        scale.levels[0].fSet.Defuz()
+
+        snapshot = metrics.Snapshot()
+        testData = [
+            ['Fuzzy', 'calls', 3],
+            ['FuzzyBatch', 'calls', 1],
+            ['FuzzyBatch', 'values', 4],
+            ['Min.mju', 'errors', 1],
+            ['Med.Bell', 'errors', 1],
+            ['Min.Defuz', 'calls', 1],
+            ['Min.Defuz', 'integrations', 1],
+            ['Min.Defuz', 'evaluations', 1000],
+        ]
+        for test in testData:
+            assert snapshot[test[0]][test[1]] == test[2], 'Input: [ {} ] expected output: [ {} ]'.format(test[:2], test[2])
+
+        assert snapshot['Min.mju']['calls'] == 3 + 1 + 1000 and snapshot['Min.MjuArray']['values'] == 4, 'Expected calls of membership function'
+        assert all(stats['histogram']['+Inf'] == stats['calls'] for stats in snapshot.values()), 'Expected all calls in histogram'
+
+        copied = pickle.loads(pickle.dumps(scale))
+        assert copied.metrics is None and 'Fuzzy' not in copied.__dict__ and copied.levels[0].fSet.metrics is None, 'Expected not instrumented copy'
+        assert copied.Fuzzy(0.9).name == scale.Fuzzy(0.9).name, 'Expected equal fuzzyfication of copy'
+
+        scale.Uninstrument()
+        assert scale.metrics is None and scale.levels[0].fSet.mFunction.metrics is None, 'Expected not instrumented scale'
+        calls = metrics.Snapshot()['Fuzzy']['calls']
+        scale.Fuzzy(0.5)
+        assert metrics.Snapshot()['Fuzzy']['calls'] == calls, 'Expected no records after Uninstrument()'
+
+        # process-wide shared scale is frozen and can't be instrumented, its deepcopy can:
+        shared = UniversalFuzzyScale.Shared()
+        fSet = shared.GetLevelByName('Med').fSet
+        for instrument in [shared.Instrument, fSet.Instrument, fSet.mFunction.Instrument]:
+            with pytest.raises(Exception):
+                instrument()
+
+        scale.levels = shared.levels
+        with pytest.raises(Exception):
+            scale.Instrument()
+
+        assert scale.metrics is None and fSet.metrics is None and fSet.mFunction.metrics is None, 'Expected not instrumented shared scale'
+        assert copy.deepcopy(shared).Instrument() is not None and shared.metrics is None, 'Expected instrumented copy only'
+
+    @needsNumpy
+    def test_RuleBase(self):
+        scale = UniversalFuzzyScale()
+        rules = ['IF cpu IS Max AND latency IS Max THEN risk IS High',
+                 'IF cpu IS Med OR latency IS Med THEN risk IS Med',
+                 'IF cpu IS Min AND latency IS Min THEN risk IS Min']
+        ruleBase = RuleBase({'cpu': scale, 'latency': scale}, 'risk', FuzzyScale(), rules=rules)
+        grid = ruleBase.grid
+
+        testData = [[0.95, 0.95], [0.5, 0.1], [0.02, 0.05], [0.3, 0.97]]
+        cpu, latency = np.array(testData).T
+        results = ruleBase.Infer({'cpu': cpu, 'latency': latency})
+        for test, result in zip(testData, results):
+            strengths = [min(scale.GetLevelByName('Max').fSet.mFunction.mju(test[0]), scale.GetLevelByName('Max').fSet.mFunction.mju(test[1])),
+                         max(scale.GetLevelByName('Med').fSet.mFunction.mju(test[0]), scale.GetLevelByName('Med').fSet.mFunction.mju(test[1])),
+                         min(scale.GetLevelByName('Min').fSet.mFunction.mju(test[0]), scale.GetLevelByName('Min').fSet.mFunction.mju(test[1]))]
+            outputs = [ruleBase.outputScale.GetLevelByName(name).fSet.mFunction for name in ['High', 'Med', 'Min']]
+            aggregated = [max(min(strength, mFunction.mju(x)) for strength, mFunction in zip(strengths, outputs)) for x in grid]
+            expected = sum(a * x for a, x in zip(aggregated, grid)) / sum(aggregated) if sum(aggregated) else None
+            assert (expected is None and np.isnan(result)) or result == pytest.approx(expected), 'Input: [ {} ] expected output: [ {} ]'.format(test, expected)
+
+        assert ruleBase.Infer({'cpu': 0.95, 'latency': 0.95}) == pytest.approx(results[0]), 'Expected float result for scalar inputs'
+        assert ruleBase.FiringStrengths({'cpu': cpu, 'latency': 0.5}).shape == (3, 4), 'Expected (rules x values) firing strengths'
+
+        # replaced membership function of input level is used by the next inference:
+        scale.GetLevelByName('Max').fSet.mFunction = MFunction('triangle', **{'a': 0.9, 'b': 1.1, 'c': 1.})
+        strengths = ruleBase.FiringStrengths({'cpu': 0.95, 'latency': 0.95})
+        assert strengths[0] == pytest.approx(0.5), 'Input: [ {} ] expected output: [ 0.5 ]'.format(strengths[0])
+
+        for rule in ['IF cpu IS Huge THEN risk IS High', 'IF gpu IS Max THEN risk IS High',
+                     'IF cpu IS Max AND latency IS Max OR cpu IS Min THEN risk IS High', 'cpu IS Max']:
+            with pytest.raises(Exception):
+                ruleBase.AddRule(rule)
+
+    @needsNumpy
+    def test_NonZeroInterval(self):
+        testData = [
+            ['bell', {'a': 0.17, 'b': 0.23, 'c': 0.34}, (0.17, 0.4)],
+            ['triangle', {'a': 0.1, 'b': 0.6, 'c': 0.3}, (0.1, 0.6)],
+            ['trapezium', {'a': 0.1, 'b': 0.9, 'c': 0.3, 'd': 0.6}, (0.1, 0.9)],
+            ['parabolic', {'a': 0.77, 'b': 0.95}, (0.77, math.inf)],
+            ['hyperbolic', {'a': 8, 'b': 20, 'c': 0}, (-math.inf, math.inf)],
+            ['exponential', {'a': 0.5, 'b': 0}, (math.inf, -math.inf)],
+        ]
+        x = np.linspace(-1., 2., 3001)
+        for test in testData:
+            mFunction = MFunction(test[0], **test[1])
+            left, right = mFunction.NonZeroInterval()
+            outside = mFunction.MjuArray(x)[(x < left) | (x > right)]
+            assert (left, right) == pytest.approx(test[2]) and not outside.any(), 'Input: [ {} ] expected output: [ {} ]'.format(test[:2], test[2])
+
+        scale = FuzzyScale()
+        scale.levels = [{'name': 'L{}'.format(index),
+                         'fSet': FuzzySet(MFunction('triangle', **{'a': index / 50 - 0.02, 'b': index / 50 + 0.04, 'c': index / 50 + 0.01}),
+                                          supportSet=(index / 50 - 0.02, index / 50 + 0.04))} for index in range(50)]
+        values = np.append(np.random.default_rng(0).uniform(-0.1, 1.1, 5000), [np.nan, np.inf, 0.5])
+        expected = [scale.levels.index(scale.Fuzzy(value)) for value in values]
+        assert scale.FuzzyBatch(values).tolist() == expected, 'Expected equal results of sparse FuzzyBatch() and Fuzzy()'
+
+    def test_FuzzyLevelIndex(self):
+        scale = FuzzyScale()
+        scale.levels = [{'name': 'L{}'.format(index),
+                         'fSet': FuzzySet(MFunction('triangle', **{'a': index / 100 - 0.01, 'b': index / 100 + 0.02, 'c': index / 100 + 0.005}),
+                                          supportSet=(index / 100 - 0.01, index / 100 + 0.02))} for index in range(100)]
+        testData = [-1., 0., 0.005, 0.5, 0.501, 0.99, 1.01, 5., float('inf'), float('nan')] + [index / 997 for index in range(1000)]
+        for test in testData:
+            assert scale.Fuzzy(test).index == scale._FullFuzzyIndex(test), 'Input: [ {} ] expected output: [ {} ]'.format(test, scale._FullFuzzyIndex(test))
+
+        scale.levels[10].fSet.mFunction.parameters = {'a': 0., 'b': 1., 'c': 0.5}  # index is rebuilt after changing of parameters
+        for test in testData:
+            assert scale.Fuzzy(test).index == scale._FullFuzzyIndex(test), 'Input: [ {} ] expected output: [ {} ] after changing of parameters'.format(test, scale._FullFuzzyIndex(test))
+
+    @needsNumpy
+    def test_Profile(self):
+        scale = UniversalFuzzyScale()
+        testData = [0., 0.2, 0.37, 0.5, 0.81, 1., 2.]
+        profiles = scale.ProfileBatch(testData, k=3)
+        for position, test in enumerate(testData):
+            profile = scale.Profile(test, k=3)
+            degrees = tuple(level.fSet.mFunction.mju(test) for level in scale.levels)
+            assert profile.degrees == degrees and profile.winner == scale.Fuzzy(test).index, 'Input: [ {} ] expected output: [ {}, {} ]'.format(test, degrees, scale.Fuzzy(test).index)
+            assert profile.margin == degrees[profile.top[0]] - degrees[profile.top[1]] and list(profile.top) == profiles.top[:, position].tolist(), 'Input: [ {} ] expected top levels: [ {} ]'.format(test, profile.top)
+            assert profiles.winners[position] == profile.winner and profiles.margins[position] == pytest.approx(profile.margin), 'Input: [ {} ] expected equal batch profile'.format(test)
+
+        assert scale.Profile(0.5, k=5).top == (2, 0, 4, 3, 1), 'Expected the last of levels with equal MF values first'
+        buffer = scale.ProfileBatch(np.zeros(len(testData)), k=3)
+        assert scale.ProfileBatch(testData, k=3, out=buffer) is buffer and (buffer.degrees == profiles.degrees).all(), 'Expected results in given out profiles'
+        with pytest.raises(Exception):
+            scale.ProfileBatch([0.1, 0.6], k=3, out=buffer)